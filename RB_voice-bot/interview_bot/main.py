@@ -104,6 +104,8 @@ async def main():
     
     # Create bot and set mode
     bot = InterviewBot(api_key, voice=selected_voice, language="en", interview_duration=interview_duration)
+    # Connect to the Realtime API while the interview context and questions load
+    bot.start_prewarm()
     
     if jd_content and resume_content:
         # Write temp files for load_interview_context
@@ -121,7 +123,7 @@ async def main():
                 f.write(questions_content)
         
         # Use load_interview_context which handles caching
-        bot.load_interview_context(temp_jd, temp_resume, temp_questions)
+        await asyncio.to_thread(bot.load_interview_context, temp_jd, temp_resume, temp_questions)
         
         # Cleanup temp files
         os.remove(temp_jd)
@@ -1,2 +1,9 @@
 # Makes backend_new a package
+import os
+import sys
 
+# The interview modules shared with the CLI bot use flat imports
+# (from prompts_repo import ...), so make backend/ importable for them too.
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if _BACKEND_DIR not in sys.path:
+    sys.path.append(_BACKEND_DIR)
@@ -1,32 +1,127 @@
 # audio_manager.py
-import pyaudio
+try:
+    import pyaudio
+except Exception:  # Only needed for real devices; file_audio.FileAudioManager runs without it
+    pyaudio = None
+import asyncio
 import threading
 import queue
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Queued on audio_queue after the last delta of a response (see end_response)
+END_OF_RESPONSE = b""
+
+
+class PlaybackRingBuffer:
+    """Preallocated PCM byte ring; copies in and out through memoryviews only"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._view = memoryview(bytearray(capacity))
+        self._read_pos = 0
+        self._size = 0
+        self._lock = threading.Lock()  # Producer/consumer is one thread; flushes may come from others
+
+    @property
+    def readable(self) -> int:
+        return self._size
+
+    def write(self, data) -> int:
+        """Copy as much of data as fits; returns the number of bytes written"""
+        with self._lock:
+            n = min(len(data), self.capacity - self._size)
+            if n <= 0:
+                return 0
+            start = (self._read_pos + self._size) % self.capacity
+            first = min(n, self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            if n > first:
+                self._view[:n - first] = data[first:n]
+            self._size += n
+            return n
+
+    def read_into(self, out) -> int:
+        """Move up to len(out) bytes into out; returns the number of bytes read"""
+        with self._lock:
+            n = min(len(out), self._size)
+            first = min(n, self.capacity - self._read_pos)
+            out[:first] = self._view[self._read_pos:self._read_pos + first]
+            if n > first:
+                out[first:n] = self._view[:n - first]
+            self._read_pos = (self._read_pos + n) % self.capacity
+            self._size -= n
+            return n
+
+    def clear(self) -> int:
+        """Drop everything buffered; returns the number of bytes dropped"""
+        with self._lock:
+            dropped = self._size
+            self._read_pos = 0
+            self._size = 0
+            return dropped
+
+
 class AudioManager:
-    def __init__(self, sample_rate=24000, chunk_size=512):
+    def __init__(self, sample_rate=24000, chunk_size=512, capture_queue_depth=64,
+                 playback_latency_ms=120, playback_capacity_ms=2000):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
-        self.audio = pyaudio.PyAudio()
+        self.audio = None  # PyAudio, opened with the streams
         self.audio_queue = queue.Queue()
-        self.audio_buffer = b""
         self.playback_thread = None
         self.playback_active = False
         self.input_stream = None
         self.output_stream = None
 
-    def start_streams(self, input_device_index=None, output_device_index=None):
+        # Microphone capture runs in PyAudio's callback thread and hands frames
+        # to the event loop through a bounded asyncio.Queue (oldest dropped).
+        self.capture_queue_depth = capture_queue_depth
+        self.capture_queue = None
+        self.capture_stats = {'frames_captured': 0, 'frames_dropped': 0, 'input_overflows': 0}
+        self._loop = None
+
+        # Playback: deltas from audio_queue are copied into a preallocated ring.
+        # Output starts once playback_latency_ms is buffered (jitter buffer) or
+        # the response ends, then drains in fixed-size writes.
+        bytes_per_ms = sample_rate * 2 // 1000
+        self.playback_latency_ms = playback_latency_ms
+        self.playback_target_bytes = playback_latency_ms * bytes_per_ms
+        self.playback_chunk_bytes = 2048  # ~43 ms per write bounds barge-in time-to-silence
+        self.playback_ring = PlaybackRingBuffer(
+            max(playback_capacity_ms * bytes_per_ms, self.playback_target_bytes + self.playback_chunk_bytes)
+        )
+        # ring_full_waits: a delta was held back because the ring was full (backpressure, nothing lost)
+        self.playback_stats = {'underruns': 0, 'ring_full_waits': 0, 'bytes_played': 0}
+        self.bytes_enqueued = 0
+
+        # Barge-in: flush_playback bumps the generation; the worker drops whatever
+        # it holds from the old generation and reports when the device goes quiet.
+        self._flush_lock = threading.Lock()
+        self._flush_generation = 0
+        self._writing = False
+        self._in_flight_bytes = 0
+        self._silence_callback = None
+        self._flush_started = None
+        # Latency tracking: called once, from the playback thread, when the next audio reaches the device
+        self._first_write_callback = None
+
+    def start_streams(self, input_device_index=None, output_device_index=None, loop=None):
         try:
+            self._loop = loop or asyncio.get_event_loop()
+            self.capture_queue = asyncio.Queue(maxsize=self.capture_queue_depth)
+            if self.audio is None:
+                self.audio = pyaudio.PyAudio()
             self.input_stream = self.audio.open(
                 format=pyaudio.paInt16,
                 channels=1,
                 rate=self.sample_rate,
                 input=True,
                 frames_per_buffer=self.chunk_size,
-                input_device_index=input_device_index
+                input_device_index=input_device_index,
+                stream_callback=self._capture_callback
             )
             self.output_stream = self.audio.open(
                 format=pyaudio.paInt16,
@@ -44,30 +139,166 @@ class AudioManager:
             logger.exception("Audio stream start failed")
             raise
 
+    def _capture_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio callback thread: never blocks, just schedules the frame on the loop"""
+        if status & pyaudio.paInputOverflow:
+            self.capture_stats['input_overflows'] += 1
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue_captured, in_data)
+        except RuntimeError:
+            return (None, pyaudio.paComplete)  # Event loop closed
+        return (None, pyaudio.paContinue)
+
+    def _enqueue_captured(self, data):
+        """Event loop side of the capture hand-off; drops the oldest frame when full"""
+        self.capture_stats['frames_captured'] += 1
+        if self.capture_queue.full():
+            self.capture_queue.get_nowait()
+            self.capture_stats['frames_dropped'] += 1
+        self.capture_queue.put_nowait(data)
+
+    def enqueue(self, audio_data: bytes):
+        """Queue a response audio delta for playback"""
+        self.bytes_enqueued += len(audio_data)
+        self.audio_queue.put(audio_data)
+
+    def has_pending_playback(self) -> bool:
+        return self._writing or self.playback_ring.readable > 0 or not self.audio_queue.empty()
+
+    def flush_playback(self, on_silence=None) -> int:
+        """Drop all queued and buffered output audio (barge-in).
+
+        on_silence(seconds) is called once the chunk already handed to the device
+        has finished, i.e. when the speaker actually goes quiet. Returns the number
+        of bytes dropped.
+        """
+        started = time.perf_counter()
+        dropped = 0
+        stop_requested = False
+        while True:
+            try:
+                audio_data = self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            if audio_data is None:
+                stop_requested = True
+            else:
+                dropped += len(audio_data)
+        if stop_requested:
+            self.audio_queue.put(None)
+        with self._flush_lock:
+            self._flush_generation += 1
+            self._first_write_callback = None
+            dropped += self.playback_ring.clear()
+            # Whatever was not dropped has been (or is being) played
+            self.bytes_enqueued = self.playback_stats['bytes_played'] + self._in_flight_bytes
+            if self._writing and on_silence:
+                self._flush_started = started
+                self._silence_callback = on_silence
+                on_silence = None
+        if on_silence:
+            on_silence(time.perf_counter() - started)
+        return dropped
+
+    def on_next_write(self, callback):
+        """Call callback(perf_counter) when the next output write starts; a flush cancels it"""
+        with self._flush_lock:
+            self._first_write_callback = callback
+
+    def end_response(self):
+        """Mark the end of a response so its tail plays without waiting for the jitter target"""
+        self.audio_queue.put(END_OF_RESPONSE)
+
     def _playback_worker(self):
-        buffer_size = 4096
+        ring = self.playback_ring
+        out = memoryview(bytearray(self.playback_chunk_bytes))
+        prime_timeout = self.playback_latency_ms / 1000
+        pending = None  # Part of a delta that did not fit in the ring yet
+        primed = False  # Jitter target reached (or response ended); output is running
+        response_ended = True
+        generation = self._flush_generation
         while self.playback_active:
-            try:
-                audio_data = self.audio_queue.get(timeout=0.1)
+            if generation != self._flush_generation:
+                generation = self._flush_generation
+                pending = None
+                primed = False
+                response_ended = True
+
+            # Block only when there is nothing left to play
+            if pending is None and ring.readable == 0:
+                if primed and not response_ended:
+                    self.playback_stats['underruns'] += 1
+                primed = False
+                audio_data = self.audio_queue.get()
                 if audio_data is None:
                     break
-                self.audio_buffer += audio_data
-                while len(self.audio_buffer) >= buffer_size and self.playback_active:
-                    chunk = self.audio_buffer[:buffer_size]
-                    self.audio_buffer = self.audio_buffer[buffer_size:]
-                    try:
-                        if self.output_stream and self.playback_active:
-                            self.output_stream.write(chunk)
-                    except Exception:
-                        break  # Exit on stream error
-            except queue.Empty:
-                if self.audio_buffer and self.playback_active:
+                generation = self._flush_generation  # Anything queued after a flush is current
+                pending = memoryview(audio_data)
+
+            # Move everything already queued into the ring until it is full
+            stop = False
+            while True:
+                if pending is not None:
+                    if len(pending) == 0:
+                        response_ended = True
+                        primed = True
+                    else:
+                        response_ended = False
+                    written = ring.write(pending)
+                    if written < len(pending):
+                        pending = pending[written:]
+                        self.playback_stats['ring_full_waits'] += 1
+                        break
+                    pending = None
+                try:
+                    audio_data = self.audio_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if audio_data is None:
+                    stop = True
+                    break
+                pending = memoryview(audio_data)
+            if stop:
+                break
+
+            if not primed:
+                if ring.readable < self.playback_target_bytes and pending is None:
                     try:
-                        if self.output_stream:
-                            self.output_stream.write(self.audio_buffer)
-                            self.audio_buffer = b""
-                    except Exception:
-                        break  # Exit on stream error
+                        audio_data = self.audio_queue.get(timeout=prime_timeout)
+                    except queue.Empty:
+                        primed = True  # Stream stalled; play what we have
+                    else:
+                        if audio_data is None:
+                            break
+                        pending = memoryview(audio_data)
+                        continue
+                else:
+                    primed = True
+
+            with self._flush_lock:
+                if generation != self._flush_generation:
+                    continue  # Flushed while we were filling the ring
+                n = ring.read_into(out)
+                self._writing = bool(n)
+                self._in_flight_bytes = n
+                first_write = self._first_write_callback if n else None
+                if first_write:
+                    self._first_write_callback = None
+            if first_write:
+                first_write(time.perf_counter())
+            if n and self.output_stream and self.playback_active:
+                try:
+                    self.output_stream.write(out[:n].toreadonly())
+                except Exception:
+                    logger.exception("Audio playback write failed")
+                    break
+            with self._flush_lock:
+                self.playback_stats['bytes_played'] += n
+                self._writing = False
+                self._in_flight_bytes = 0
+                callback, self._silence_callback = self._silence_callback, None
+            if callback:
+                callback(time.perf_counter() - self._flush_started)
 
     def stop(self):
         self.playback_active = False
@@ -86,6 +317,7 @@ class AudioManager:
         except Exception:
             pass  # Silent cleanup
         try:
-            self.audio.terminate()
+            if self.audio is not None:
+                self.audio.terminate()
         except Exception:
             pass  # Silent cleanup
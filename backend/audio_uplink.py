@@ -0,0 +1,151 @@
+# audio_uplink.py
+import base64
+import math
+from collections import deque
+import numpy as np
+
+# input_audio_buffer.append is sent ~10-50 times a second, so it is serialized
+# by concatenation instead of building a dict and running json.dumps each time.
+# Base64 output never contains characters that need JSON escaping.
+_APPEND_EVENT_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_APPEND_EVENT_SUFFIX = '"}'
+
+
+def encode_append_event(pcm: bytes) -> str:
+    """Serialize an input_audio_buffer.append event for the given PCM16 bytes"""
+    return _APPEND_EVENT_PREFIX + base64.b64encode(pcm).decode('ascii') + _APPEND_EVENT_SUFFIX
+
+
+class FrameCoalescer:
+    """Coalesces PCM16 capture frames into one upload per aggregation window.
+
+    A window of 0 ms disables coalescing (every frame is flushed on its own).
+    """
+
+    def __init__(self, sample_rate: int = 24000, window_ms: int = 100):
+        self.sample_rate = sample_rate
+        self.window_ms = window_ms
+        # Whole 16-bit samples only
+        self.target_bytes = max(2, int(sample_rate * 2 * window_ms / 1000) & ~1)
+        self._buffer = bytearray()
+
+    def add(self, frame: bytes):
+        """Append a frame; returns the coalesced payload once the window is full"""
+        self._buffer += frame
+        if len(self._buffer) >= self.target_bytes:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Return whatever is buffered (or None) and reset the window"""
+        if not self._buffer:
+            return None
+        payload = bytes(self._buffer)
+        self._buffer.clear()
+        return payload
+
+    def __len__(self):
+        return len(self._buffer)
+
+
+class VadGate:
+    """Local voice activity gate in front of the uplink.
+
+    Each PCM16 frame is scored by RMS energy and zero-crossing rate, averaged
+    over a short sliding window. Speech opens the gate and releases the
+    buffered pre-roll first; the gate closes after hangover_ms without speech.
+    The hangover must be longer than the server VAD silence_duration_ms, or the
+    server never hears the end of the turn. While closed, frames are suppressed
+    and a short block of digital silence is sent every keepalive_ms instead.
+    """
+
+    def __init__(self, sample_rate: int = 24000, energy_threshold: float = 0.01, zcr_max: float = 0.35,
+                 window_frames: int = 3, pre_roll_ms: int = 300, hangover_ms: int = 2000,
+                 keepalive_ms: int = 5000):
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.zcr_max = zcr_max
+        self.pre_roll_bytes = int(sample_rate * 2 * pre_roll_ms / 1000)
+        self.hangover_bytes = int(sample_rate * 2 * hangover_ms / 1000)
+        self.keepalive_bytes = int(sample_rate * 2 * keepalive_ms / 1000)
+        self._keepalive_frame = bytes(int(sample_rate * 2 * 0.02) & ~1)  # 20 ms of silence
+
+        self.is_open = False
+        self.last_rms = 0.0
+        self.last_zcr = 0.0
+        self.stats = {'frames_in': 0, 'frames_suppressed': 0, 'keepalives_sent': 0}
+
+        self._window = deque(maxlen=window_frames)
+        self._pre_roll = deque()
+        self._pre_roll_size = 0
+        self._silence_run = 0   # Bytes since the last voiced frame (gate open)
+        self._suppressed_run = 0  # Bytes suppressed since the last keep-alive (gate closed)
+
+        # Scratch arrays reused across frames of the same size
+        self._frame_samples = 0
+        self._squares = None
+        self._signs = None
+        self._crossings = None
+
+    def _allocate(self, samples: int):
+        self._frame_samples = samples
+        self._squares = np.empty(samples, dtype=np.int32)
+        self._signs = np.empty(samples, dtype=bool)
+        self._crossings = np.empty(max(samples - 1, 0), dtype=bool)
+
+    def analyze(self, frame: bytes):
+        """RMS (0..1) and zero-crossing rate of one frame, without per-frame float copies"""
+        samples = np.frombuffer(frame, dtype=np.int16)
+        n = samples.size
+        if n == 0:
+            return 0.0, 0.0
+        if n != self._frame_samples:
+            self._allocate(n)
+        np.multiply(samples, samples, out=self._squares, dtype=np.int32)
+        rms = math.sqrt(int(self._squares.sum(dtype=np.int64)) / n) / 32768.0
+        if n < 2:
+            return rms, 0.0
+        np.signbit(samples, out=self._signs)
+        np.not_equal(self._signs[1:], self._signs[:-1], out=self._crossings)
+        zcr = int(np.count_nonzero(self._crossings)) / (n - 1)
+        return rms, zcr
+
+    def process(self, frame: bytes) -> list:
+        """Feed one capture frame; returns the frames to upload (possibly none)"""
+        self.stats['frames_in'] += 1
+        self.last_rms, self.last_zcr = self.analyze(frame)
+        self._window.append((self.last_rms, self.last_zcr))
+        window_rms = sum(r for r, _ in self._window) / len(self._window)
+        window_zcr = sum(z for _, z in self._window) / len(self._window)
+        voiced = window_rms > self.energy_threshold and window_zcr < self.zcr_max
+
+        if voiced:
+            self._silence_run = 0
+            if not self.is_open:
+                self.is_open = True
+                self._suppressed_run = 0
+                released = list(self._pre_roll)
+                released.append(frame)
+                self._pre_roll.clear()
+                self._pre_roll_size = 0
+                return released
+            return [frame]
+
+        if self.is_open:
+            self._silence_run += len(frame)
+            if self._silence_run < self.hangover_bytes:
+                return [frame]
+            self.is_open = False
+
+        # Gate closed: keep the frame as pre-roll and send a keep-alive now and then
+        self.stats['frames_suppressed'] += 1
+        self._pre_roll.append(frame)
+        self._pre_roll_size += len(frame)
+        while self._pre_roll_size - len(self._pre_roll[0]) >= self.pre_roll_bytes:
+            self._pre_roll_size -= len(self._pre_roll.popleft())
+        self._suppressed_run += len(frame)
+        if self.keepalive_bytes and self._suppressed_run >= self.keepalive_bytes:
+            self._suppressed_run = 0
+            self.stats['keepalives_sent'] += 1
+            return [self._keepalive_frame]
+        return []
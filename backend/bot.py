@@ -6,28 +6,26 @@ import time
 import threading
 import queue
 import os
-import hashlib
 from datetime import datetime
 import openai
 import websockets
-import numpy as np
 import logging
 from audio_manager import AudioManager
-from interview_utils import (
-    extract_resume_content,
-    extract_job_title,
-    extract_candidate_name,
-    get_time_greeting,
-    generate_interview_questions
-)
+from audio_uplink import FrameCoalescer, VadGate, encode_append_event
+from recording_store import RecordingStore
+from realtime_pool import RealtimePool
+from realtime_reconnect import RealtimeReconnector
+from interview_utils import generate_interview_questions
+from instruction_builder import get_instruction_builder, categorize_custom_questions
 from phase_manager import PhaseManager
+from phase_scheduler import PhaseScheduler
+from question_cache import get_question_cache, questions_cache_key
 from session_manager import SessionManager
 from evaluation import call_comprehensive_evaluation, save_json
+from rolling_evaluation import RollingEvaluator
+from transcript_builder import TranscriptBuilder
+from question_coverage import QuestionCoverage
 from prompts_repo import (
-    INTERVIEW_BASE_INSTRUCTIONS,
-    SHORT_INTERVIEW_STRUCTURE,
-    MEDIUM_INTERVIEW_STRUCTURE, 
-    FULL_INTERVIEW_STRUCTURE,
     STANDARD_CONVERSATION_INSTRUCTIONS,
     TRANSCRIPTION_PROMPT_TEMPLATE
 )
@@ -36,23 +34,43 @@ from logger_config import get_logger
 logger = get_logger("InterviewBot")
 
 class InterviewBot:
-    def __init__(self, api_key: str, voice: str = "cedar", language: str = "en", interview_duration: int = 30):
+    def __init__(self, api_key: str, voice: str = "cedar", language: str = "en", interview_duration: int = 30, audio_send_window_ms: int = 100, recording_max_mb: int = None, client_vad: bool = True, evaluation_segment_exchanges: int = 6, phase_instructions: bool = True, audio_manager: AudioManager = None, realtime_url: str = None):
         # keep same attribute names and defaults as original
         self.api_key = api_key
         self.voice = voice
         self.language = language
         self.interview_duration = interview_duration
         self.websocket = None
+        # The Realtime connection is opened ahead of time (see start_prewarm)
+        self.realtime_pool = RealtimePool(api_key, url=realtime_url, size=1)
+        self._prewarm_task = None
+        self._recovery_task = None
         print("I am here ")
-        # Reuse AudioManager
-        self.audio_manager = AudioManager(sample_rate=24000, chunk_size=512)
+        # Reuse AudioManager (benchmarks pass a file_audio.FileAudioManager)
+        self.audio_manager = audio_manager or AudioManager(sample_rate=24000, chunk_size=512)
         self.input_stream = None
         self.output_stream = None
         self.audio_queue = self.audio_manager.audio_queue
+        # Mic frames are coalesced into one input_audio_buffer.append per window
+        # (latency vs. CPU/syscalls trade-off; 0 sends every capture frame)
+        self.audio_send_window_ms = audio_send_window_ms
+        self._uplink_coalescer = FrameCoalescer(self.audio_manager.sample_rate, audio_send_window_ms)
+        # Local VAD keeps long silences off the websocket. Its hangover (2 s) must
+        # outlast the server VAD silence_duration_ms so turns still end server-side.
+        self.client_vad = client_vad
+        self._vad_gate = VadGate(self.audio_manager.sample_rate, pre_roll_ms=500, hangover_ms=2000)
 
         # Initialize managers
         self.phase_manager = PhaseManager(interview_duration)
         self.session_manager = SessionManager(voice, False)  # Will be updated when interview_mode is set
+        self.session_manager.performance_metrics['audio_send_window_ms'] = audio_send_window_ms
+        self.session_manager.performance_metrics['vad'] = self._vad_gate.stats
+        # Dropped Realtime connections are reopened and restored instead of ending the interview
+        self.reconnector = RealtimeReconnector(
+            self.realtime_pool, self._session_config, lambda: self.session_manager.conversation,
+            replay_exchanges=6, sample_rate=self.audio_manager.sample_rate
+        )
+        self.session_manager.performance_metrics['reconnect'] = self.reconnector.stats
         
         # conversation state (kept same)
         self.running = True
@@ -64,10 +82,27 @@ class InterviewBot:
         self.prescreening_questions = []
         self.technical_custom_questions = []
         self.evaluation_data = None
-        self.audio_buffer = []  # Store bot audio for evaluation
-        self.user_audio_buffer = []  # Store user audio for evaluation
-        self.raw_user_audio_buffer = []  # Store all raw user audio
+        self.evaluation_job_id = None
+        # Segments are scored during the interview (0 evaluates the whole transcript at the end)
+        self.evaluation_segment_exchanges = evaluation_segment_exchanges
+        self.rolling_evaluator = None
+        self.phase_manager.phase_listeners.append(self._on_phase_change)
+        # Send only the current phase's instructions and swap them on phase deadlines
+        # (False keeps the single all-phases prompt)
+        self.phase_instructions = phase_instructions
+        self.session_manager.performance_metrics['phase_transitions'] = []
+        self.phase_scheduler = PhaseScheduler(
+            self.phase_manager, self._phase_instructions, self.send_event,
+            self.session_manager.performance_metrics['phase_transitions']
+        )
         self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Audio for evaluation is streamed to WAV segments on disk, not kept in RAM
+        recordings_dir = os.path.join("Data/recordings", self.session_id)
+        recording_max_bytes = recording_max_mb * 1024 * 1024 if recording_max_mb else None
+        sample_rate = self.audio_manager.sample_rate
+        self.audio_buffer = RecordingStore(recordings_dir, "bot_audio", sample_rate, max_bytes=recording_max_bytes)  # Bot audio
+        self.user_audio_buffer = RecordingStore(recordings_dir, "user_audio", sample_rate, max_bytes=recording_max_bytes)  # Voiced user audio
+        self.raw_user_audio_buffer = RecordingStore(recordings_dir, "raw_user_audio", sample_rate, max_bytes=recording_max_bytes)  # All user audio
 
         # response accumulation and locks
         self._current_response_text = ""
@@ -76,40 +111,27 @@ class InterviewBot:
         self._response_start_time = None
         self._response_in_progress = False
         self._response_lock = threading.Lock()
+        # perf_counter timestamps of the current turn (see _finish_turn)
+        self._turn = {}
+        self._loop = None
+
+        # Barge-in bookkeeping: playback offsets of the assistant audio item being played
+        self._current_audio_item_id = None
+        self._current_item_audio_start = 0
+        self._current_item_audio_bytes = 0
+        self._interrupted_item_id = None
         
         # Exit phrases for interview context
         self.exit_phrases = ['end interview', 'stop interview', 'finish interview', 'conclude interview']
-        
-        # Question caching
-        self.questions_cache_dir = "Data/cache"
-        os.makedirs(self.questions_cache_dir, exist_ok=True)
-
-    def _get_content_hash(self, jd_content: str, resume_content: str) -> str:
-        """Generate hash for JD and resume content to check for changes"""
-        combined_content = f"{jd_content.strip()}|||{resume_content.strip()}"
-        return hashlib.md5(combined_content.encode()).hexdigest()
-    
-    def _load_cached_questions(self, content_hash: str) -> dict:
-        """Load cached questions if available"""
-        cache_file = os.path.join(self.questions_cache_dir, f"questions_{content_hash}.json")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cached questions: {e}")
-        return None
-    
-    def _save_questions_to_cache(self, content_hash: str, questions_data: dict):
-        """Save generated questions to cache"""
-        cache_file = os.path.join(self.questions_cache_dir, f"questions_{content_hash}.json")
-        try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(questions_data, f, ensure_ascii=False, indent=2)
-            print(f"💾 Questions saved to: {cache_file}")
-            logger.info(f"Questions cached: {cache_file}")
-        except Exception as e:
-            logger.warning(f"Failed to cache questions: {e}")
+
+    def _get_interview_questions(self) -> dict:
+        """Generated questions for the current JD/resume, via the shared question cache"""
+        questions = get_question_cache().get_or_compute(
+            questions_cache_key(self.job_description, self.candidate_resume),
+            lambda: generate_interview_questions(self.api_key, self.job_description, self.candidate_resume)
+        )
+        self.phase_manager.interview_questions_data = questions or {}
+        return questions or {}
 
     # ---------------------------
     # Context loading
@@ -133,21 +155,8 @@ class InterviewBot:
                 # Update session manager for interview mode
                 self.session_manager.interview_mode = True
                 
-                # Check for cached questions first
-                content_hash = self._get_content_hash(self.job_description, self.candidate_resume)
-                cached_questions = self._load_cached_questions(content_hash)
                 print("interview context loaded")
-                if cached_questions:
-                    cache_file = os.path.join(self.questions_cache_dir, f"questions_{content_hash}.json")
-                    print(f"💾 Using cached questions from: {cache_file}")
-                    self.interview_questions_data = cached_questions
-                    self.phase_manager.interview_questions_data = cached_questions
-                else:
-                    print("🤖 Generating new questions with GPT-4o...")
-                    self.interview_questions_data = generate_interview_questions(self.api_key, self.job_description, self.candidate_resume)
-                    if self.interview_questions_data:
-                        self._save_questions_to_cache(content_hash, self.interview_questions_data)
-                        self.phase_manager.interview_questions_data = self.interview_questions_data
+                self.interview_questions_data = self._get_interview_questions()
                 
                 # Log question results
                 if self.interview_questions_data:
@@ -156,6 +165,17 @@ class InterviewBot:
                     project_count = len(self.interview_questions_data.get('project_questions', []))
                     print(f"✅ Loaded {tech_count} technical, {behavioral_count} behavioral, {project_count} project questions")
                 
+                if self.evaluation_segment_exchanges > 0:
+                    self.rolling_evaluator = RollingEvaluator(
+                        self.api_key, self.job_description, self.candidate_resume, self.evaluation_segment_exchanges
+                    )
+
+                self.session_manager.question_coverage = QuestionCoverage(
+                    prescreening_questions=self.prescreening_questions,
+                    technical_custom_questions=self.technical_custom_questions,
+                    custom_questions=self.custom_questions
+                )
+
                 total_custom = len(self.custom_questions) + len(self.prescreening_questions) + len(self.technical_custom_questions)
                 if total_custom > 0:
                     print(f"✅ Loaded {total_custom} custom questions ({len(self.prescreening_questions)} pre-screening, {len(self.technical_custom_questions)} technical, {len(self.custom_questions)} general)")
@@ -164,210 +184,60 @@ class InterviewBot:
             logger.exception("Error loading context")
             self.interview_mode = False
 
+    def _on_phase_change(self, old_phase, new_phase):
+        """Phase listener registered once; forwards to whichever evaluator is current"""
+        if self.rolling_evaluator:
+            self.rolling_evaluator.on_phase_change(old_phase, new_phase)
+
     def get_interview_instructions(self):
         """Generate context-aware interview instructions using prompts_repo templates"""
         if not self.interview_mode:
             return STANDARD_CONVERSATION_INSTRUCTIONS
-            
-        # Extract dynamic elements
-        resume_projects = extract_resume_content(self.candidate_resume)
-        job_title = extract_job_title(self.job_description)
-        candidate_name = extract_candidate_name(self.candidate_resume)
-        time_greeting = get_time_greeting()
-        voice_title = self.voice.title()
         
         # Use cached questions if available, otherwise generate
         if not self.interview_questions_data:
-            content_hash = self._get_content_hash(self.job_description, self.candidate_resume)
-            cached_questions = self._load_cached_questions(content_hash)
-            
-            if cached_questions:
-                self.interview_questions_data = cached_questions
-                self.phase_manager.interview_questions_data = cached_questions
-            else:
-                self.interview_questions_data = generate_interview_questions(
-                    self.api_key, self.job_description, self.candidate_resume
-                )
-                if self.interview_questions_data:
-                    self._save_questions_to_cache(content_hash, self.interview_questions_data)
-                    self.phase_manager.interview_questions_data = self.interview_questions_data
-        
-        tech_categories = [q.get('category', '') for q in self.interview_questions_data.get('technical_questions', [])]
-        skills_focus = ', '.join(set(tech_categories[:5])) if tech_categories else 'general technical skills'
-        tech_section = skills_focus if skills_focus != 'general technical skills' else 'Core technical skills, problem-solving'
-        
-        # Format generated questions for prompt
-        generated_questions_section = self._format_generated_questions()
-        
-        # Format custom questions for prompt
-        custom_questions_section = self._format_custom_questions()
-        
-        # Select appropriate interview structure template
-        if self.interview_duration <= 10:
-            interview_structure = SHORT_INTERVIEW_STRUCTURE.format(
-                duration=self.interview_duration,
-                time_greeting=time_greeting,
-                candidate_name=candidate_name,
-                voice_title=voice_title,
-                job_title=job_title,
-                focused_time=self.interview_duration - 2
-            )
-        elif self.interview_duration <= 20:
-            interview_structure = MEDIUM_INTERVIEW_STRUCTURE.format(
-                duration=self.interview_duration,
-                time_greeting=time_greeting,
-                candidate_name=candidate_name,
-                voice_title=voice_title,
-                job_title=job_title,
-                project_time=self.interview_duration - 5
-            )
-        else:
-            interview_structure = FULL_INTERVIEW_STRUCTURE.format(
-                duration=self.interview_duration,
-                time_greeting=time_greeting,
-                candidate_name=candidate_name,
-                voice_title=voice_title,
-                job_title=job_title
-            )
+            self.interview_questions_data = self._get_interview_questions()
         
-        # Use template from prompts_repo
-        return INTERVIEW_BASE_INSTRUCTIONS.format(
-            voice_title=voice_title,
-            job_title=job_title,
-            candidate_name=candidate_name,
-            time_greeting=time_greeting,
-            candidate_resume=self.candidate_resume[:1500],
-            job_description=self.job_description[:1500],
-            interview_structure=interview_structure,
-            tech_section=tech_section,
-            resume_projects=resume_projects,
-            generated_questions_section=generated_questions_section,
-            custom_questions_section=custom_questions_section
+        if self.phase_instructions:
+            return self._phase_instructions(None, self.phase_manager.interview_phase)
+        return get_instruction_builder().build(
+            self.job_description,
+            self.candidate_resume,
+            self.interview_questions_data,
+            interview_duration=self.interview_duration,
+            voice=self.voice,
+            prescreening_questions=self.prescreening_questions,
+            technical_custom_questions=self.technical_custom_questions,
+            custom_questions=self.custom_questions
         )
     
+    def _phase_instructions(self, old_phase, new_phase):
+        """Instructions for one phase, with only the recruiter questions not yet asked"""
+        coverage = self.session_manager.question_coverage
+        remaining = (lambda category: coverage.remaining(category)) if coverage else (lambda category: getattr(self, category))
+        return get_instruction_builder().build_phase(
+            new_phase,
+            self.job_description,
+            self.candidate_resume,
+            self.interview_questions_data,
+            phase_minutes=self.phase_manager.phase_durations.get(new_phase, 5),
+            voice=self.voice,
+            prescreening_questions=remaining('prescreening_questions'),
+            technical_custom_questions=remaining('technical_custom_questions'),
+            custom_questions=remaining('custom_questions'),
+            transition_note=self.phase_manager.get_phase_transition_instruction(old_phase, new_phase, self.candidate_resume) if old_phase else ""
+        )
+
     def _all_custom_questions_covered(self):
-        """Check if all custom questions have been mentioned in conversation"""
-        if not self.custom_questions:
-            return True
-        
-        conversation_text = " ".join([ex.get('bot', '') for ex in self.session_manager.conversation]).lower()
-        covered_count = 0
-        
-        for question in self.custom_questions:
-            # More strict matching - need substantial overlap
-            question_lower = question.lower()
-            if len(question_lower) > 20:  # For longer questions, check if significant portion appears
-                question_parts = [part.strip() for part in question_lower.split() if len(part) > 4]
-                matches = sum(1 for part in question_parts if part in conversation_text)
-                if matches >= len(question_parts) * 0.6:  # 60% of significant words must match
-                    covered_count += 1
-            else:  # For shorter questions, need exact phrase match
-                if question_lower in conversation_text:
-                    covered_count += 1
-        
-        return covered_count >= len(self.custom_questions)  # All questions must be covered
+        """Check if all recruiter questions (pre-screening, technical, general) have been asked"""
+        coverage = self.session_manager.question_coverage
+        return coverage is None or coverage.all_covered()
     
     def _get_remaining_custom_questions(self):
-        """Get custom questions that haven't been covered yet"""
-        if not self.custom_questions:
-            return []
-        
-        conversation_text = " ".join([ex.get('bot', '') for ex in self.session_manager.conversation]).lower()
-        remaining = []
-        
-        for question in self.custom_questions:
-            question_lower = question.lower()
-            covered = False
-            
-            if len(question_lower) > 20:  # For longer questions
-                question_parts = [part.strip() for part in question_lower.split() if len(part) > 4]
-                matches = sum(1 for part in question_parts if part in conversation_text)
-                if matches >= len(question_parts) * 0.6:
-                    covered = True
-            else:  # For shorter questions
-                if question_lower in conversation_text:
-                    covered = True
-            
-            if not covered:
-                remaining.append(question)
-        
-        return remaining
-    
-    def _format_generated_questions(self):
-        """Format LLM-generated questions for prompt inclusion"""
-        if not self.interview_questions_data:
-            return "No generated questions available - use general interview approach."
-        
-        sections = []
-        
-        # Technical Questions
-        tech_questions = self.interview_questions_data.get('technical_questions', [])
-        if tech_questions:
-            sections.append("TECHNICAL QUESTIONS (LLM-Generated):")
-            for i, q in enumerate(tech_questions[:5], 1):
-                category = q.get('category', 'General')
-                question = q.get('question', '')
-                difficulty = q.get('difficulty', 'medium')
-                follow_up = q.get('follow_up', '')
-                sections.append(f"{i}. [{category}] {question} (Difficulty: {difficulty})")
-                if follow_up:
-                    sections.append(f"   Follow-up: {follow_up}")
-        
-        # Project Questions
-        project_questions = self.interview_questions_data.get('project_questions', [])
-        if project_questions:
-            sections.append("\nPROJECT-SPECIFIC QUESTIONS (LLM-Generated):")
-            for i, q in enumerate(project_questions[:3], 1):
-                project = q.get('project', 'Recent Project')
-                question = q.get('question', '')
-                follow_up = q.get('follow_up', '')
-                sections.append(f"{i}. [Project: {project}] {question}")
-                if follow_up:
-                    sections.append(f"   Follow-up: {follow_up}")
-        
-        # Behavioral Questions
-        behavioral_questions = self.interview_questions_data.get('behavioral_questions', [])
-        if behavioral_questions:
-            sections.append("\nBEHAVIORAL QUESTIONS (LLM-Generated):")
-            for i, q in enumerate(behavioral_questions[:3], 1):
-                category = q.get('category', 'General')
-                question = q.get('question', '')
-                context = q.get('context', '')
-                sections.append(f"{i}. [{category}] {question}")
-                if context:
-                    sections.append(f"   Context: {context}")
-        
-        if not sections:
-            return "No generated questions available - use general interview approach."
-        
-        sections.append("\nUSAGE: Reference these questions systematically during the interview. Use them as your primary question bank.")
-        return "\n".join(sections)
+        """Get recruiter questions that haven't been covered yet"""
+        coverage = self.session_manager.question_coverage
+        return coverage.remaining() if coverage is not None else []
     
-    def _format_custom_questions(self):
-        """Format custom recruiter questions for prompt inclusion"""
-        if not self.custom_questions and not self.prescreening_questions and not self.technical_custom_questions:
-            return "No custom recruiter questions provided."
-        
-        sections = []
-        
-        if self.prescreening_questions:
-            sections.append("PRE-SCREENING QUESTIONS (Ask after introduction):")
-            for i, question in enumerate(self.prescreening_questions, 1):
-                sections.append(f"{i}. {question}")
-        
-        if self.technical_custom_questions:
-            sections.append("\nTECHNICAL CUSTOM QUESTIONS (Ask during technical phase):")
-            for i, question in enumerate(self.technical_custom_questions, 1):
-                sections.append(f"{i}. {question}")
-        
-        if self.custom_questions:
-            sections.append("\nGENERAL CUSTOM QUESTIONS (Ask during appropriate phases):")
-            for i, question in enumerate(self.custom_questions, 1):
-                sections.append(f"{i}. {question}")
-        
-        sections.append("\nUSAGE: Integrate these questions naturally during specified interview phases. These are recruiter-specific requirements that must be covered.")
-        return "\n".join(sections)
-
     def check_exit_condition(self, text):
         if self.interview_mode:
             text_lower = text.lower().strip()
@@ -380,37 +250,52 @@ class InterviewBot:
     # ---------------------------
     # Connect & session config
     # ---------------------------
+    def start_prewarm(self):
+        """Open the Realtime connection in the background, e.g. while interview context loads"""
+        if self._prewarm_task is None:
+            self._prewarm_task = asyncio.get_running_loop().create_task(self.realtime_pool.fill())
+        return self._prewarm_task
+
     async def connect(self):
-        url = "wss://api.openai.com/v1/realtime?model=gpt-realtime"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "OpenAI-Beta": "realtime=v1"
-        }
         try:
-            self.websocket = await websockets.connect(url, additional_headers=headers)
+            connect_started = time.perf_counter()
+            self.websocket = await self.realtime_pool.acquire()
+            self.session_manager.performance_metrics['connect_wait_ms'] = round((time.perf_counter() - connect_started) * 1000, 1)
+            self.session_manager.performance_metrics['realtime_pool'] = self.realtime_pool.stats
             mode = "Interview" if self.interview_mode else "Conversation"
             print(f"✅ Connected to OpenAI Realtime API ({mode} mode)")
 
-            # Session configuration optimized for interview accuracy
+            session_config = self._session_config()
+            await self.send_event(session_config)
+            print(f"🔧 Session configured for {'interview' if self.interview_mode else 'conversation'} with {self.voice} voice")
+            if self.interview_mode:
+                self.phase_manager.start_interview()
+        except Exception as e:
+            logger.exception("Connect failed")
+            raise
+
+    def _session_config(self) -> dict:
+        """session.update event for the current mode, voice and (phase) instructions"""
+        # Session configuration optimized for interview accuracy
+        turn_detection_config = {
+            "type": "server_vad",
+            "threshold": 0.76, # Slightly less sensitive for cleaner audio
+            "prefix_padding_ms": 900,  # More padding for complete speech capture
+            "silence_duration_ms": 1500, # Longer pause for technical explanations
+            "create_response": True
+        }
+        
+        # Use semantic turn detection for non-interview mode for better conversation flow
+        if not self.interview_mode:
             turn_detection_config = {
                 "type": "server_vad",
-                "threshold": 0.76, # Slightly less sensitive for cleaner audio
-                "prefix_padding_ms": 900,  # More padding for complete speech capture
-                "silence_duration_ms": 1500, # Longer pause for technical explanations
-                "create_response": True
+                "threshold": 0.3,  # Very sensitive for natural conversation
+                "prefix_padding_ms": 600,  # Extra padding for natural speech
+                "silence_duration_ms": 1000 
             }
-            
-            # Use semantic turn detection for non-interview mode for better conversation flow
-            if not self.interview_mode:
-                turn_detection_config = {
-                    "type": "server_vad",
-                    "threshold": 0.3,  # Very sensitive for natural conversation
-                    "prefix_padding_ms": 600,  # Extra padding for natural speech
-                    "silence_duration_ms": 1000 
-                }
-
-            # Enhanced transcription optimized for technical accuracy
-            transcription_prompt = """PRIORITY:
+
+        # Enhanced transcription optimized for technical accuracy
+        transcription_prompt = """PRIORITY:
     1 Transcribe ONLY clear speech. If audio is unclear or contains only noise, return empty. Never guess or add words not clearly spoken.
     2. Keep natural speech patterns: um, uh, like, you know, so, well, actually, basically
     3) Mark hesitations with (...)
@@ -421,78 +306,125 @@ class InterviewBot:
     8) Focus on accuracy over emotional markers.
     """
 
-            session_config = {
-                "type": "session.update",
-                "session": {
-                    "modalities": ["text", "audio"],
-                    "instructions": self.get_interview_instructions(),
-                    "voice": self.voice,
-                    "input_audio_format": "pcm16",
-                    "output_audio_format": "pcm16",
-                    "input_audio_transcription": {
-                        "model": "gpt-4o-transcribe",
-                        "prompt": transcription_prompt,
-                        "language": "en"
-                    },
-                    "input_audio_noise_reduction": {
-                        "type": "near_field"
-                    },
-                    "turn_detection": turn_detection_config
-                }
+        return {
+            "type": "session.update",
+            "session": {
+                "modalities": ["text", "audio"],
+                "instructions": self.get_interview_instructions(),
+                "voice": self.voice,
+                "input_audio_format": "pcm16",
+                "output_audio_format": "pcm16",
+                "input_audio_transcription": {
+                    "model": "gpt-4o-transcribe",
+                    "prompt": transcription_prompt,
+                    "language": "en"
+                },
+                "input_audio_noise_reduction": {
+                    "type": "near_field"
+                },
+                "turn_detection": turn_detection_config
             }
-
-            await self.send_event(session_config)
-            print(f"🔧 Session configured for {'interview' if self.interview_mode else 'conversation'} with {self.voice} voice")
-            if self.interview_mode:
-                self.phase_manager.start_interview()
-        except Exception as e:
-            logger.exception("Connect failed")
-            raise
+        }
 
     async def send_event(self, event: dict):
+        await self.send_raw_event(json.dumps(event))
+
+    async def send_raw_event(self, message: str) -> bool:
+        """Send one event; False if it was not sent (a dropped connection starts a recovery)"""
+        if not self.running:
+            return False  # Shutting down: nothing to reconnect for
         try:
-            if self.websocket:
-                await self.websocket.send(json.dumps(event))
+            if self.websocket and not self.reconnector.recovering:
+                await self.websocket.send(message)
+                return True
         except (websockets.exceptions.ConnectionClosed, websockets.exceptions.ConnectionClosedError):
-            logger.warning("WebSocket connection closed, stopping bot")
-            self.running = False
+            logger.warning("WebSocket connection closed while sending, reconnecting")
+            self._start_recovery()
         except Exception:
             logger.exception("Failed to send event")
+        return False
+
+    def _start_recovery(self):
+        if self.running and not self.reconnector.recovering:
+            self._recovery_task = asyncio.get_running_loop().create_task(self._recover())
+
+    async def _recover(self) -> bool:
+        """Reconnect and restore the session; stops the bot if that fails"""
+        if not self.running:
+            return False
+        websocket = await self.reconnector.recover()
+        if websocket is None:
+            print("\n🔌 Connection lost")
+            self.running = False
+            return False
+        if websocket is not self.websocket:
+            self.websocket = websocket
+            # The interrupted response is gone with the old session
+            self._response_in_progress = False
+            self._current_response_text = ""
+            print("\n🔁 Reconnected to OpenAI Realtime API")
+        return True
 
     # ---------------------------
     # Audio & event loops
     # ---------------------------
     def start_audio_stream(self):
-        self.audio_manager.start_streams()
+        self._loop = asyncio.get_running_loop()
+        self.audio_manager.start_streams(loop=self._loop)
         # local input_stream / output_stream point to audio_manager streams for compatibility
         self.input_stream = self.audio_manager.input_stream
         self.output_stream = self.audio_manager.output_stream
+        self.session_manager.performance_metrics['capture'] = self.audio_manager.capture_stats
+        self.session_manager.performance_metrics['playback'] = self.audio_manager.playback_stats
         print("🎵 Audio streams ready")
 
     async def handle_audio_input(self):
         print("🎤 Listening...")
+        capture_queue = self.audio_manager.capture_queue
         while self.running:
             try:
-                data = self.input_stream.read(self.audio_manager.chunk_size, exception_on_overflow=False)
+                try:
+                    data = await asyncio.wait_for(capture_queue.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    await self._send_audio(self._uplink_coalescer.flush())
+                    continue  # Re-check self.running
                 # Store all raw user audio for evaluation
                 if self.interview_mode:
                     self.raw_user_audio_buffer.append(data)
-                audio_array = np.frombuffer(data, dtype=np.int16)
-                energy = np.sqrt((audio_array.astype(np.float32) / 32768.0) ** 2).mean()
-                if energy > 0.008:
+                if self.client_vad:
+                    outgoing = self._vad_gate.process(data)
+                    rms = self._vad_gate.last_rms
+                else:
+                    outgoing = [data]
+                    rms, _ = self._vad_gate.analyze(data)
+                if rms > self._vad_gate.energy_threshold:
                     # Store filtered user audio for evaluation
                     if self.interview_mode:
                         self.user_audio_buffer.append(data)
-                # metrics
-                self.session_manager.performance_metrics['audio_chunks_sent'] += 1
-                self.session_manager.performance_metrics['total_audio_input_bytes'] += len(data)
-                self.session_manager.input_audio_seconds += len(data) / (self.audio_manager.sample_rate * 2)
-                # send
-                await self.send_event({"type":"input_audio_buffer.append","audio": base64.b64encode(data).decode()})
-                await asyncio.sleep(0.0001)
+                for frame in outgoing:
+                    # metrics
+                    self.session_manager.performance_metrics['audio_chunks_sent'] += 1
+                    self.session_manager.performance_metrics['total_audio_input_bytes'] += len(frame)
+                    self.session_manager.input_audio_seconds += len(frame) / (self.audio_manager.sample_rate * 2)
+                    # send once the aggregation window is full
+                    await self._send_audio(self._uplink_coalescer.add(frame))
+                if self.client_vad and not self._vad_gate.is_open:
+                    # Gate closed: don't hold the tail of the utterance (or a keep-alive) back
+                    await self._send_audio(self._uplink_coalescer.flush())
             except Exception:
                 logger.exception("Audio input handling error")
                 break
+        await self._send_audio(self._uplink_coalescer.flush())
+
+    async def _send_audio(self, pcm):
+        if not pcm:
+            return
+        message = encode_append_event(pcm)
+        if not await self.send_raw_event(message):
+            # Held for the reconnect so the candidate's words are not lost
+            self.reconnector.buffer_audio(message, len(pcm))
+            return
+        self.session_manager.record_audio_event(len(message))
 
     async def handle_openai_events(self):
         while self.running:
@@ -512,34 +444,55 @@ class InterviewBot:
                             self._accumulated_user_text = transcript
                         
                         self._last_user_speech_time = time.time()
+                        self._mark_turn('transcription_completed')
                         
                         # Check exit condition
                         if self.check_exit_condition(transcript):
                             if self.interview_mode:
                                 print("\n🔄 Generating evaluation before exit...")
-                                self._generate_evaluation_sync()
+                                await self._generate_evaluation()
                             await asyncio.sleep(1.0)
                             self.running = False
                             return
                 elif event_type == "input_audio_buffer.speech_started":
                     print("🗣️  Speaking...", end='\r')
+                    await self._handle_barge_in()
                 elif event_type == "input_audio_buffer.speech_stopped":
                     print("🤖 Processing...", end='\r')
+                    self._finish_turn(self._turn)
+                    self._turn = {'speech_stopped': time.perf_counter()}
                 elif event_type == "response.created":
                     self._response_in_progress = True
                     self._response_start_time = time.time()
+                    self._mark_turn('response_created')
                 elif event_type == "response.audio.delta":
                     audio_delta = event.get("delta","")
+                    item_id = event.get("item_id")
+                    if item_id and item_id == self._interrupted_item_id:
+                        continue  # Late deltas of a response the candidate talked over
                     if audio_delta:
                         self.session_manager.performance_metrics['audio_chunks_received'] += 1
                         audio_data = base64.b64decode(audio_delta)
                         if audio_data:
                             self.session_manager.performance_metrics['total_audio_output_bytes'] += len(audio_data)
                             self.session_manager.output_audio_seconds += len(audio_data) / (self.audio_manager.sample_rate * 2)
-                            self.audio_manager.audio_queue.put(audio_data)
+                            if item_id != self._current_audio_item_id:
+                                self._current_audio_item_id = item_id
+                                self._current_item_audio_start = self.audio_manager.bytes_enqueued
+                                self._current_item_audio_bytes = 0
+                            self._current_item_audio_bytes += len(audio_data)
+                            if self._turn and 'first_audio_delta' not in self._turn:
+                                self._mark_turn('first_audio_delta')
+                                turn = self._turn
+                                self.audio_manager.on_next_write(
+                                    lambda ts: self._loop.call_soon_threadsafe(self._on_first_audio_write, turn, ts)
+                                )
+                            self.audio_manager.enqueue(audio_data)
                             # Store audio for evaluation
                             if self.interview_mode:
                                 self.audio_buffer.append(audio_data)
+                elif event_type == "response.audio.done":
+                    self.audio_manager.end_response()
                 elif event_type == "response.audio_transcript.delta":
                     with self._response_lock:
                         self._current_response_text += event.get("delta","")
@@ -548,6 +501,9 @@ class InterviewBot:
                     if self._response_start_time:
                         self.session_manager.performance_metrics['response_times'].append(time.time()-self._response_start_time)
                         self._response_start_time = None
+                    self._mark_turn('response_done')
+                    if 'first_audio_delta' not in self._turn or 'first_audio_write' in self._turn:
+                        self._finish_turn(self._turn)
                     with self._response_lock:
                         self._response_in_progress = False
                         if self._current_response_text.strip() and self._accumulated_user_text:
@@ -565,14 +521,16 @@ class InterviewBot:
                             
                             # Add conversation entry using session manager
                             current_phase = self.phase_manager.interview_phase if self.interview_mode else None
-                            self.session_manager.add_conversation_entry(
+                            entry = self.session_manager.add_conversation_entry(
                                 user_text, resp_text, current_phase
                             )
+                            if self.rolling_evaluator:
+                                self.rolling_evaluator.add_exchange(entry, current_phase)
                             
                             # Natural interview flow - only end on time limit
                             if self.interview_mode and self.phase_manager.is_interview_time_exceeded():
                                 self.phase_manager.transition_to_phase("completed")
-                                self._generate_evaluation_sync()
+                                await self._generate_evaluation()
                                 self.running = False
                                 return
                         # reset
@@ -582,6 +540,8 @@ class InterviewBot:
                     logger.error(f"OpenAI error event: {event}")
                     self.session_manager.performance_metrics['connection_errors'] += 1
             except (websockets.exceptions.ConnectionClosed, websockets.exceptions.ConnectionClosedError):
+                if self.running and await self._recover():
+                    continue
                 print("\n🔌 Connection closed")
                 self.running = False
                 break
@@ -590,13 +550,63 @@ class InterviewBot:
                 self.running = False
                 break
 
+    # ---------------------------
+    # Turn latency
+    # ---------------------------
+    def _mark_turn(self, name: str):
+        """First occurrence of a turn event; turns start at speech_stopped"""
+        if self._turn and name not in self._turn:
+            self._turn[name] = time.perf_counter()
+
+    def _on_first_audio_write(self, turn: dict, timestamp: float):
+        turn['first_audio_write'] = timestamp
+        if 'response_done' in turn:
+            self._finish_turn(turn)
+
+    def _finish_turn(self, turn: dict):
+        """Record a turn once: at response.done, after its first audio write, or when the next turn starts"""
+        if turn and not turn.get('recorded'):
+            turn['recorded'] = True
+            self.session_manager.record_turn_latency(turn)
+
+    async def _handle_barge_in(self):
+        """Candidate started speaking over the bot: silence playback, cancel and truncate the response"""
+        if not self._response_in_progress and not self.audio_manager.has_pending_playback():
+            return
+        metrics = self.session_manager.performance_metrics
+        metrics['barge_ins'] += 1
+        self.audio_manager.flush_playback(
+            on_silence=lambda seconds: metrics['time_to_silence'].append(round(seconds, 4))
+        )
+        if self._response_in_progress:
+            await self.send_event({"type": "response.cancel"})
+
+        item_id = self._current_audio_item_id
+        if item_id and item_id != self._interrupted_item_id:
+            # After the flush, bytes_enqueued is exactly what reached the speaker
+            played = self.audio_manager.bytes_enqueued - self._current_item_audio_start
+            played = max(0, min(played, self._current_item_audio_bytes))
+            if played < self._current_item_audio_bytes:
+                audio_end_ms = int(played * 1000 / (self.audio_manager.sample_rate * 2))
+                await self.send_event({
+                    "type": "conversation.item.truncate",
+                    "item_id": item_id,
+                    "content_index": 0,
+                    "audio_end_ms": audio_end_ms
+                })
+                self._interrupted_item_id = item_id
+        logger.info("Barge-in: playback flushed")
+
     # ---------------------------
     # Evaluation wrapper
     # ---------------------------
     def _prepare_conversation_for_analysis(self):
-        conversation_text = "INTERVIEW CONVERSATION:\n\n"
-        for ex in self.session_manager.conversation:
-            conversation_text += f"INTERVIEWER: {ex['bot']}\nCANDIDATE: {ex['user']}\n\n"
+        # Kept within the evaluation token budget; older exchanges are compressed first
+        builder = TranscriptBuilder()
+        conversation_text = builder.build(self.session_manager.conversation)
+        self.session_manager.performance_metrics['evaluation_transcript'] = builder.report
+        if builder.report['final_tokens'] < builder.report['raw_tokens']:
+            logger.info(f"Evaluation transcript compressed: {builder.report}")
         context_text = f"""
 JOB DESCRIPTION CONTEXT:
 {self.job_description[:1000]}...
@@ -612,19 +622,61 @@ INTERVIEW METADATA:
         return conversation_text + context_text
 
     def _save_audio_files(self):
-        """Audio saving removed - using transcript-only evaluation"""
-        return None
+        """Finalize the session recordings; returns the WAV segment paths per stream"""
+        saved = {
+            "bot_audio": self.audio_buffer.close(),
+            "user_audio": self.user_audio_buffer.close(),
+            "raw_user_audio": self.raw_user_audio_buffer.close()
+        }
+        saved = {name: paths for name, paths in saved.items() if paths}
+        if saved:
+            logger.info(f"Recordings saved: {saved}")
+        return saved
 
-    def _generate_evaluation_sync(self):
+    async def _generate_evaluation(self):
+        """Evaluate the transcript without blocking the event loop.
+
+        Segments already scored by the rolling evaluator only need merging.
+        Otherwise, with EVALUATION_QUEUE_URL set, the transcript is queued for
+        an evaluation worker, so the result survives this process exiting.
+        """
         if not self.interview_mode or not self.session_manager.conversation:
             return
-        print("🔄 Generating AI evaluation (transcript-based)...")
+        
+        if self.rolling_evaluator:
+            print("🔄 Merging segment evaluations...")
+            eval_result = await asyncio.to_thread(self.rolling_evaluator.finalize, self.phase_manager.interview_start_time)
+            self.session_manager.performance_metrics['evaluation'] = self.rolling_evaluator.stats
+            self.rolling_evaluator = None
+            if eval_result:
+                self.evaluation_data = eval_result
+                print("✅ AI evaluation completed successfully")
+                self._save_evaluation_json()
+                self.session_manager.save_performance_metrics()
+                return
+            print("⚠️ Segment evaluation incomplete, evaluating full transcript")
         
         # Prepare conversation text
         conversation_text = self._prepare_conversation_for_analysis()
         
+        if os.getenv("EVALUATION_QUEUE_URL"):
+            from evaluation_queue import get_evaluation_queue
+            payload = {
+                "conversation_text": conversation_text,
+                "job_description": self.job_description,
+                "resume": self.candidate_resume,
+                "interview_start_time": self.phase_manager.interview_start_time.isoformat() if self.phase_manager.interview_start_time else None,
+                "interview_metadata": self._evaluation_metadata()
+            }
+            self.evaluation_job_id = await asyncio.to_thread(get_evaluation_queue().enqueue, payload, self.session_id)
+            print(f"📨 Evaluation queued as job {self.evaluation_job_id}")
+            self.session_manager.save_performance_metrics()
+            return
+        
+        print("🔄 Generating AI evaluation (transcript-based)...")
         # Call evaluation with transcript only
-        eval_result = call_comprehensive_evaluation(
+        eval_result = await asyncio.to_thread(
+            call_comprehensive_evaluation,
             self.api_key, 
             conversation_text, 
             self.job_description, 
@@ -642,17 +694,20 @@ INTERVIEW METADATA:
         self._save_evaluation_json()
         self.session_manager.save_performance_metrics()
 
+    def _evaluation_metadata(self):
+        return {
+            "date": self.session_manager.session_start_time.strftime('%Y-%m-%d %H:%M:%S'),
+            "duration_planned": f"{self.interview_duration} minutes",
+            "voice_used": self.voice,
+            "total_exchanges": len(self.session_manager.conversation),
+            "final_phase": self.phase_manager.interview_phase
+        }
+
     def _save_evaluation_json(self):
         if not getattr(self, "evaluation_data", None):
             return
         report = {
-            "interview_metadata": {
-                "date": self.session_manager.session_start_time.strftime('%Y-%m-%d %H:%M:%S'),
-                "duration_planned": f"{self.interview_duration} minutes",
-                "voice_used": self.voice,
-                "total_exchanges": len(self.session_manager.conversation),
-                "final_phase": self.phase_manager.interview_phase
-            },
+            "interview_metadata": self._evaluation_metadata(),
             **self.evaluation_data
         }
         save_json(report, "interview_evaluation")
@@ -663,18 +718,10 @@ INTERVIEW METADATA:
     
     def _categorize_custom_questions(self, questions):
         """Categorize custom questions based on keywords"""
-        prescreening_keywords = ['availability', 'notice period', 'salary', 'location', 'visa', 'authorization', 'relocate', 'travel', 'interested', 'why', 'motivation']
-        technical_keywords = ['experience', 'worked', 'architect', 'deploy', 'difference', 'manage', 'technical', 'programming', 'coding', 'algorithm', 'database', 'system']
-        
-        for question in questions:
-            question_lower = question.lower()
-            
-            if any(keyword in question_lower for keyword in prescreening_keywords):
-                self.prescreening_questions.append(question)
-            elif any(keyword in question_lower for keyword in technical_keywords):
-                self.technical_custom_questions.append(question)
-            else:
-                self.custom_questions.append(question)
+        categorized = categorize_custom_questions(questions)
+        self.prescreening_questions.extend(categorized['prescreening_questions'])
+        self.technical_custom_questions.extend(categorized['technical_custom_questions'])
+        self.custom_questions.extend(categorized['custom_questions'])
 
     def print_summary(self):
         """Enhanced summary with interview metrics and usage tracking"""
@@ -693,7 +740,10 @@ INTERVIEW METADATA:
             await self.connect()
             self.start_audio_stream()
             print("🎙️ Start speaking naturally...")
-            await asyncio.gather(self.handle_audio_input(), self.handle_openai_events())
+            tasks = [self.handle_audio_input(), self.handle_openai_events()]
+            if self.interview_mode and self.phase_instructions:
+                tasks.append(self.phase_scheduler.run(lambda: self.running))
+            await asyncio.gather(*tasks)
         except Exception:
             logger.exception("Bot run error")
         finally:
@@ -702,10 +752,12 @@ INTERVIEW METADATA:
     async def cleanup(self):
         self.running = False
         # Generate evaluation if interview mode and not already done
-        if self.interview_mode and self.session_manager.conversation and not self.evaluation_data:
+        if self.interview_mode and self.session_manager.conversation and not self.evaluation_data and not self.evaluation_job_id:
             print("\n🔄 Generating final evaluation...")
-            self._generate_evaluation_sync()
+            await self._generate_evaluation()
         self.audio_manager.stop()
+        self._save_audio_files()
+        await self.realtime_pool.close()
         if self.websocket:
             try:
                 await self.websocket.close()
@@ -0,0 +1,191 @@
+"""Load benchmark for InterviewBot's realtime loop, with no microphone or OpenAI account.
+
+    python -m backend.bot_benchmark --sessions 10 --duration 30
+    python -m backend.bot_benchmark --sessions 20 --audio sample_24k.wav --json Data/bench.json \\
+        --max-loop-lag-p99-ms 50 --max-first-audio-p95-ms 900 --max-cpu-per-session 5
+
+Starts fake_realtime_server.py --respond in a subprocess (so its CPU is not
+counted) and runs N conversation-mode bots in this process's event loop, each
+with a FileAudioManager looping --audio (a synthetic utterance by default).
+Reports CPU per session, event-loop lag, RSS growth and the bots' per-turn
+latency histograms. The --max-* flags make it a regression gate: exit status 1
+when any is exceeded.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import resource
+import contextlib
+import subprocess
+from bot import InterviewBot
+from file_audio import FileAudioManager, load_pcm, synthetic_speech
+from latency_histogram import LatencyHistogram
+from session_manager import TURN_LATENCY_METRICS
+
+SAMPLE_RATE = 24000
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def start_fake_server(port: int, args) -> subprocess.Popen:
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_realtime_server.py")
+    process = subprocess.Popen([
+        sys.executable, script, "--port", str(port), "--respond",
+        "--turn-audio-ms", str(args.turn_audio_ms), "--response-delay", str(args.response_delay),
+        "--response-audio-ms", str(args.response_audio_ms), "--delta-interval", str(args.delta_interval)
+    ], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return process
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Fake Realtime server did not start")
+
+
+async def _monitor_loop_lag(histogram: LatencyHistogram, interval: float, stop: asyncio.Event):
+    """How late the loop wakes a sleeping task; blocking work in any bot shows up here"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        histogram.record(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_benchmark(args, url: str) -> dict:
+    pcm = load_pcm(args.audio, SAMPLE_RATE) if args.audio else synthetic_speech(SAMPLE_RATE)
+    loop_lag = LatencyHistogram(min_seconds=0.0001)
+    stop = asyncio.Event()
+    monitor = asyncio.get_running_loop().create_task(_monitor_loop_lag(loop_lag, args.lag_interval, stop))
+
+    rss_start = _rss_bytes()
+    bots = [
+        InterviewBot("sk-benchmark", audio_manager=FileAudioManager(pcm, sample_rate=SAMPLE_RATE),
+                     realtime_url=url, client_vad=args.client_vad)
+        for _ in range(args.sessions)
+    ]
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    runs = [asyncio.get_running_loop().create_task(bot.run()) for bot in bots]
+    await asyncio.sleep(args.duration)
+    rss_end = _rss_bytes()
+    cpu_seconds, wall_seconds = time.process_time() - cpu_started, time.perf_counter() - wall_started
+    stop.set()
+    await monitor  # Shutdown (thread joins, recordings) is not part of the measurement
+
+    for bot in bots:
+        bot.running = False
+        if bot.websocket is not None:
+            await bot.websocket.close()
+    await asyncio.wait(runs, timeout=10)
+
+    turn_latency = {name: LatencyHistogram() for name in TURN_LATENCY_METRICS}
+    for bot in bots:
+        for name, histogram in bot.session_manager.turn_latency.items():
+            turn_latency[name].merge(histogram)
+    metrics = [bot.session_manager.performance_metrics for bot in bots]
+    return {
+        'sessions': args.sessions,
+        'duration_seconds': round(wall_seconds, 2),
+        'turns': turn_latency['transcription_delay'].count,
+        'cpu_percent_per_session': round(100 * cpu_seconds / wall_seconds / args.sessions, 2),
+        'cpu_seconds': round(cpu_seconds, 3),
+        'loop_lag': loop_lag.summary(),
+        'rss_start_mb': round(rss_start / 2**20, 1),
+        'rss_end_mb': round(rss_end / 2**20, 1),
+        'rss_growth_per_session_mb': round((rss_end - rss_start) / 2**20 / args.sessions, 2),
+        'turn_latency': {name: histogram.summary() for name, histogram in turn_latency.items()},
+        'capture_frames_dropped': sum(m['capture']['frames_dropped'] for m in metrics),
+        'capture_overflows': sum(m['capture']['input_overflows'] for m in metrics),
+        'playback_underruns': sum(m['playback']['underruns'] for m in metrics),
+        'reconnects': sum(m['reconnect']['reconnects'] for m in metrics),
+        'connection_errors': sum(m['connection_errors'] for m in metrics),
+    }
+
+
+def check_thresholds(report: dict, args) -> list:
+    """Human-readable list of exceeded limits (empty when all pass)"""
+    failures = []
+    first_audio_p95 = report['turn_latency']['time_to_first_audio']['p95_ms']
+    checks = [
+        ("event-loop lag p99", report['loop_lag']['p99_ms'], args.max_loop_lag_p99_ms, "ms"),
+        ("end of speech -> first audio p95", first_audio_p95, args.max_first_audio_p95_ms, "ms"),
+        ("CPU per session", report['cpu_percent_per_session'], args.max_cpu_per_session, "%"),
+        ("RSS growth per session", report['rss_growth_per_session_mb'], args.max_rss_growth_mb, "MB"),
+    ]
+    for label, value, limit, unit in checks:
+        if limit is not None and (value is None or value > limit):
+            failures.append(f"{label}: {value}{unit} > {limit}{unit}")
+    if args.min_turns is not None and report['turns'] < args.min_turns:
+        failures.append(f"turns: {report['turns']} < {args.min_turns}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InterviewBot against a local fake Realtime server")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of conversation per run")
+    parser.add_argument("--audio", help="Mono 16-bit 24 kHz .wav or raw .pcm, looped as the candidate's microphone")
+    parser.add_argument("--url", help="Use a running fake (or real) Realtime endpoint instead of starting one")
+    parser.add_argument("--no-client-vad", dest="client_vad", action="store_false")
+    parser.add_argument("--turn-audio-ms", type=int, default=1500)
+    parser.add_argument("--response-delay", type=float, default=0.3)
+    parser.add_argument("--response-audio-ms", type=int, default=2000)
+    parser.add_argument("--delta-interval", type=float, default=0.05)
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--json", help="Also write the report here")
+    parser.add_argument("--verbose", action="store_true", help="Keep the bots' console output")
+    parser.add_argument("--max-loop-lag-p99-ms", type=float)
+    parser.add_argument("--max-first-audio-p95-ms", type=float)
+    parser.add_argument("--max-cpu-per-session", type=float, help="Percent of one core")
+    parser.add_argument("--max-rss-growth-mb", type=float, help="Per session")
+    parser.add_argument("--min-turns", type=int)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = start_fake_server(port, args)
+        url = f"ws://127.0.0.1:{port}/v1/realtime"
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            report = asyncio.run(run_benchmark(args, url))
+    finally:
+        logging.disable(logging.NOTSET)
+        if server is not None:
+            server.terminate()
+            server.wait(5)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    failures = check_thresholds(report, args)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
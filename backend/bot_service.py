@@ -0,0 +1,148 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+try:
+    from backend.evaluation_queue import get_evaluation_queue
+    from backend.evaluation_worker import EvaluationWorker
+except Exception:  # Fallback when running as a script
+    from evaluation_queue import get_evaluation_queue
+    from evaluation_worker import EvaluationWorker
+
+logger = logging.getLogger(__name__)
+
+# Evaluation workers run inside the API process; set 0 when separate
+# `python -m backend.evaluation_worker` processes drain the queue
+EVALUATION_INPROCESS_WORKERS = int(os.getenv("EVALUATION_INPROCESS_WORKERS", "2"))
+EVALUATION_MAX_PENDING = int(os.getenv("EVALUATION_MAX_PENDING", "32"))
+# Sessions never stopped are dropped after this long
+SESSION_TTL_SECONDS = int(os.getenv("BOT_SESSION_TTL_SECONDS", str(3 * 3600)))
+# Transcript text kept per session; older lines are dropped past this
+MAX_TRANSCRIPT_CHARS = int(os.getenv("BOT_MAX_TRANSCRIPT_CHARS", str(400_000)))
+
+
+class EvaluationQueueFull(RuntimeError):
+    pass
+
+
+class _Session:
+    __slots__ = ("session_id", "jd_txt", "resume_txt", "questions_dict", "lines", "chars", "started_at", "last_seen", "job_id")
+
+    def __init__(self, session_id: str, jd_txt: str, resume_txt: str, questions_dict: dict | None):
+        self.session_id = session_id
+        self.jd_txt = jd_txt
+        self.resume_txt = resume_txt
+        self.questions_dict = questions_dict
+        self.lines: list[str] = []  # Joined once, when the evaluation runs
+        self.chars = 0
+        self.started_at = datetime.now()
+        self.last_seen = time.monotonic()
+        self.job_id: str | None = None
+
+
+class BotService:
+    """In-process registry of web interview sessions; evaluations go to the durable queue.
+
+    Transcript appends only touch a per-session list. Stopping a session
+    enqueues its transcript and returns a job id immediately; the GPT
+    evaluation runs on a queue worker, never on the request thread.
+    """
+
+    def __init__(self, inprocess_workers: int = EVALUATION_INPROCESS_WORKERS, max_pending: int = EVALUATION_MAX_PENDING):
+        self.inprocess_workers = inprocess_workers
+        self.max_pending = max_pending
+        self._sessions: dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+
+    def _get_queue(self):
+        # Created on first use so importing the service never touches the DB
+        with self._lock:
+            if self._queue is None:
+                self._queue = get_evaluation_queue()
+            return self._queue
+
+    def start_worker(self):
+        """Start the in-process worker at app startup, so jobs left by a previous process run without waiting for a request"""
+        queue = self._get_queue()
+        with self._lock:
+            if self._worker is None and self.inprocess_workers > 0:
+                self._worker = EvaluationWorker(queue, concurrency=self.inprocess_workers)
+                self._worker.start_in_thread()
+
+    def start(self, jd_txt: str = "", resume_txt: str = "", questions_dict: dict | None = None) -> str:
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire_sessions()
+            self._sessions[session_id] = _Session(session_id, jd_txt, resume_txt, questions_dict)
+        return session_id
+
+    def add_transcript(self, session_id: str, text: str):
+        """Append one transcript line; raises KeyError for unknown sessions"""
+        if not text:
+            with self._lock:
+                self._sessions[session_id].last_seen = time.monotonic()
+            return
+        with self._lock:
+            session = self._sessions[session_id]
+            if session.job_id is not None:
+                raise KeyError(session_id)  # Stopped sessions take no more transcript
+            session.lines.append(text)
+            session.chars += len(text)
+            while session.chars > MAX_TRANSCRIPT_CHARS and len(session.lines) > 1:
+                session.chars -= len(session.lines.pop(0))
+            session.last_seen = time.monotonic()
+
+    def stop_and_evaluate(self, session_id: str) -> str:
+        """Close the session and queue its evaluation; returns the job id.
+
+        Raises KeyError for unknown sessions and EvaluationQueueFull when
+        too many evaluations are already waiting.
+        """
+        queue = self._get_queue()
+        with self._lock:
+            session = self._sessions[session_id]
+            if session.job_id is not None:
+                return session.job_id  # Already stopped
+            # Snapshot: add_transcript and expiry keep running once the lock is released
+            lines = list(session.lines)
+            jd_txt, resume_txt, started_at = session.jd_txt, session.resume_txt, session.started_at
+        if queue.pending_count() >= self.max_pending:
+            raise EvaluationQueueFull("Evaluation queue is full, try again shortly")
+        payload = {
+            "conversation_text": "INTERVIEW CONVERSATION:\n\n" + "\n".join(lines),
+            "job_description": jd_txt,
+            "resume": resume_txt,
+            "interview_start_time": started_at.isoformat(),
+            "interview_metadata": {
+                "date": started_at.strftime('%Y-%m-%d %H:%M:%S'),
+                "session_id": session_id,
+                "transcript_lines": len(lines)
+            }
+        }
+        with self._lock:
+            if session.job_id is None:
+                session.job_id = queue.enqueue(payload, session_id=session_id)
+                session.lines = []
+                session.chars = 0
+            return session.job_id
+
+    def get_evaluation(self, session_or_job_id: str) -> dict | None:
+        """Job status (and result once done) by job id or session id"""
+        queue = self._get_queue()
+        return queue.get(session_or_job_id) or queue.get_by_session(session_or_job_id)
+
+    def _expire_sessions(self):
+        cutoff = time.monotonic() - SESSION_TTL_SECONDS
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_seen < cutoff]:
+            del self._sessions[session_id]
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._worker.stop_event.set()
+
+
+bot_service = BotService()
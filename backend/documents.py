@@ -0,0 +1,219 @@
+import os
+import time
+import hashlib
+import logging
+from datetime import datetime
+from fastapi import HTTPException
+from io import BytesIO
+from typing import BinaryIO
+import PyPDF2
+from sqlalchemy.exc import IntegrityError
+try:
+    from docx import Document as DocxDocument
+except Exception:
+    DocxDocument = None
+try:
+    from backend.models import DocumentText
+    from backend.http_client import get_sync_http_client
+    from backend.metrics import timed
+except Exception:  # Fallback when running as a script
+    from models import DocumentText
+    from http_client import get_sync_http_client
+    from metrics import timed
+
+# Imported flat everywhere so the server and the bot share one tracer context
+from tracing import span, set_attribute
+
+logger = logging.getLogger(__name__)
+
+# Stored text is served without contacting the source for this long, then revalidated
+DOCUMENT_TEXT_REVALIDATE_SECONDS = int(os.getenv("DOCUMENT_TEXT_REVALIDATE_SECONDS", "300"))
+
+document_text_metrics = {
+    "hits": 0,            # Served from the DB without touching the source
+    "revalidated": 0,     # Source answered 304 / local file unchanged
+    "misses": 0,          # Source bytes were fetched
+    "content_hits": 0,    # Fetched bytes matched stored text by content hash, no parse
+    "parses": 0,
+    "parse_seconds_total": 0.0,
+    "parse_seconds_max": 0.0,
+}
+
+
+# --------------- Helpers: extract text from URL or filesystem ---------------
+def _fetch_bytes(path_or_url: str) -> bytes:
+    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
+        try:
+            resp = get_sync_http_client().get(path_or_url)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {path_or_url} - {e}")
+        if resp.status_code >= 400:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {path_or_url} - {resp.status_code}")
+        return resp.content
+    # local file path
+    try:
+        with open(path_or_url, "rb") as f:
+            return f.read()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {path_or_url} - {e}")
+
+
+def _guess_ext(path_or_url: str) -> str:
+    base = path_or_url.split("?")[0]
+    dot = base.rfind(".")
+    return base[dot:].lower() if dot != -1 else ""
+
+
+def _parse_document(data: bytes | BinaryIO, ext: str) -> str:
+    stream = BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    # PDF
+    if ext == ".pdf":
+        try:
+            reader = PyPDF2.PdfReader(stream)
+            text_parts: list[str] = []
+            for page in reader.pages:
+                page_text = page.extract_text() or ""
+                text_parts.append(page_text)
+            return "\n".join(text_parts)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"PDF parse error: {e}")
+    # DOCX
+    if ext == ".docx" and DocxDocument is not None:
+        try:
+            doc = DocxDocument(stream)
+            return "\n".join(p.text for p in doc.paragraphs)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"DOCX parse error: {e}")
+    # TXT or unknown: try utf-8
+    data = stream.read()
+    try:
+        return data.decode("utf-8")
+    except Exception:
+        return data.decode("latin-1", errors="ignore")
+
+
+def extract_text_from_path(path_or_url: str) -> str:
+    if not path_or_url:
+        return ""
+    return _parse_document(_fetch_bytes(path_or_url), _guess_ext(path_or_url))
+
+
+# --------------- Parse-once document text store ---------------
+def _local_validator(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {path} - {e}")
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def _fetch_if_changed(path_or_url: str, row: DocumentText | None):
+    """(data, etag, last_modified); data is None when the stored copy is still current"""
+    if not (path_or_url.startswith("http://") or path_or_url.startswith("https://")):
+        validator = _local_validator(path_or_url)
+        if row is not None and row.etag == validator:
+            return None, row.etag, row.last_modified
+        return _fetch_bytes(path_or_url), validator, None
+
+    headers = {}
+    if row is not None and row.etag:
+        headers["If-None-Match"] = row.etag
+    if row is not None and row.last_modified:
+        headers["If-Modified-Since"] = row.last_modified
+    try:
+        resp = get_sync_http_client().get(path_or_url, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {path_or_url} - {e}")
+    if resp.status_code == 304 and row is not None:
+        return None, row.etag, row.last_modified
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {path_or_url} - {resp.status_code}")
+    return resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+
+def _content_hash(data: bytes | BinaryIO) -> tuple[str, int]:
+    """(sha256, size) of bytes or a seekable file, reading files in chunks"""
+    if isinstance(data, (bytes, bytearray)):
+        return hashlib.sha256(data).hexdigest(), len(data)
+    digest = hashlib.sha256()
+    size = 0
+    data.seek(0)
+    for chunk in iter(lambda: data.read(1 << 16), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    data.seek(0)
+    return digest.hexdigest(), size
+
+
+def _timed_parse(data: bytes | BinaryIO, ext: str) -> tuple[str, int]:
+    started = time.perf_counter()
+    with span("document.parse", ext=ext) as parse_span, timed("pdf_extraction" if ext == ".pdf" else "document_parse"):
+        text = _parse_document(data, ext)
+        parse_span.set('text_chars', len(text))
+    elapsed = time.perf_counter() - started
+    document_text_metrics["parses"] += 1
+    document_text_metrics["parse_seconds_total"] += elapsed
+    document_text_metrics["parse_seconds_max"] = max(document_text_metrics["parse_seconds_max"], elapsed)
+    return text, int(elapsed * 1000)
+
+
+def store_document_text(db, source: str, data: bytes | BinaryIO, etag: str | None = None,
+                        last_modified: str | None = None) -> str:
+    """Record the text of `data` (bytes or a seekable file) for `source`, parsing only content not seen before"""
+    content_hash, byte_size = _content_hash(data)
+    row = db.query(DocumentText).filter(DocumentText.source == source).first()
+    same = row if row is not None and row.content_hash == content_hash else (
+        db.query(DocumentText).filter(DocumentText.content_hash == content_hash).first()
+    )
+    if same is not None:
+        document_text_metrics["content_hits"] += 1
+        text, parse_ms = same.text, same.parse_ms
+    else:
+        text, parse_ms = _timed_parse(data, _guess_ext(source))
+        logger.info(f"Parsed {source} ({byte_size} bytes) in {parse_ms} ms")
+
+    now = datetime.utcnow()
+    if row is None:
+        row = DocumentText(source=source, fetched_at=now)
+    row.content_hash = content_hash
+    row.etag = etag
+    row.last_modified = last_modified
+    row.text = text
+    row.byte_size = byte_size
+    row.parse_ms = parse_ms
+    row.fetched_at = now
+    row.validated_at = now
+    db.add(row)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored the same source first; its text is just as good
+        db.rollback()
+    return text
+
+
+def get_document_text(db, path_or_url: str) -> str:
+    """Text of a resume/JD, downloaded and parsed once and revalidated conditionally"""
+    if not path_or_url:
+        return ""
+    with span("document.get_text", source=path_or_url):
+        row = db.query(DocumentText).filter(DocumentText.source == path_or_url).first()
+        now = datetime.utcnow()
+        if row is not None and row.validated_at and (now - row.validated_at).total_seconds() < DOCUMENT_TEXT_REVALIDATE_SECONDS:
+            document_text_metrics["hits"] += 1
+            set_attribute('cache', 'hit')
+            return row.text
+
+        with span("document.fetch"):
+            data, etag, last_modified = _fetch_if_changed(path_or_url, row)
+        if data is None:
+            document_text_metrics["revalidated"] += 1
+            set_attribute('cache', 'revalidated')
+            row.validated_at = now
+            db.add(row)
+            db.commit()
+            return row.text
+
+        document_text_metrics["misses"] += 1
+        set_attribute('cache', 'miss')
+        return store_document_text(db, path_or_url, data, etag, last_modified)
@@ -1,13 +1,23 @@
 # evaluation.py
 import json
 import openai
+from tracing import span, set_llm_usage
 from datetime import datetime
-from prompts_repo import EVALUATION_PROMPT
+from prompts_repo import EVALUATION_PROMPT, SEGMENT_EVALUATION_PROMPT, EVALUATION_MERGE_PROMPT
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+def _parse_json_reply(txt: str):
+    """JSON object from a model reply, with or without a ``` fence"""
+    txt = txt.strip()
+    if '```json' in txt:
+        txt = txt.split('```json')[1].split('```')[0].strip()
+    elif '```' in txt:
+        txt = txt.split('```')[1].split('```')[0].strip()
+    return json.loads(txt)
+
 def call_comprehensive_evaluation(api_key: str, conversation_text: str, job_description: str = "", resume: str = "", audio_file_path: str = None, interview_start_time=None):
     """Enhanced evaluation using transcript for comprehensive assessment"""
     client = openai.OpenAI(api_key=api_key)
@@ -31,20 +41,16 @@ def call_comprehensive_evaluation(api_key: str, conversation_text: str, job_desc
     ]
     
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.3,
-            max_tokens=2500
-        )
-        
-        txt = resp.choices[0].message.content.strip()
-        if '```json' in txt:
-            txt = txt.split('```json')[1].split('```')[0].strip()
-        elif '```' in txt:
-            txt = txt.split('```')[1].split('```')[0].strip()
+        with span("llm.evaluation", model="gpt-4o", prompt_chars=sum(len(m['content']) for m in messages)):
+            resp = client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                temperature=0.3,
+                max_tokens=2500
+            )
+            set_llm_usage(resp)
         
-        data = json.loads(txt)
+        data = _parse_json_reply(resp.choices[0].message.content)
         
         # Add metadata
         data['evaluation_metadata'] = {
@@ -59,6 +65,58 @@ def call_comprehensive_evaluation(api_key: str, conversation_text: str, job_desc
         logger.error(f"Comprehensive evaluation failed: {e}")
         return None
 
+def call_segment_evaluation(api_key: str, segment_text: str, phase: str, first_exchange: int, last_exchange: int, job_description: str = ""):
+    """Short evaluation of one interview segment (rolling evaluation); None on failure"""
+    client = openai.OpenAI(api_key=api_key)
+    prompt = SEGMENT_EVALUATION_PROMPT.format(
+        phase=phase or "interview",
+        first_exchange=first_exchange,
+        last_exchange=last_exchange,
+        segment_text=segment_text,
+        job_description=job_description[:600] if job_description else "Not provided"
+    )
+    try:
+        with span("llm.segment_evaluation", model="gpt-4o", prompt_chars=len(prompt)):
+            resp = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=400
+            )
+            set_llm_usage(resp)
+        return _parse_json_reply(resp.choices[0].message.content)
+    except Exception as e:
+        logger.error(f"Segment evaluation failed: {e}")
+        return None
+
+def call_merge_evaluation(api_key: str, segment_notes: str, job_description: str = "", resume: str = "", interview_start_time=None):
+    """Final report merged from segment notes; same shape as call_comprehensive_evaluation"""
+    client = openai.OpenAI(api_key=api_key)
+    prompt = EVALUATION_MERGE_PROMPT.format(
+        segment_notes=segment_notes,
+        job_description=job_description[:1000] if job_description else "Not provided",
+        resume=resume[:1000] if resume else "Not provided"
+    )
+    try:
+        with span("llm.merge_evaluation", model="gpt-4o", prompt_chars=len(prompt)):
+            resp = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=1200
+            )
+            set_llm_usage(resp)
+        data = _parse_json_reply(resp.choices[0].message.content)
+        data['evaluation_metadata'] = {
+            'timestamp': datetime.now().isoformat(),
+            'evaluation_type': 'rolling_segments',
+            'duration_seconds': (datetime.now() - interview_start_time).total_seconds() if interview_start_time else None
+        }
+        return data
+    except Exception as e:
+        logger.error(f"Merge evaluation failed: {e}")
+        return None
+
 def call_interview_evaluation(api_key: str, conversation_text: str, job_description: str, resume: str, interview_start_time=None):
     """Legacy function - redirects to comprehensive evaluation"""
     return call_comprehensive_evaluation(api_key, conversation_text, job_description, resume, None, interview_start_time)
@@ -0,0 +1,245 @@
+import os
+import uuid
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, or_, and_, select, text
+from sqlalchemy.orm import sessionmaker, aliased
+try:
+    from backend.models import EvaluationJob
+except Exception:  # Fallback when running as a script
+    from models import EvaluationJob
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_MAX_ATTEMPTS = int(os.getenv("EVALUATION_MAX_ATTEMPTS", "4"))
+# Evaluations allowed to run at once across every worker process
+EVALUATION_MAX_CONCURRENCY = int(os.getenv("EVALUATION_MAX_CONCURRENCY", "4"))
+EVALUATION_LEASE_SECONDS = int(os.getenv("EVALUATION_LEASE_SECONDS", "300"))
+# Serializes claims across workers on Postgres (pg_advisory_xact_lock key)
+CLAIM_LOCK_KEY = 0x6576616C
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter after the given number of failed attempts"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class EvaluationQueue:
+    """Evaluation jobs in a DB table, delivered at least once.
+
+    Workers claim jobs with a conditional UPDATE (safe on Postgres and SQLite)
+    and hold a lease while they run. The UPDATE also counts running leases,
+    and claims are serialized (an advisory lock on Postgres, the write lock
+    on SQLite), so max_concurrency holds across every worker process. A job whose lease lapses, because its
+    worker died or stalled, is claimed again, so evaluations must be safe to repeat.
+    Failures go back to the queue with exponential backoff until max_attempts.
+    """
+
+    def __init__(self, session_factory, max_concurrency: int = EVALUATION_MAX_CONCURRENCY,
+                 lease_seconds: int = EVALUATION_LEASE_SECONDS, max_attempts: int = EVALUATION_MAX_ATTEMPTS):
+        self._session_factory = session_factory
+        self.max_concurrency = max_concurrency
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def _to_dict(job: EvaluationJob) -> dict:
+        return {
+            "job_id": job.job_id,
+            "session_id": job.session_id,
+            "status": job.status,
+            "evaluation": job.result,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        }
+
+    def enqueue(self, payload: dict, session_id: str | None = None) -> str:
+        now = datetime.utcnow()
+        job = EvaluationJob(
+            job_id=uuid.uuid4().hex,
+            session_id=session_id,
+            status="queued",
+            payload=payload,
+            attempts=0,
+            max_attempts=self.max_attempts,
+            available_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        with self._session_factory() as db:
+            db.add(job)
+            db.commit()
+            return job.job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._session_factory() as db:
+            job = db.get(EvaluationJob, job_id)
+            return None if job is None else self._to_dict(job)
+
+    def get_by_session(self, session_id: str) -> dict | None:
+        with self._session_factory() as db:
+            job = (
+                db.query(EvaluationJob)
+                .filter(EvaluationJob.session_id == session_id)
+                .order_by(EvaluationJob.created_at.desc())
+                .first()
+            )
+            return None if job is None else self._to_dict(job)
+
+    def pending_count(self) -> int:
+        with self._session_factory() as db:
+            return db.query(func.count(EvaluationJob.job_id)).filter(
+                EvaluationJob.status.in_(("queued", "running"))
+            ).scalar() or 0
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(EvaluationJob.status == "queued", EvaluationJob.available_at <= now),
+            and_(EvaluationJob.status == "running", EvaluationJob.lease_expires_at < now,
+                 EvaluationJob.attempts < EvaluationJob.max_attempts),
+        )
+
+    def claim(self, owner: str, limit: int = 1) -> list[tuple[str, dict]]:
+        """Lease up to `limit` runnable jobs to `owner`; returns (job_id, payload) pairs"""
+        now = datetime.utcnow()
+        claimed = []
+        with self._session_factory() as db:
+            # Jobs that lost their lease on the last attempt are not retried again
+            db.query(EvaluationJob).filter(
+                EvaluationJob.status == "running",
+                EvaluationJob.lease_expires_at < now,
+                EvaluationJob.attempts >= EvaluationJob.max_attempts,
+            ).update({
+                EvaluationJob.status: "failed",
+                EvaluationJob.error: "Lease expired on the final attempt",
+                EvaluationJob.lease_owner: None,
+                EvaluationJob.finished_at: now,
+                EvaluationJob.updated_at: now,
+            }, synchronize_session=False)
+            db.commit()
+
+            if db.get_bind().dialect.name == "postgresql":
+                # Held until commit: another worker's claims can't interleave with the count below
+                db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CLAIM_LOCK_KEY})
+            running_jobs = aliased(EvaluationJob)
+            running_count = select(func.count(running_jobs.job_id)).where(
+                running_jobs.status == "running", running_jobs.lease_expires_at >= now
+            ).scalar_subquery()
+
+            running = db.query(func.count(EvaluationJob.job_id)).filter(
+                EvaluationJob.status == "running", EvaluationJob.lease_expires_at >= now
+            ).scalar() or 0
+            slots = min(limit, self.max_concurrency - running)
+            if slots <= 0:
+                db.commit()
+                return []
+
+            candidates = (
+                db.query(EvaluationJob.job_id)
+                .filter(self._claimable(now))
+                .order_by(EvaluationJob.available_at)
+                .limit(slots * 2)
+                .all()
+            )
+            for (job_id,) in candidates:
+                if len(claimed) >= slots:
+                    break
+                # Only one worker's UPDATE can match, and only while a slot is free
+                updated = db.query(EvaluationJob).filter(
+                    EvaluationJob.job_id == job_id, self._claimable(now), running_count < self.max_concurrency
+                ).update({
+                    EvaluationJob.status: "running",
+                    EvaluationJob.lease_owner: owner,
+                    EvaluationJob.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                    EvaluationJob.attempts: EvaluationJob.attempts + 1,
+                    EvaluationJob.updated_at: now,
+                }, synchronize_session=False)
+                if updated == 1:
+                    claimed.append(job_id)
+            db.commit()
+
+            return [(job_id, db.get(EvaluationJob, job_id).payload) for job_id in claimed]
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """Extend the lease of a job this owner is still running"""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            updated = db.query(EvaluationJob).filter(
+                EvaluationJob.job_id == job_id,
+                EvaluationJob.status == "running",
+                EvaluationJob.lease_owner == owner,
+            ).update({
+                EvaluationJob.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                EvaluationJob.updated_at: now,
+            }, synchronize_session=False)
+            db.commit()
+            return updated == 1
+
+    def complete(self, job_id: str, owner: str, result: dict) -> bool:
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            job = db.get(EvaluationJob, job_id)
+            if job is None or job.status == "done":
+                return False
+            if job.lease_owner != owner:
+                # Lease was lost and the job re-claimed; the result is still valid
+                logger.warning(f"Evaluation job {job_id} completed by {owner} after losing its lease")
+            job.status = "done"
+            job.result = result
+            job.error = None
+            job.lease_owner = None
+            job.finished_at = now
+            job.updated_at = now
+            db.commit()
+            return True
+
+    def fail(self, job_id: str, owner: str, error: str) -> str:
+        """Record a failed attempt; requeues with backoff or marks the job failed. Returns the new status"""
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            job = db.get(EvaluationJob, job_id)
+            if job is None:
+                return "missing"
+            if job.status != "running" or job.lease_owner != owner:
+                return job.status  # Someone else owns this job now
+            job.error = error
+            job.lease_owner = None
+            job.updated_at = now
+            if job.attempts >= job.max_attempts:
+                job.status = "failed"
+                job.finished_at = now
+            else:
+                job.status = "queued"
+                job.available_at = now + timedelta(seconds=retry_delay(job.attempts))
+            db.commit()
+            return job.status
+
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def get_evaluation_queue() -> EvaluationQueue:
+    """Queue in the app database, or in EVALUATION_QUEUE_URL when set (e.g. sqlite for local runs)"""
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            url = os.getenv("EVALUATION_QUEUE_URL")
+            if url:
+                engine = create_engine(url)
+                EvaluationJob.__table__.create(bind=engine, checkfirst=True)
+                session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            else:
+                try:
+                    from backend.database import SessionLocal as session_factory
+                except Exception:
+                    from database import SessionLocal as session_factory
+            _shared_queue = EvaluationQueue(session_factory)
+        return _shared_queue
@@ -0,0 +1,111 @@
+"""Evaluation worker: runs queued interview evaluations outside the API process.
+
+    python -m backend.evaluation_worker --concurrency 2
+
+Point OPENAI_BASE_URL at backend/mock_llm_server.py to exercise the queue
+without calling OpenAI.
+"""
+import os
+import time
+import uuid
+import socket
+import signal
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+try:
+    from backend.evaluation_queue import get_evaluation_queue
+except Exception:  # Fallback when running as a script
+    from evaluation_queue import get_evaluation_queue
+from evaluation import call_comprehensive_evaluation, save_json
+
+logger = logging.getLogger(__name__)
+
+
+def run_evaluation_job(payload: dict) -> dict:
+    """Evaluate one queued transcript; raises so the queue can retry"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not configured")
+    started = payload.get("interview_start_time")
+    result = call_comprehensive_evaluation(
+        api_key,
+        payload["conversation_text"],
+        payload.get("job_description", ""),
+        payload.get("resume", ""),
+        None,
+        datetime.fromisoformat(started) if started else None
+    )
+    if not result:
+        raise RuntimeError("Evaluation failed or empty")
+    report = {"interview_metadata": payload.get("interview_metadata", {}), **result}
+    save_json(report, "interview_evaluation")
+    return report
+
+
+class EvaluationWorker:
+    """Claims jobs up to its concurrency, runs them on a thread pool and keeps their leases alive"""
+
+    def __init__(self, queue=None, concurrency: int = 2, poll_interval: float = 1.0):
+        self.queue = queue or get_evaluation_queue()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stop_event = threading.Event()
+
+    def _process(self, job_id: str, payload: dict):
+        try:
+            report = run_evaluation_job(payload)
+        except Exception as e:
+            status = self.queue.fail(job_id, self.owner, str(e))
+            logger.warning(f"Evaluation job {job_id} failed ({e}); now {status}")
+            return
+        self.queue.complete(job_id, self.owner, report)
+        logger.info(f"Evaluation job {job_id} done")
+
+    def run(self):
+        """Poll until stop_event is set; in-flight jobs are finished before returning"""
+        in_flight = {}
+        renew_every = max(self.queue.lease_seconds / 3, self.poll_interval)
+        last_renew = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="evaluation") as executor:
+            while not self.stop_event.is_set():
+                try:
+                    for job_id in [j for j, f in in_flight.items() if f.done()]:
+                        del in_flight[job_id]
+                    if in_flight and time.monotonic() - last_renew >= renew_every:
+                        for job_id in in_flight:
+                            self.queue.renew(job_id, self.owner)
+                        last_renew = time.monotonic()
+                    free = self.concurrency - len(in_flight)
+                    if free > 0:
+                        for job_id, payload in self.queue.claim(self.owner, free):
+                            in_flight[job_id] = executor.submit(self._process, job_id, payload)
+                except Exception:
+                    logger.exception("Evaluation worker poll failed")
+                self.stop_event.wait(self.poll_interval)
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name="evaluation-worker", daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued interview evaluations")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("EVALUATION_WORKER_CONCURRENCY", "2")))
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker = EvaluationWorker(concurrency=args.concurrency, poll_interval=args.poll_interval)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop_event.set())
+    logger.info(f"Evaluation worker {worker.owner} started (concurrency {args.concurrency})")
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
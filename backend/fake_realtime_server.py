@@ -0,0 +1,219 @@
+"""Local stand-in for the OpenAI Realtime websocket.
+
+    python backend/fake_realtime_server.py --port 8766 --ready-delay 0.3 --drop-after 200 --max-drops 2
+    python backend/fake_realtime_server.py --respond --turn-audio-ms 1500 --response-delay 0.3
+    export OPENAI_REALTIME_URL=ws://127.0.0.1:8766/v1/realtime
+
+Sends session.created after --ready-delay seconds, answers session.update
+with session.updated and conversation.item.create with
+conversation.item.created, and counts input_audio_buffer.append events.
+With --drop-after N, a connection is closed abnormally (1011) after N client
+events, at most --max-drops times.
+
+With --respond it also plays the model's side of a conversation: every
+--turn-audio-ms of appended audio counts as one utterance (speech_started,
+then speech_stopped), followed by the transcription after
+--transcription-delay, response.created after --response-delay, and
+--response-audio-ms of silent audio deltas paced --delta-interval apart,
+ending with response.audio.done and response.done. Audio appended while a
+response is playing (until its audio would have finished) is ignored, so
+there are no barge-ins.
+"""
+import json
+import time
+import uuid
+import base64
+import asyncio
+import argparse
+import threading
+import websockets
+
+
+FAKE_TRANSCRIPT = "I built the ingestion service in Python and moved the batch jobs to Kafka streams."
+FAKE_REPLY = "Thanks. How did you handle back-pressure when consumers fell behind?"
+
+
+class FakeRealtimeState:
+    def __init__(self, ready_delay: float = 0.0, drop_after: int = 0, max_drops: int = 1, respond: bool = False,
+                 turn_audio_ms: int = 1500, transcription_delay: float = 0.05, response_delay: float = 0.3,
+                 response_audio_ms: int = 2000, delta_ms: int = 100, delta_interval: float = 0.05,
+                 sample_rate: int = 24000):
+        self.ready_delay = ready_delay
+        self.drop_after = drop_after
+        self.max_drops = max_drops
+        self.respond = respond
+        self.turn_bytes = sample_rate * 2 * turn_audio_ms // 1000
+        self.transcription_delay = transcription_delay
+        self.response_delay = response_delay
+        self.response_audio_ms = response_audio_ms
+        self.delta_ms = max(1, delta_ms)
+        self.delta_bytes = sample_rate * 2 * self.delta_ms // 1000
+        self.delta_interval = delta_interval
+        self.drops = 0
+        self.turns = 0
+        self.connections = 0
+        self.events = {}  # Event type -> count, across connections
+        self.received = []  # Per connection, the client event types in arrival order
+        self.audio_bytes = 0
+
+    def count(self, event_type: str):
+        self.events[event_type] = self.events.get(event_type, 0) + 1
+
+
+async def _respond(websocket, state: FakeRealtimeState):
+    """Task wrapper for one scripted turn; a closed socket just ends it"""
+    try:
+        await _script_turn(websocket, state)
+    except websockets.ConnectionClosed:
+        pass  # Client went away mid-response
+
+
+async def _script_turn(websocket, state: FakeRealtimeState):
+    """speech_stopped, transcription, then a response with paced audio deltas"""
+    user_item = f"item_{uuid.uuid4().hex[:12]}"
+    await websocket.send(json.dumps({"type": "input_audio_buffer.speech_stopped", "item_id": user_item}))
+    await asyncio.sleep(state.transcription_delay)
+    await websocket.send(json.dumps({
+        "type": "conversation.item.input_audio_transcription.completed", "item_id": user_item,
+        "content_index": 0, "transcript": FAKE_TRANSCRIPT
+    }))
+    await asyncio.sleep(max(0.0, state.response_delay - state.transcription_delay))
+    response_id = f"resp_{uuid.uuid4().hex[:12]}"
+    item_id = f"item_{uuid.uuid4().hex[:12]}"
+    await websocket.send(json.dumps({"type": "response.created", "response": {"id": response_id}}))
+    await websocket.send(json.dumps({"type": "response.audio_transcript.delta", "item_id": item_id, "delta": FAKE_REPLY}))
+    delta = base64.b64encode(bytes(state.delta_bytes)).decode("ascii")
+    audio_started = time.monotonic()
+    sent_ms = 0
+    while sent_ms < state.response_audio_ms:
+        await websocket.send(json.dumps({
+            "type": "response.audio.delta", "response_id": response_id, "item_id": item_id,
+            "content_index": 0, "delta": delta
+        }))
+        sent_ms += state.delta_ms
+        await asyncio.sleep(state.delta_interval)
+    await websocket.send(json.dumps({"type": "response.audio.done", "response_id": response_id, "item_id": item_id}))
+    await websocket.send(json.dumps({"type": "response.done", "response": {"id": response_id, "status": "completed"}}))
+    state.turns += 1
+    # The candidate listens to the whole reply before speaking again (no barge-in)
+    await asyncio.sleep(max(0.0, state.response_audio_ms / 1000 - (time.monotonic() - audio_started)) + 0.2)
+
+
+async def _handle(websocket, state: FakeRealtimeState):
+    state.connections += 1
+    received_types = []
+    state.received.append(received_types)
+    session_id = f"sess_fake_{uuid.uuid4().hex[:12]}"
+    await asyncio.sleep(state.ready_delay)
+    await websocket.send(json.dumps({"type": "session.created", "session": {"id": session_id}}))
+    received = 0
+    turn_bytes = 0
+    responding = None
+    try:
+        async for message in websocket:
+            event = json.loads(message)
+            event_type = event.get("type", "")
+            state.count(event_type)
+            received_types.append(event_type)
+            received += 1
+            if state.drop_after and received >= state.drop_after and state.drops < state.max_drops:
+                state.drops += 1
+                await websocket.close(1011, "injected drop")
+                return
+            if event_type == "session.update":
+                await websocket.send(json.dumps({"type": "session.updated", "session": {"id": session_id, **event.get("session", {})}}))
+            elif event_type == "conversation.item.create":
+                item = {"id": f"item_{uuid.uuid4().hex[:12]}", **event.get("item", {})}
+                await websocket.send(json.dumps({"type": "conversation.item.created", "item": item}))
+            elif event_type == "input_audio_buffer.append":
+                appended = len(event.get("audio", "")) * 3 // 4
+                state.audio_bytes += appended
+                if not state.respond or (responding is not None and not responding.done()):
+                    continue
+                if turn_bytes == 0:
+                    await websocket.send(json.dumps({"type": "input_audio_buffer.speech_started"}))
+                turn_bytes += appended
+                if turn_bytes >= state.turn_bytes:
+                    turn_bytes = 0
+                    responding = asyncio.get_running_loop().create_task(_respond(websocket, state))
+    finally:
+        if responding is not None:
+            responding.cancel()
+
+
+class FakeRealtimeServer:
+    """Runs the fake on its own event loop thread; stop() shuts it down"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766, **options):
+        self.host = host
+        self.port = port
+        self.state = FakeRealtimeState(**options)
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._stop = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/realtime"
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(lambda ws: _handle(ws, self.state), self.host, self.port):
+            self._ready.set()
+            await self._stop.wait()
+
+    def start(self) -> "FakeRealtimeServer":
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(5)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8766, **options) -> FakeRealtimeServer:
+    """Start the fake in a background thread and return it (call stop() to shut down)"""
+    return FakeRealtimeServer(host, port, **options).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI Realtime websocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--ready-delay", type=float, default=0.0)
+    parser.add_argument("--drop-after", type=int, default=0)
+    parser.add_argument("--max-drops", type=int, default=1)
+    parser.add_argument("--respond", action="store_true", help="Answer each utterance with transcription and audio")
+    parser.add_argument("--turn-audio-ms", type=int, default=1500)
+    parser.add_argument("--transcription-delay", type=float, default=0.05)
+    parser.add_argument("--response-delay", type=float, default=0.3)
+    parser.add_argument("--response-audio-ms", type=int, default=2000)
+    parser.add_argument("--delta-ms", type=int, default=100)
+    parser.add_argument("--delta-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    async def run():
+        state = FakeRealtimeState(
+            ready_delay=args.ready_delay, drop_after=args.drop_after, max_drops=args.max_drops, respond=args.respond,
+            turn_audio_ms=args.turn_audio_ms, transcription_delay=args.transcription_delay,
+            response_delay=args.response_delay, response_audio_ms=args.response_audio_ms,
+            delta_ms=args.delta_ms, delta_interval=args.delta_interval
+        )
+        async with websockets.serve(lambda ws: _handle(ws, state), args.host, args.port):
+            print(f"Fake Realtime listening on ws://{args.host}:{args.port}/v1/realtime")
+            await asyncio.Future()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
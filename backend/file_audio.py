@@ -0,0 +1,117 @@
+# file_audio.py
+import sys
+import math
+import time
+import wave
+import array
+import asyncio
+import logging
+import threading
+from audio_manager import AudioManager
+
+logger = logging.getLogger(__name__)
+
+
+def load_pcm(path: str, sample_rate: int = 24000) -> bytes:
+    """PCM16 mono from a .wav (which must already be at sample_rate) or a raw .pcm file"""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as w:
+            if w.getnchannels() != 1 or w.getsampwidth() != 2 or w.getframerate() != sample_rate:
+                raise ValueError(
+                    f"{path}: need mono 16-bit {sample_rate} Hz, got {w.getnchannels()} channel(s), "
+                    f"{8 * w.getsampwidth()}-bit, {w.getframerate()} Hz"
+                )
+            return w.readframes(w.getnframes())
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def synthetic_speech(sample_rate: int = 24000, speech_ms: int = 1800, pause_ms: int = 600, amplitude: int = 4000) -> bytes:
+    """One utterance of a modulated tone plus a pause; loud enough to open the client VAD gate"""
+    samples = array.array("h", (
+        int(amplitude * math.sin(2 * math.pi * 220 * i / sample_rate) * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / sample_rate)))
+        for i in range(sample_rate * speech_ms // 1000)
+    ))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes() + bytes(sample_rate * 2 * pause_ms // 1000)
+
+
+class _PacedOutput:
+    """Stands in for a PyAudio output stream: write() blocks for as long as the audio lasts"""
+
+    def __init__(self, sample_rate: int):
+        self.bytes_per_second = sample_rate * 2
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        time.sleep(len(data) / self.bytes_per_second)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileAudioManager(AudioManager):
+    """AudioManager fed from PCM instead of a microphone, playing into a paced null device.
+
+    A capture thread hands one chunk_size frame per period to the event loop,
+    like PyAudio's callback, looping over the audio. Playback runs the real
+    ring/jitter-buffer worker; only the device write is replaced. Needs no
+    PyAudio, so InterviewBot can be benchmarked headless.
+    """
+
+    def __init__(self, pcm: bytes, sample_rate: int = 24000, chunk_size: int = 512, loop_audio: bool = True, **kwargs):
+        super().__init__(sample_rate=sample_rate, chunk_size=chunk_size, **kwargs)
+        if len(pcm) < chunk_size * 2:
+            raise ValueError("PCM source is shorter than one capture frame")
+        self.pcm = pcm
+        self.loop_audio = loop_audio
+        self.capture_thread = None
+
+    def start_streams(self, input_device_index=None, output_device_index=None, loop=None):
+        self._loop = loop or asyncio.get_event_loop()
+        self.capture_queue = asyncio.Queue(maxsize=self.capture_queue_depth)
+        self.output_stream = _PacedOutput(self.sample_rate)
+        self.playback_active = True
+        self.playback_thread = threading.Thread(target=self._playback_worker, daemon=True)
+        self.playback_thread.start()
+        self.capture_thread = threading.Thread(target=self._capture_worker, daemon=True)
+        self.capture_thread.start()
+
+    def _capture_worker(self):
+        frame_bytes = self.chunk_size * 2
+        period = self.chunk_size / self.sample_rate
+        pcm = memoryview(self.pcm)
+        offset = 0
+        next_at = time.perf_counter()
+        while self.playback_active:
+            frame = bytes(pcm[offset:offset + frame_bytes])
+            offset += frame_bytes
+            if len(frame) < frame_bytes or offset >= len(pcm):
+                if not self.loop_audio:
+                    break
+                missing = frame_bytes - len(frame)
+                frame += bytes(pcm[:missing])
+                offset = missing
+            try:
+                self._loop.call_soon_threadsafe(self._enqueue_captured, frame)
+            except RuntimeError:
+                break  # Event loop closed
+            next_at += period
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -period:
+                # A real device would have overrun its buffer by now
+                self.capture_stats['input_overflows'] += 1
+                next_at = time.perf_counter()
+
+    def stop(self):
+        self.playback_active = False
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join(timeout=1)
+        super().stop()
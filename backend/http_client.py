@@ -0,0 +1,209 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+import httpx
+try:
+    from backend.metrics import outbound_request_duration_seconds
+except Exception:  # Fallback when running as a script
+    from metrics import outbound_request_duration_seconds
+
+logger = logging.getLogger(__name__)
+
+# Pool and retry policy shared by every outbound call (Supabase storage, OpenAI, document fetches)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "16"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 8.0
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _observe(method: str, url: str, started: float, response: httpx.Response | None):
+    """One attempt (excluding time queued for a host slot); status is 'error' when nothing came back"""
+    status = response.status_code if response is not None else "error"
+    outbound_request_duration_seconds.observe(time.perf_counter() - started, host=_host(url),
+                                              method=method.upper(), status=str(status))
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None = None) -> float:
+    """Exponential backoff with full jitter; honours a numeric Retry-After"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _can_retry(method: str, idempotent: bool | None, attempt: int, retries: int) -> bool:
+    if attempt >= retries:
+        return False
+    return idempotent if idempotent is not None else method.upper() in IDEMPOTENT_METHODS
+
+
+class AsyncHttpClient:
+    """Shared httpx.AsyncClient with keep-alive pooling, per-host limits and retries.
+
+    Connection errors (request never reached the server) are always retried;
+    retryable statuses and read timeouts only for idempotent requests. POSTs
+    opt in with idempotent=True (e.g. Supabase uploads with x-upsert).
+    """
+
+    def __init__(self, per_host_limit: int = HTTP_PER_HOST_LIMIT, retries: int = HTTP_RETRIES):
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self._client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=_limits())
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = _host(url)
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slot
+
+    async def request(self, method: str, url: str, *, idempotent: bool | None = None,
+                      retries: int | None = None, **kwargs) -> httpx.Response:
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                async with self._slot(url):
+                    started, response = time.perf_counter(), None
+                    try:
+                        response = await self._client.request(method, url, **kwargs)
+                    finally:
+                        _observe(method, url, started, response)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt >= retries:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"{method} {_host(url)} failed to connect ({e!r}); retry in {delay:.2f}s")
+            except httpx.TransportError as e:
+                if not _can_retry(method, idempotent, attempt, retries):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"{method} {_host(url)} failed ({e!r}); retry in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or not _can_retry(method, idempotent, attempt, retries):
+                    return response
+                delay = _retry_delay(attempt, response)
+                logger.warning(f"{method} {_host(url)} returned {response.status_code}; retry in {delay:.2f}s")
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class SyncHttpClient:
+    """Thread-safe pooled httpx.Client with the same policy, for worker threads"""
+
+    def __init__(self, per_host_limit: int = HTTP_PER_HOST_LIMIT, retries: int = HTTP_RETRIES):
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self._client = httpx.Client(timeout=HTTP_TIMEOUT, limits=_limits())
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = _host(url)
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def request(self, method: str, url: str, *, idempotent: bool | None = None,
+                retries: int | None = None, **kwargs) -> httpx.Response:
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                with self._slot(url):
+                    started, response = time.perf_counter(), None
+                    try:
+                        response = self._client.request(method, url, **kwargs)
+                    finally:
+                        _observe(method, url, started, response)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt >= retries:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"{method} {_host(url)} failed to connect ({e!r}); retry in {delay:.2f}s")
+            except httpx.TransportError as e:
+                if not _can_retry(method, idempotent, attempt, retries):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"{method} {_host(url)} failed ({e!r}); retry in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or not _can_retry(method, idempotent, attempt, retries):
+                    return response
+                delay = _retry_delay(attempt, response)
+                logger.warning(f"{method} {_host(url)} returned {response.status_code}; retry in {delay:.2f}s")
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+
+_async_client: AsyncHttpClient | None = None
+_sync_client: SyncHttpClient | None = None
+_sync_client_lock = threading.Lock()
+
+
+def get_http_client() -> AsyncHttpClient:
+    """Process-wide async client; create and use it from the server event loop only"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncHttpClient()
+    return _async_client
+
+
+def get_sync_http_client() -> SyncHttpClient:
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is None:
+            _sync_client = SyncHttpClient()
+        return _sync_client
+
+
+async def close_http_clients():
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    with _sync_client_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
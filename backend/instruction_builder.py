@@ -0,0 +1,305 @@
+# instruction_builder.py
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from interview_utils import (
+    extract_resume_content,
+    extract_job_title,
+    extract_candidate_name,
+    get_time_greeting
+)
+from prompts_repo import (
+    INTERVIEW_STATIC_INSTRUCTIONS,
+    INTERVIEW_SESSION_INSTRUCTIONS,
+    SHORT_INTERVIEW_STRUCTURE,
+    MEDIUM_INTERVIEW_STRUCTURE,
+    FULL_INTERVIEW_STRUCTURE,
+    PHASE_STATIC_INSTRUCTIONS,
+    PHASE_SESSION_INSTRUCTIONS,
+    PHASE_GOALS
+)
+
+PHASE_TITLES = {'introduction': 'INTRODUCTION', 'technical': 'TECHNICAL DISCUSSION', 'wrap_up': 'WRAP-UP'}
+
+PRESCREENING_KEYWORDS = ['availability', 'notice period', 'salary', 'location', 'visa', 'authorization', 'relocate', 'travel', 'interested', 'why', 'motivation']
+TECHNICAL_KEYWORDS = ['experience', 'worked', 'architect', 'deploy', 'difference', 'manage', 'technical', 'programming', 'coding', 'algorithm', 'database', 'system']
+
+
+def categorize_custom_questions(questions) -> dict:
+    """Split recruiter questions into prescreening/technical/general lists by keyword"""
+    categorized = {'prescreening_questions': [], 'technical_custom_questions': [], 'custom_questions': []}
+    for question in questions:
+        question_lower = question.lower()
+
+        if any(keyword in question_lower for keyword in PRESCREENING_KEYWORDS):
+            categorized['prescreening_questions'].append(question)
+        elif any(keyword in question_lower for keyword in TECHNICAL_KEYWORDS):
+            categorized['technical_custom_questions'].append(question)
+        else:
+            categorized['custom_questions'].append(question)
+    return categorized
+
+
+def format_generated_questions(questions_data: dict) -> str:
+    """Format LLM-generated questions for prompt inclusion"""
+    if not questions_data:
+        return "No generated questions available - use general interview approach."
+
+    sections = []
+
+    # Technical Questions
+    tech_questions = questions_data.get('technical_questions', [])
+    if tech_questions:
+        sections.append("TECHNICAL QUESTIONS (LLM-Generated):")
+        for i, q in enumerate(tech_questions[:5], 1):
+            category = q.get('category', 'General')
+            question = q.get('question', '')
+            difficulty = q.get('difficulty', 'medium')
+            follow_up = q.get('follow_up', '')
+            sections.append(f"{i}. [{category}] {question} (Difficulty: {difficulty})")
+            if follow_up:
+                sections.append(f"   Follow-up: {follow_up}")
+
+    # Project Questions
+    project_questions = questions_data.get('project_questions', [])
+    if project_questions:
+        sections.append("\nPROJECT-SPECIFIC QUESTIONS (LLM-Generated):")
+        for i, q in enumerate(project_questions[:3], 1):
+            project = q.get('project', 'Recent Project')
+            question = q.get('question', '')
+            follow_up = q.get('follow_up', '')
+            sections.append(f"{i}. [Project: {project}] {question}")
+            if follow_up:
+                sections.append(f"   Follow-up: {follow_up}")
+
+    # Behavioral Questions
+    behavioral_questions = questions_data.get('behavioral_questions', [])
+    if behavioral_questions:
+        sections.append("\nBEHAVIORAL QUESTIONS (LLM-Generated):")
+        for i, q in enumerate(behavioral_questions[:3], 1):
+            category = q.get('category', 'General')
+            question = q.get('question', '')
+            context = q.get('context', '')
+            sections.append(f"{i}. [{category}] {question}")
+            if context:
+                sections.append(f"   Context: {context}")
+
+    if not sections:
+        return "No generated questions available - use general interview approach."
+
+    sections.append("\nUSAGE: Reference these questions systematically during the interview. Use them as your primary question bank.")
+    return "\n".join(sections)
+
+
+def format_phase_questions(phase: str, questions_data: dict, prescreening_questions=(),
+                           technical_custom_questions=(), custom_questions=()) -> str:
+    """Only the questions that belong to one interview phase"""
+    lines = []
+    if phase == "introduction":
+        lines += [f"- {q}" for q in prescreening_questions]
+    elif phase == "technical":
+        for q in questions_data.get('project_questions', [])[:3]:
+            lines.append(f"- [Project: {q.get('project', 'Recent Project')}] {q.get('question', '')}")
+        for q in questions_data.get('technical_questions', [])[:5]:
+            lines.append(f"- [{q.get('category', 'General')}] {q.get('question', '')}")
+        lines += [f"- {q}" for q in technical_custom_questions]
+    elif phase == "wrap_up":
+        for q in questions_data.get('behavioral_questions', [])[:3]:
+            lines.append(f"- [{q.get('category', 'General')}] {q.get('question', '')}")
+        # Whatever recruiter questions are still open must be asked before closing
+        lines += [f"- {q}" for q in (*prescreening_questions, *technical_custom_questions)]
+    if phase != "introduction":
+        lines += [f"- {q}" for q in custom_questions]
+    return "\n".join(lines) if lines else "No prepared questions - follow up on the conversation so far."
+
+
+def format_custom_questions(prescreening_questions=(), technical_custom_questions=(), custom_questions=()) -> str:
+    """Format custom recruiter questions for prompt inclusion"""
+    if not custom_questions and not prescreening_questions and not technical_custom_questions:
+        return "No custom recruiter questions provided."
+
+    sections = []
+
+    if prescreening_questions:
+        sections.append("PRE-SCREENING QUESTIONS (Ask after introduction):")
+        for i, question in enumerate(prescreening_questions, 1):
+            sections.append(f"{i}. {question}")
+
+    if technical_custom_questions:
+        sections.append("\nTECHNICAL CUSTOM QUESTIONS (Ask during technical phase):")
+        for i, question in enumerate(technical_custom_questions, 1):
+            sections.append(f"{i}. {question}")
+
+    if custom_questions:
+        sections.append("\nGENERAL CUSTOM QUESTIONS (Ask during appropriate phases):")
+        for i, question in enumerate(custom_questions, 1):
+            sections.append(f"{i}. {question}")
+
+    sections.append("\nUSAGE: Integrate these questions naturally during specified interview phases. These are recruiter-specific requirements that must be covered.")
+    return "\n".join(sections)
+
+
+class InstructionBuilder:
+    """Renders interview instructions from plain inputs, with no I/O or model calls.
+
+    Question generation stays with the caller (see question_cache); the builder
+    only formats. Rendered prompts are memoized on every input, including the
+    time-of-day greeting, in a small LRU.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def build(self, job_description: str, candidate_resume: str, questions_data: dict = None,
+              interview_duration: int = 30, voice: str = "cedar", prescreening_questions=(),
+              technical_custom_questions=(), custom_questions=(), time_greeting: str = None) -> str:
+        time_greeting = time_greeting or get_time_greeting()
+        return self._memoized(
+            [job_description, candidate_resume, questions_data or {}, interview_duration, voice,
+             list(prescreening_questions), list(technical_custom_questions), list(custom_questions), time_greeting],
+            lambda: self._render(
+                job_description, candidate_resume, questions_data or {}, interview_duration, voice,
+                format_custom_questions(prescreening_questions, technical_custom_questions, custom_questions),
+                time_greeting
+            )
+        )
+
+    def build_phase(self, phase: str, job_description: str, candidate_resume: str, questions_data: dict = None,
+                    phase_minutes: int = 5, voice: str = "cedar", prescreening_questions=(),
+                    technical_custom_questions=(), custom_questions=(), transition_note: str = "",
+                    time_greeting: str = None) -> str:
+        """Compact instructions for one phase: shared rules plus that phase's goal, context and questions.
+
+        Callers pass only the recruiter questions still open, so each phase
+        prompt shrinks as questions get asked.
+        """
+        time_greeting = time_greeting or get_time_greeting()
+        return self._memoized(
+            ['phase', phase, job_description, candidate_resume, questions_data or {}, phase_minutes, voice,
+             list(prescreening_questions), list(technical_custom_questions), list(custom_questions),
+             transition_note, time_greeting],
+            lambda: self._render_phase(
+                phase, job_description, candidate_resume, questions_data or {}, phase_minutes, voice,
+                format_phase_questions(phase, questions_data or {}, prescreening_questions,
+                                       technical_custom_questions, custom_questions),
+                transition_note, time_greeting
+            )
+        )
+
+    def _memoized(self, key_parts: list, render) -> str:
+        key = hashlib.sha256(json.dumps(key_parts, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.stats['hits'] += 1
+                return cached
+            self.stats['misses'] += 1
+
+        instructions = render()
+        with self._lock:
+            self._memo[key] = instructions
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return instructions
+
+    def _render_phase(self, phase, job_description, candidate_resume, questions_data, phase_minutes, voice,
+                      phase_questions, transition_note, time_greeting) -> str:
+        job_title = extract_job_title(job_description)
+        candidate_name = extract_candidate_name(candidate_resume)
+        voice_title = voice.title()
+        names = dict(time_greeting=time_greeting, candidate_name=candidate_name, voice_title=voice_title, job_title=job_title)
+
+        # Only the context the phase needs: background for the intro, projects and requirements for the technical part
+        if phase == "introduction":
+            phase_context = f"CANDIDATE CONTEXT:\n{candidate_resume[:800]}..."
+        elif phase == "technical":
+            tech_categories = [q.get('category', '') for q in questions_data.get('technical_questions', [])]
+            tech_section = ', '.join(set(tech_categories[:5])) if tech_categories else 'Core technical skills, problem-solving'
+            phase_context = (
+                f"RESUME PROJECTS TO REFERENCE:\n{extract_resume_content(candidate_resume)}\n\n"
+                f"KEY TECHNICAL AREAS:\n{tech_section}\n\n"
+                f"JOB REQUIREMENTS:\n{job_description[:1000]}..."
+            )
+        else:
+            phase_context = f"ROLE: {job_title}"
+
+        return PHASE_STATIC_INSTRUCTIONS + PHASE_SESSION_INSTRUCTIONS.format(
+            transition_note=f"\n{transition_note}\n" if transition_note else "",
+            phase_title=PHASE_TITLES.get(phase, phase.upper()),
+            phase_minutes=phase_minutes,
+            phase_goal=PHASE_GOALS.get(phase, "Continue the interview naturally.").format(**names),
+            phase_context=phase_context,
+            phase_questions=phase_questions,
+            **names
+        )
+
+    def _render(self, job_description, candidate_resume, questions_data, interview_duration, voice,
+                custom_questions_section, time_greeting) -> str:
+        # Extract dynamic elements
+        resume_projects = extract_resume_content(candidate_resume)
+        job_title = extract_job_title(job_description)
+        candidate_name = extract_candidate_name(candidate_resume)
+        voice_title = voice.title()
+
+        tech_categories = [q.get('category', '') for q in questions_data.get('technical_questions', [])]
+        skills_focus = ', '.join(set(tech_categories[:5])) if tech_categories else 'general technical skills'
+        tech_section = skills_focus if skills_focus != 'general technical skills' else 'Core technical skills, problem-solving'
+
+        # Format generated questions for prompt
+        generated_questions_section = format_generated_questions(questions_data)
+
+        # Select appropriate interview structure template
+        if interview_duration <= 10:
+            interview_structure = SHORT_INTERVIEW_STRUCTURE.format(
+                duration=interview_duration,
+                time_greeting=time_greeting,
+                candidate_name=candidate_name,
+                voice_title=voice_title,
+                job_title=job_title,
+                focused_time=interview_duration - 2
+            )
+        elif interview_duration <= 20:
+            interview_structure = MEDIUM_INTERVIEW_STRUCTURE.format(
+                duration=interview_duration,
+                time_greeting=time_greeting,
+                candidate_name=candidate_name,
+                voice_title=voice_title,
+                job_title=job_title,
+                project_time=interview_duration - 5
+            )
+        else:
+            interview_structure = FULL_INTERVIEW_STRUCTURE.format(
+                duration=interview_duration,
+                time_greeting=time_greeting,
+                candidate_name=candidate_name,
+                voice_title=voice_title,
+                job_title=job_title
+            )
+
+        # Static prefix verbatim (shared across sessions for prompt caching), then the per-session tail
+        return INTERVIEW_STATIC_INSTRUCTIONS + INTERVIEW_SESSION_INSTRUCTIONS.format(
+            voice_title=voice_title,
+            job_title=job_title,
+            candidate_name=candidate_name,
+            time_greeting=time_greeting,
+            candidate_resume=candidate_resume[:1500],
+            job_description=job_description[:1500],
+            interview_structure=interview_structure,
+            tech_section=tech_section,
+            resume_projects=resume_projects,
+            generated_questions_section=generated_questions_section,
+            custom_questions_section=custom_questions_section
+        )
+
+
+_shared_builder = InstructionBuilder()
+
+
+def get_instruction_builder() -> InstructionBuilder:
+    return _shared_builder
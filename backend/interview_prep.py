@@ -0,0 +1,201 @@
+import os
+import json
+import contextvars
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fastapi import HTTPException
+try:
+    from backend.database import SessionLocal
+    from backend.models import Resume, Recruiter, InterviewPrep
+    from backend.documents import get_document_text
+    from backend.metrics import timed
+except Exception:  # Fallback when running as a script
+    from database import SessionLocal
+    from models import Resume, Recruiter, InterviewPrep
+    from documents import get_document_text
+    from metrics import timed
+
+# Shared with the CLI bot, which imports them flat (backend/__init__ puts them on sys.path)
+from interview_utils import generate_interview_questions, get_time_greeting
+from question_cache import get_question_cache, questions_cache_key
+from instruction_builder import get_instruction_builder, categorize_custom_questions
+from tracing import span, set_attribute
+
+logger = logging.getLogger(__name__)
+
+# Duration the instructions are rendered for ahead of time (the web client asks for 30)
+PREP_INTERVIEW_DURATION = int(os.getenv("PREP_INTERVIEW_DURATION", "30"))
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PREP_WORKERS", "2")), thread_name_prefix="interview-prep")
+
+
+def load_interview_texts(db, resume_row: Resume | None, recruiter_row: Recruiter | None) -> tuple[str, str]:
+    """(resume_txt, jd_txt) for a resume and its latest recruiter row, from the parsed-text store"""
+    resume_path = resume_row.resume_path if resume_row else None
+    jd_path = recruiter_row.jd_file_path if recruiter_row else None
+    jd_dict = recruiter_row.jd if recruiter_row else None
+
+    # Build jd_txt: prefer file path, else use jd dict
+    jd_txt = ""
+    if jd_path:
+        try:
+            jd_txt = get_document_text(db, jd_path)
+        except HTTPException:
+            jd_txt = ""
+    if not jd_txt and jd_dict:
+        title = (jd_dict or {}).get("title") or ""
+        desc = (jd_dict or {}).get("description") or ""
+        jd_txt = f"{title}\n\n{desc}".strip()
+
+    # Build resume_txt
+    resume_txt = ""
+    if resume_path:
+        try:
+            resume_txt = get_document_text(db, resume_path)
+        except HTTPException:
+            resume_txt = ""
+    return resume_txt, jd_txt
+
+
+def prep_input_hash(jd_txt: str, resume_txt: str, questions_dict: dict | None, interview_duration: int) -> str:
+    payload = json.dumps([jd_txt or "", resume_txt or "", questions_dict or {}, interview_duration],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _generate_questions(api_key: str, jd_txt: str, resume_txt: str) -> dict:
+    """Cache-miss path: one LLM call, timed for /metrics"""
+    set_attribute('question_cache_hit', False)
+    with timed("question_generation"):
+        return generate_interview_questions(api_key, jd_txt, resume_txt)
+
+
+def render_interview_instructions(api_key: str, jd_txt: str, resume_txt: str, questions_dict: dict | None = None,
+                                  interview_duration: int = 30, questions_data: dict | None = None) -> str:
+    """Realtime session instructions for a JD/resume (generated questions come from the shared cache)"""
+    if questions_data is None:
+        with span("questions.get", question_cache_hit=True):
+            questions_data = get_question_cache().get_or_compute(
+                questions_cache_key(jd_txt, resume_txt),
+                lambda: _generate_questions(api_key, jd_txt, resume_txt)
+            )
+    custom = categorize_custom_questions(list(questions_dict.values())) if questions_dict else {}
+    with span("instructions.render", custom_questions=len(questions_dict or {})) as render_span:
+        instructions = get_instruction_builder().build(
+            jd_txt, resume_txt, questions_data, interview_duration=interview_duration, voice="marin", **custom
+        )
+        render_span.set('instruction_chars', len(instructions))
+    return instructions
+
+
+def schedule_interview_prep(db, resume_id: int) -> int:
+    """Record a pending prep for the resume and build it in the background; returns prep_id"""
+    now = datetime.utcnow()
+    prep = InterviewPrep(
+        resume_id=resume_id,
+        status="pending",
+        interview_duration=PREP_INTERVIEW_DURATION,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(prep)
+    db.commit()
+    db.refresh(prep)
+    # Carry the request's correlation id and trace into the worker thread
+    _executor.submit(contextvars.copy_context().run, _traced_interview_prep, prep.prep_id)
+    return prep.prep_id
+
+
+def _set_status(db, prep: InterviewPrep, status: str, error: str | None = None):
+    prep.status = status
+    prep.error = error
+    prep.updated_at = datetime.utcnow()
+    db.add(prep)
+    db.commit()
+
+
+def _traced_interview_prep(prep_id: int):
+    with span("interview_prep.run", prep_id=prep_id):
+        _run_interview_prep(prep_id)
+
+
+def _run_interview_prep(prep_id: int):
+    """Extract texts -> generate the question set -> render instructions, off the request path"""
+    db = SessionLocal()
+    prep = None
+    try:
+        prep = db.query(InterviewPrep).filter(InterviewPrep.prep_id == prep_id).first()
+        if prep is None:
+            return
+        _set_status(db, prep, "running")
+
+        resume_row = db.query(Resume).filter(Resume.resume_id == prep.resume_id).first()
+        recruiter_row = (
+            db.query(Recruiter)
+            .filter(Recruiter.resume_id == prep.resume_id)
+            .order_by(Recruiter.jd_id.desc())
+            .first()
+        )
+        resume_txt, jd_txt = load_interview_texts(db, resume_row, recruiter_row)
+        if recruiter_row is None or not jd_txt or not resume_txt:
+            # Resume uploaded before its JD; POST /recruiter schedules the full prep
+            _set_status(db, prep, "awaiting_jd")
+            return
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY not configured on server")
+
+        with span("questions.get", question_cache_hit=True):
+            questions = get_question_cache().get_or_compute(
+                questions_cache_key(jd_txt, resume_txt),
+                lambda: _generate_questions(api_key, jd_txt, resume_txt)
+            )
+        time_greeting = get_time_greeting()
+        instructions = render_interview_instructions(
+            api_key, jd_txt, resume_txt, recruiter_row.questions, prep.interview_duration, questions
+        )
+
+        prep.jd_id = recruiter_row.jd_id
+        prep.questions = questions
+        prep.instructions = instructions
+        prep.time_greeting = time_greeting
+        prep.input_hash = prep_input_hash(jd_txt, resume_txt, recruiter_row.questions, prep.interview_duration)
+        _set_status(db, prep, "ready")
+        logger.info(f"Interview prep {prep_id} ready for resume {prep.resume_id}")
+    except Exception as e:
+        logger.exception(f"Interview prep {prep_id} failed")
+        db.rollback()
+        if prep is not None:
+            try:
+                _set_status(db, prep, "failed", str(e))
+            except Exception:
+                db.rollback()
+    finally:
+        db.close()
+
+
+def get_latest_prep(db, resume_id: int) -> InterviewPrep | None:
+    return (
+        db.query(InterviewPrep)
+        .filter(InterviewPrep.resume_id == resume_id)
+        .order_by(InterviewPrep.prep_id.desc())
+        .first()
+    )
+
+
+def find_ready_instructions(db, resume_id: int, jd_txt: str | None, resume_txt: str | None,
+                            questions_dict: dict | None, interview_duration: int) -> str | None:
+    """Precomputed instructions for this session, or None if they are missing or stale"""
+    # Only the newest prep counts: an older ready one may be built from a replaced JD
+    prep = get_latest_prep(db, resume_id)
+    if prep is None or prep.status != "ready" or not prep.instructions:
+        return None
+    if prep.interview_duration != interview_duration or prep.time_greeting != get_time_greeting():
+        return None
+    # When the client sends the texts, they must be what the prep was built from
+    if jd_txt and resume_txt and prep.input_hash != prep_input_hash(jd_txt, resume_txt, questions_dict, interview_duration):
+        return None
+    return prep.instructions
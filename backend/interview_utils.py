@@ -3,6 +3,7 @@ import re
 import json
 from datetime import datetime
 import openai
+from tracing import span, set_llm_usage
 from prompts_repo import QUESTION_GENERATION_PROMPT, INTERVIEW_BASE_INSTRUCTIONS, TRANSCRIPTION_PROMPT_TEMPLATE
 
 def extract_resume_content(resume_text: str) -> str:
@@ -42,13 +43,15 @@ def generate_interview_questions(api_key: str, jd: str, resume: str) -> dict:
     client = openai.OpenAI(api_key=api_key)
     prompt = QUESTION_GENERATION_PROMPT.format(job_description=jd[:2000], candidate_resume=resume[:2000])
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "system", "content": "You are an expert technical interviewer who creates challenging, fair, and role-appropriate interview questions. Always respond with valid JSON."},
-                      {"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=2000
-        )
+        with span("llm.generate_questions", model="gpt-4o", prompt_chars=len(prompt)):
+            resp = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "system", "content": "You are an expert technical interviewer who creates challenging, fair, and role-appropriate interview questions. Always respond with valid JSON."},
+                          {"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=2000
+            )
+            set_llm_usage(resp)
         txt = resp.choices[0].message.content.strip()
         # attempt to extract embedded json as in original
         if '```json' in txt:
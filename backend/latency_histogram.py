@@ -0,0 +1,69 @@
+# latency_histogram.py
+import math
+
+
+class LatencyHistogram:
+    """Streaming latency histogram with log-spaced buckets (~5% relative error).
+
+    Memory is fixed regardless of how many samples are recorded; quantiles
+    are read from bucket upper bounds, clamped to the observed min/max.
+    """
+
+    def __init__(self, min_seconds: float = 0.001, max_seconds: float = 120.0, growth: float = 1.05):
+        self.min_seconds = min_seconds
+        self._log_growth = math.log(growth)
+        self._growth = growth
+        self._counts = [0] * (int(math.log(max_seconds / min_seconds) / self._log_growth) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds: float):
+        if seconds < 0:
+            return
+        index = 0 if seconds <= self.min_seconds else int(math.log(seconds / self.min_seconds) / self._log_growth) + 1
+        self._counts[min(index, len(self._counts) - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's samples (same bucket layout), e.g. across sessions"""
+        if other.min_seconds != self.min_seconds or other._growth != self._growth or len(other._counts) != len(self._counts):
+            raise ValueError("Histograms have different bucket layouts")
+        if not other.count:
+            return
+        for index, bucket in enumerate(other._counts):
+            self._counts[index] += bucket
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket in enumerate(self._counts):
+            seen += bucket
+            if seen >= rank:
+                upper = self.min_seconds * self._growth ** index
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Milliseconds, rounded, for reports"""
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'p50_ms': ms(self.quantile(0.50)),
+            'p95_ms': ms(self.quantile(0.95)),
+            'p99_ms': ms(self.quantile(0.99)),
+            'min_ms': ms(self.min),
+            'max_ms': ms(self.max)
+        }
@@ -1,15 +1,16 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Response
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Response, Request, Header
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import Optional
 from typing import List, Any
 import os
 from datetime import datetime
 from io import BytesIO
-import requests
 import asyncio
 import json
 import base64
@@ -18,22 +19,34 @@ try:
     import websockets
 except Exception:
     websockets = None
-import PyPDF2
-try:
-    from docx import Document as DocxDocument
-except Exception:
-    DocxDocument = None
 try:
     from backend.database import Base, engine, get_db
     from backend.models import Candidate, Agent, CandidateInterviewFeedback, FileRecord, Resume, Recruiter
+    from backend.documents import store_document_text, document_text_metrics
+    from backend.http_client import get_http_client, close_http_clients
+    from backend.storage import get_storage, iter_upload, iter_file, chunked_uploads
+    from backend.interview_prep import schedule_interview_prep, get_latest_prep, find_ready_instructions, load_interview_texts, render_interview_instructions, PREP_INTERVIEW_DURATION
+    from backend.metrics import registry, timed, MetricsMiddleware, sqlalchemy_pool_collector, dict_collector
 except Exception:  # Fallback when running as a script
     from database import Base, engine, get_db
     from models import Candidate, Agent, Resume, Recruiter
+    from documents import store_document_text, document_text_metrics
+    from http_client import get_http_client, close_http_clients
+    from storage import get_storage, iter_upload, iter_file, chunked_uploads
+    from interview_prep import schedule_interview_prep, get_latest_prep, find_ready_instructions, load_interview_texts, render_interview_instructions, PREP_INTERVIEW_DURATION
+    from metrics import registry, timed, MetricsMiddleware, sqlalchemy_pool_collector, dict_collector
+
+# Flat, like the interview modules that open spans, so they share one tracer context
+from tracing import span, TracingMiddleware, install_log_correlation, get_exporter
 
 try:
-    from backend.bot_service import bot_service
+    from backend.bot_service import bot_service, EvaluationQueueFull
 except Exception:
-    bot_service = None
+    try:
+        from bot_service import bot_service, EvaluationQueueFull
+    except Exception:
+        bot_service = None
+        EvaluationQueueFull = RuntimeError
 
 
 class LoginRequest(BaseModel):
@@ -81,65 +94,66 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+install_log_correlation()
+
+registry.add_collector(sqlalchemy_pool_collector(engine))
+registry.add_collector(dict_collector("document_text", document_text_metrics, "Parsed-text store counter"))
 
 
 # Create tables if they do not exist
 Base.metadata.create_all(bind=engine)
-# --------------- Helpers: extract text from URL or filesystem ---------------
-def _fetch_bytes(path_or_url: str) -> bytes:
-    if path_or_url.startswith("http://") or path_or_url.startswith("https://"):
-        resp = requests.get(path_or_url, timeout=30)
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=400, detail=f"Failed to fetch URL: {path_or_url} - {resp.status_code}")
-        return resp.content
-    # local file path
-    try:
-        with open(path_or_url, "rb") as f:
-            return f.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {path_or_url} - {e}")
 
 
-def _guess_ext(path_or_url: str) -> str:
-    base = path_or_url.split("?")[0]
-    dot = base.rfind(".")
-    return base[dot:].lower() if dot != -1 else ""
+@app.on_event("startup")
+def _start_evaluation_worker():
+    if bot_service is not None:
+        bot_service.start_worker()
 
 
-def extract_text_from_path(path_or_url: str) -> str:
-    if not path_or_url:
-        return ""
-    data = _fetch_bytes(path_or_url)
-    ext = _guess_ext(path_or_url)
-    # PDF
-    if ext == ".pdf":
-        try:
-            reader = PyPDF2.PdfReader(BytesIO(data))
-            text_parts: list[str] = []
-            for page in reader.pages:
-                page_text = page.extract_text() or ""
-                text_parts.append(page_text)
-            return "\n".join(text_parts)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"PDF parse error: {e}")
-    # DOCX
-    if ext == ".docx" and DocxDocument is not None:
-        try:
-            doc = DocxDocument(BytesIO(data))
-            return "\n".join(p.text for p in doc.paragraphs)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"DOCX parse error: {e}")
-    # TXT or unknown: try utf-8
-    try:
-        return data.decode("utf-8")
-    except Exception:
-        return data.decode("latin-1", errors="ignore")
+@app.on_event("shutdown")
+async def _close_http_clients():
+    await close_http_clients()
+
 
+@app.on_event("shutdown")
+def _flush_spans():
+    get_exporter().flush()
 
 
-# @app.get("/health")
-# def health():
-#     return {"ok": True}
+@app.on_event("shutdown")
+def _stop_evaluation_worker():
+    if bot_service is not None:
+        bot_service.shutdown()
+
+
+@app.get("/health")
+def health():
+    """Liveness: the process is up and serving requests"""
+    return {"ok": True}
+
+
+def _check_database():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness: 503 until the database answers, so load balancers hold traffic"""
+    try:
+        await asyncio.wait_for(run_in_threadpool(_check_database), timeout=5)
+    except Exception as e:
+        response.status_code = 503
+        return {"ok": False, "database": f"unavailable: {type(e).__name__}"}
+    return {"ok": True, "database": "ok"}
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition: request latency/counts, timed operations, DB pool"""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post("/auth/login", response_model=LoginResponse)
@@ -255,41 +269,66 @@ async def upload_resume(
     safe_name = os.path.basename(safe_name)
     storage_filename = f"resume_{timestamp}_{safe_name}"
 
-    file_bytes = await uploaded_file.read()
-
-    sb_url = ""
-    sb_service_key = ""
-    sb_bucket = os.getenv("SUPABASE_BUCKET", "files")
-    if not sb_url or not sb_service_key:
-        raise HTTPException(status_code=500, detail="Supabase configuration missing. Set SUPABASE_URL and SUPABASE_SERVICE_KEY.")
+    # Stream to storage in chunks instead of reading the whole file into memory
+    object_path = f"resumes/{storage_filename}"
+    public_url = await get_storage().put(
+        object_path, iter_upload(uploaded_file), uploaded_file.content_type, uploaded_file.size
+    )
 
+    # Parse once now, from the spooled upload; reads then come from the DB
     try:
-        import requests
-        object_path = f"resumes/{storage_filename}"
-        upload_endpoint = f"{sb_url}/storage/v1/object/{sb_bucket}/{object_path}"
-        headers = {
-            "Authorization": f"Bearer {sb_service_key}",
-            "apikey": sb_service_key,
-            "Content-Type": uploaded_file.content_type or "application/octet-stream",
-            "x-upsert": "true",
-        }
-        resp = requests.post(upload_endpoint, data=file_bytes, headers=headers, timeout=30)
-        if resp.status_code not in (200, 201):
-            raise HTTPException(status_code=500, detail=f"Supabase upload failed: {resp.status_code} {resp.text}")
-        public_url = f"{sb_url}/storage/v1/object/public/{sb_bucket}/{object_path}"
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Supabase upload error: {e}")
+        await uploaded_file.seek(0)
+        await run_in_threadpool(store_document_text, db, public_url, uploaded_file.file)
+    except HTTPException as e:
+        print(f"[WARN] Resume text extraction deferred: {e.detail}")
+
+    return await run_in_threadpool(_save_resume, db, public_url)
+
 
+def _save_resume(db: Session, public_url: str) -> dict:
     rec = Resume(resume_path=public_url, uploaded_at=datetime.utcnow())
     db.add(rec)
     db.commit()
     db.refresh(rec)
+    schedule_interview_prep(db, rec.resume_id)
 
     return {"resume_id": rec.resume_id, "resume_path": rec.resume_path, "uploaded_at": rec.uploaded_at}
 
 
+# ------------------- Resumable chunked uploads -------------------
+class UploadCreateRequest(BaseModel):
+    filename: str
+    total_size: int
+    content_type: Optional[str] = None
+
+
+def _store_file_text(db: Session, source: str, path: str) -> str:
+    with open(path, "rb") as f:
+        return store_document_text(db, source, f)
+
+
+async def _iter_request_body(request: Request):
+    async for chunk in request.stream():
+        if chunk:
+            yield chunk
+
+
+@app.post("/uploads")
+def create_upload(payload: UploadCreateRequest):
+    return chunked_uploads.create(payload.filename, payload.total_size, payload.content_type)
+
+
+@app.patch("/uploads/{upload_id}")
+async def append_upload(upload_id: str, request: Request, upload_offset: int = Header(...)):
+    # Body is the raw chunk; Upload-Offset is where it starts in the file
+    return await chunked_uploads.append(upload_id, upload_offset, _iter_request_body(request))
+
+
+@app.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    return chunked_uploads.status(upload_id)
+
+
 # ------------------- Recruiter create (JD) -------------------
 @app.post("/recruiter")
 async def create_recruiter(
@@ -299,10 +338,10 @@ async def create_recruiter(
     linkedin_url: Optional[str] = Form(None),
     questions_json: Optional[str] = Form(None),
     jd_file: UploadFile | None = File(None),
+    jd_upload_id: Optional[str] = Form(None),
     db: Session = Depends(get_db),
 ):
-    resume_row: Resume | None = db.query(Resume).filter(Resume.resume_id == resume_id).first()
-    if resume_row is None:
+    if not await run_in_threadpool(_resume_exists, db, resume_id):
         raise HTTPException(status_code=404, detail="resume_id not found")
 
     jd_file_path = None
@@ -310,31 +349,31 @@ async def create_recruiter(
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         safe_name = os.path.basename(jd_file.filename or "jd")
         storage_filename = f"jd_{timestamp}_{safe_name}"
-        file_bytes = await jd_file.read()
 
-        sb_url = "https://ceywatgfpiyfdhrqfbip.supabase.co"
-        sb_service_key = ""
-        sb_bucket = os.getenv("SUPABASE_BUCKET", "files")
-        if not sb_url or not sb_service_key:
-            raise HTTPException(status_code=500, detail="Supabase configuration missing. Set SUPABASE_URL and SUPABASE_SERVICE_KEY.")
+        object_path = f"jd/{storage_filename}"
+        jd_file_path = await get_storage().put(object_path, iter_upload(jd_file), jd_file.content_type, jd_file.size)
+
         try:
-            import requests
-            object_path = f"jd/{storage_filename}"
-            upload_endpoint = f"{sb_url}/storage/v1/object/{sb_bucket}/{object_path}"
-            headers = {
-                "Authorization": f"Bearer {sb_service_key}",
-                "apikey": sb_service_key,
-                "Content-Type": jd_file.content_type or "application/octet-stream",
-                "x-upsert": "true",
-            }
-            resp = requests.post(upload_endpoint, data=file_bytes, headers=headers, timeout=30)
-            if resp.status_code not in (200, 201):
-                raise HTTPException(status_code=500, detail=f"Supabase upload failed: {resp.status_code} {resp.text}")
-            jd_file_path = f"{sb_url}/storage/v1/object/public/{sb_bucket}/{object_path}"
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Supabase upload error: {e}")
+            await jd_file.seek(0)
+            await run_in_threadpool(store_document_text, db, jd_file_path, jd_file.file)
+        except HTTPException as e:
+            print(f"[WARN] JD text extraction deferred: {e.detail}")
+    elif jd_upload_id:
+        # Large JD sent earlier through the resumable /uploads endpoints
+        part_path, upload_meta = chunked_uploads.completed_path(jd_upload_id)
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        storage_filename = f"jd_{timestamp}_{upload_meta['filename']}"
+
+        object_path = f"jd/{storage_filename}"
+        jd_file_path = await get_storage().put(
+            object_path, iter_file(part_path), upload_meta["content_type"], upload_meta["total_size"]
+        )
+
+        try:
+            await run_in_threadpool(_store_file_text, db, jd_file_path, part_path)
+        except HTTPException as e:
+            print(f"[WARN] JD text extraction deferred: {e.detail}")
+        chunked_uploads.discard(jd_upload_id)
 
     # Parse questions from JSON if provided
     parsed_questions = None
@@ -376,6 +415,17 @@ async def create_recruiter(
         except Exception:
             questions_dict = None
 
+    return await run_in_threadpool(
+        _upsert_recruiter, db, resume_id, jd_title, jd_description, jd_file_path, questions_dict, linkedin_url
+    )
+
+
+def _resume_exists(db: Session, resume_id: int) -> bool:
+    return db.query(Resume.resume_id).filter(Resume.resume_id == resume_id).first() is not None
+
+
+def _upsert_recruiter(db: Session, resume_id: int, jd_title: str, jd_description: str, jd_file_path: Optional[str],
+                      questions_dict: Optional[dict], linkedin_url: Optional[str]) -> dict:
     # Upsert: update existing recruiter row by resume_id; otherwise create new
     existing: Recruiter | None = (
         db.query(Recruiter)
@@ -418,6 +468,7 @@ async def create_recruiter(
         db.add(existing)
         db.commit()
         db.refresh(existing)
+        schedule_interview_prep(db, resume_id)
 
         return {
             "jd_id": existing.jd_id,
@@ -441,6 +492,7 @@ async def create_recruiter(
     db.add(rec)
     db.commit()
     db.refresh(rec)
+    schedule_interview_prep(db, resume_id)
 
     return {
         "jd_id": rec.jd_id,
@@ -472,25 +524,8 @@ def get_recruiter_by_resume(resume_id: int, db: Session = Depends(get_db)):
     jd_dict = recruiter_row.jd if recruiter_row else None
     questions_dict = recruiter_row.questions if recruiter_row else None
 
-    # Build jd_txt: prefer file path, else use jd dict
-    jd_txt = ""
-    if jd_path:
-        try:
-            jd_txt = extract_text_from_path(jd_path)
-        except HTTPException:
-            jd_txt = ""
-    if not jd_txt and jd_dict:
-        title = (jd_dict or {}).get("title") or ""
-        desc = (jd_dict or {}).get("description") or ""
-        jd_txt = f"{title}\n\n{desc}".strip()
-
-    # Build resume_txt
-    resume_txt = ""
-    if resume_path:
-        try:
-            resume_txt = extract_text_from_path(resume_path)
-        except HTTPException:
-            resume_txt = ""
+    resume_txt, jd_txt = load_interview_texts(db, resume_row, recruiter_row)
+    prep = get_latest_prep(db, resume_id)
 
     return {
         "resume": {
@@ -514,13 +549,29 @@ def get_recruiter_by_resume(resume_id: int, db: Session = Depends(get_db)):
             "resume_txt": resume_txt,
             "jd_txt": jd_txt,
         },
+        "interview_prep": None if prep is None else {
+            "prep_id": prep.prep_id,
+            "status": prep.status,
+            "updated_at": prep.updated_at,
+        },
     }
 
 
+@app.get("/documents/metrics")
+def get_document_metrics():
+    """Parsed-text store hit/miss counters and PDF/DOCX parse timings"""
+    metrics = dict(document_text_metrics)
+    lookups = metrics["hits"] + metrics["revalidated"] + metrics["misses"]
+    metrics["hit_rate"] = (metrics["hits"] + metrics["revalidated"]) / lookups if lookups else 0.0
+    metrics["parse_seconds_avg"] = metrics["parse_seconds_total"] / metrics["parses"] if metrics["parses"] else 0.0
+    return metrics
+
+
 # ------------------- Bot control (Interview evaluation integration) -------------------
 class BotStartPayload(BaseModel):
     jd_txt: Optional[str] = None
     resume_txt: Optional[str] = None
+    questions_dict: Optional[dict[str, str]] = None
 
 
 class BotTranscriptPayload(BaseModel):
@@ -536,8 +587,10 @@ class BotStopPayload(BaseModel):
 def bot_start(payload: BotStartPayload):
     if bot_service is None:
         raise HTTPException(status_code=500, detail="Bot service unavailable")
-    session_id = bot_service.start(jd_txt=payload.jd_txt or "", resume_txt=payload.resume_txt or "")
-    return {"session_id": session_id}
+    session_id = bot_service.start(
+        jd_txt=payload.jd_txt or "", resume_txt=payload.resume_txt or "", questions_dict=payload.questions_dict
+    )
+    return {"started": True, "session_id": session_id}
 
 
 @app.post("/bot/transcript")
@@ -556,22 +609,26 @@ def bot_stop(payload: BotStopPayload):
     if bot_service is None:
         raise HTTPException(status_code=500, detail="Bot service unavailable")
     try:
-        evaluation = bot_service.stop_and_evaluate(payload.session_id)
+        job_id = bot_service.stop_and_evaluate(payload.session_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Invalid session_id")
+    except EvaluationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return {"evaluation": evaluation}
+    # Evaluation runs in the background; poll /bot/evaluation/{job_id}
+    return {"job_id": job_id, "session_id": payload.session_id, "status": "queued"}
 
 
 @app.get("/bot/evaluation/{session_id}")
 def bot_get_evaluation(session_id: str):
     if bot_service is None:
         raise HTTPException(status_code=500, detail="Bot service unavailable")
-    evaluation = bot_service.get_evaluation(session_id)
-    if evaluation is None:
+    # Accepts the session_id or the job_id returned by /bot/stop
+    job = bot_service.get_evaluation(session_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Not found")
-    return {"evaluation": evaluation}
+    return job
 
 # ------------------- WebRTC: Create ephemeral Realtime session token -------------------
 class WebRTCSessionRequest(BaseModel):
@@ -580,6 +637,7 @@ class WebRTCSessionRequest(BaseModel):
     resume_txt: Optional[str] = None
     questions_dict: Optional[dict] = None
     candidate_id: Optional[int] = None
+    resume_id: Optional[int] = None
     interview_duration: Optional[int] = 30
 
 @app.options("/webrtc/session")
@@ -590,7 +648,7 @@ def webrtc_session_options(response: Response):
     return {"message": "OK"}
 
 @app.post("/webrtc/session")
-def create_webrtc_session(payload: WebRTCSessionRequest, response: Response):
+async def create_webrtc_session(payload: WebRTCSessionRequest, response: Response, db: Session = Depends(get_db)):
     # Explicitly set CORS headers
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
@@ -614,51 +672,39 @@ def create_webrtc_session(payload: WebRTCSessionRequest, response: Response):
             "voice": payload.voice or "marin",
         }
 
-        # Add interview instructions if context is provided
-        if payload.jd_txt and payload.resume_txt:
+        # Add interview instructions: precomputed at recruiter creation when ready,
+        # otherwise rendered on demand if context is provided
+        instructions = None
+        # Same default on both paths, so a prep built for it can be found
+        interview_duration = payload.interview_duration or PREP_INTERVIEW_DURATION
+        if payload.resume_id is not None:
+            with span("webrtc.find_ready_instructions", resume_id=payload.resume_id) as prep_span:
+                instructions = await run_in_threadpool(
+                    find_ready_instructions, db, payload.resume_id, payload.jd_txt, payload.resume_txt,
+                    payload.questions_dict, interview_duration,
+                )
+                prep_span.set('prep_hit', instructions is not None)
+        if instructions is None and payload.jd_txt and payload.resume_txt:
             try:
-                # Import bot components
-                import sys
-                sys.path.append('/Users/kirtisikka/Downloads/voice/backend')
-                print(f"[DEBUG] Added path: /Users/kirtisikka/Downloads/voice/backend")
-                print(f"[DEBUG] Python path: {sys.path}")
-                
-                from bot import InterviewBot
-                print(f"[DEBUG] Successfully imported InterviewBot")
-                
-                # Create bot instance to generate instructions
-                bot = InterviewBot(api_key=api_key, voice="marin",language="en", interview_duration=payload.interview_duration or 6,)  # pyright: ignore[reportUndefinedVariable]
-                
-                # Set the context directly
-                bot.job_description = payload.jd_txt
-              
-                bot.candidate_resume = payload.resume_txt
-                bot.interview_mode = True
-                
-                # Load custom questions if provided
-                if payload.questions_dict:
-                    questions_list = list(payload.questions_dict.values())
-                    bot._categorize_custom_questions(questions_list)
-                
-                # Generate comprehensive interview instructions
-                instructions = bot.get_interview_instructions()
-                body["instructions"] = instructions
-            
-            except ImportError as e:
-                print(f"[ERROR] Import failed: {e}")
-                print(f"[ERROR] Import error type: {type(e).__name__}")
-                # Fallback to simple instructions if bot import fails
-               
+                with span("webrtc.render_instructions", jd_chars=len(payload.jd_txt), resume_chars=len(payload.resume_txt)):
+                    instructions = await run_in_threadpool(
+                        render_interview_instructions, api_key, payload.jd_txt, payload.resume_txt,
+                        payload.questions_dict, interview_duration,
+                    )
             except Exception as e:
-                print(f"[ERROR] Bot setup failed: {e}")
+                print(f"[ERROR] Instruction rendering failed: {e}")
                 print(f"[ERROR] Error type: {type(e).__name__}")
                 import traceback
                 print(f"[ERROR] Traceback: {traceback.format_exc()}")
-                # Fallback to simple instructions if bot setup fails
-                
-        
+                # Fall back to a session without instructions
+        if instructions:
+            body["instructions"] = instructions
+
         try:
-            r = requests.post(url, headers=headers, json=body, timeout=30)
+            with span("openai.realtime_session", model=model, instruction_chars=len(instructions or "")) as openai_span, \
+                    timed("openai_realtime_session"):
+                r = await get_http_client().post(url, headers=headers, json=body)
+                openai_span.set('http.status_code', r.status_code)
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Failed to reach OpenAI: {e}")
 
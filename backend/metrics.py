@@ -0,0 +1,221 @@
+import time
+import bisect
+import threading
+import contextlib
+
+# Seconds; covers fast DB reads up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._values.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics rendered in the Prometheus text exposition format (version 0.0.4).
+
+    Collectors are callables run at scrape time that return extra metrics
+    (e.g. pool gauges read from SQLAlchemy), so nothing polls in the background.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            try:
+                for metric in collector():
+                    lines += metric.render()
+            except Exception as e:
+                lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",)))
+operation_duration_seconds = registry.register(Histogram(
+    "operation_duration_seconds", "Duration of timed backend operations", ("operation", "outcome")))
+outbound_request_duration_seconds = registry.register(Histogram(
+    "outbound_request_duration_seconds", "Outbound HTTP calls by host", ("host", "method", "status")))
+
+
+@contextlib.contextmanager
+def timed(operation: str):
+    """Time a block into operation_duration_seconds; works in sync and async code"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        operation_duration_seconds.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+
+
+def sqlalchemy_pool_collector(engine):
+    """Collector exporting a SQLAlchemy QueuePool's size, checked-out and overflow counts"""
+    def collect():
+        pool = engine.pool
+        gauges = []
+        for name, help_text, read in (
+            ("db_pool_size", "Configured pool size", getattr(pool, "size", None)),
+            ("db_pool_checked_out", "Connections checked out", getattr(pool, "checkedout", None)),
+            ("db_pool_checked_in", "Idle connections in the pool", getattr(pool, "checkedin", None)),
+            ("db_pool_overflow", "Connections above pool size", getattr(pool, "overflow", None)),
+        ):
+            if read is not None:
+                gauge = Gauge(name, help_text)
+                gauge.set(read())
+                gauges.append(gauge)
+        return gauges
+    return collect
+
+
+def dict_collector(prefix: str, values: dict, help_text: str):
+    """Collector exporting a dict of numbers (e.g. document_text_metrics) as gauges"""
+    def collect():
+        gauges = []
+        for key, value in list(values.items()):
+            if isinstance(value, (int, float)):
+                gauge = Gauge(f"{prefix}_{key}", help_text)
+                gauge.set(value)
+                gauges.append(gauge)
+        return gauges
+    return collect
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route latency and counts, plus in-flight requests.
+
+    Requests are labelled with the route template ("/recruiter/{resume_id}"),
+    so path parameters don't create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app, skip_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method=method)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "<unmatched>"
+            http_request_duration_seconds.observe(time.perf_counter() - started, method=method, route=route)
+            http_requests_total.inc(method=method, route=route, status=str(status))
@@ -0,0 +1,103 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+    python backend/mock_llm_server.py --port 8765 --fail-first 3 --delay 0.5
+    export OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test
+
+Every request returns a fixed evaluation JSON after --delay seconds. The
+first --fail-first requests return 500. The OpenAI client retries twice on
+its own, so use 3 or more to reach the evaluation queue's retry path.
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_EVALUATION = {
+    "overall_assessment": {"score": 7, "feedback_summary": "Mock evaluation from the local LLM stand-in."},
+    "technical_competency": {"score": 7, "feedback": "Mock technical feedback."},
+    "communication_assessment": {
+        "score": 8,
+        "sentiment": {"overall_sentiment": "positive", "confidence_level": "medium"},
+        "feedback": "Mock communication feedback."
+    }
+}
+
+
+class _State:
+    def __init__(self, fail_first: int, delay: float):
+        self.fail_remaining = fail_first
+        self.delay = delay
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(state: _State):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            with state.lock:
+                state.requests += 1
+                fail = state.fail_remaining > 0
+                if fail:
+                    state.fail_remaining -= 1
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            time.sleep(state.delay)
+            if fail:
+                self._send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-mock-{state.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(MOCK_EVALUATION)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, fail_first: int = 0, delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start the mock in a background thread and return the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), _make_handler(_State(fail_first, delay)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat completions endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(_State(args.fail_first, args.delay)))
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
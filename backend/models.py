@@ -1,6 +1,9 @@
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
-from backend.database import Base
+try:
+    from backend.database import Base
+except Exception:  # Fallback when running as a script
+    from database import Base
 
 
 # ------------------- Candidate -------------------
@@ -111,3 +114,57 @@ class Recruiter(Base):
     questions = Column(JSON)
     linkedin_url = Column(Text)
     created_at = Column(DateTime)
+
+
+# ------------------- Extracted document text (parse-once cache) -------------------
+class DocumentText(Base):
+    __tablename__ = "document_text"
+
+    doc_id = Column(Integer, primary_key=True, index=True)
+    source = Column(Text, nullable=False, unique=True, index=True)  # Public URL or local path
+    content_hash = Column(String, nullable=False, index=True)  # sha256 of the raw file bytes
+    etag = Column(Text)  # HTTP ETag, or mtime-size for local files
+    last_modified = Column(Text)
+    text = Column(Text, nullable=False)
+    byte_size = Column(Integer)
+    parse_ms = Column(Integer)
+    fetched_at = Column(DateTime)
+    validated_at = Column(DateTime)
+
+
+# ------------------- Interview prep (precomputed questions / instructions) -------------------
+class InterviewPrep(Base):
+    __tablename__ = "interview_prep"
+
+    prep_id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resume.resume_id", ondelete="CASCADE"), index=True)
+    jd_id = Column(Integer, ForeignKey("recruiter.jd_id", ondelete="CASCADE"))
+    status = Column(String, nullable=False)  # pending | running | awaiting_jd | ready | failed
+    input_hash = Column(String)  # Hash of jd/resume text, questions and duration the prep was built from
+    interview_duration = Column(Integer)
+    time_greeting = Column(String)  # Instructions embed the greeting, so they go stale across day periods
+    questions = Column(JSON)
+    instructions = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+# ------------------- Evaluation jobs (durable queue) -------------------
+class EvaluationJob(Base):
+    __tablename__ = "evaluation_jobs"
+
+    job_id = Column(String, primary_key=True)
+    session_id = Column(String, index=True)
+    status = Column(String, nullable=False, index=True)  # queued | running | done | failed
+    payload = Column(JSON, nullable=False)  # conversation_text, job_description, resume, report metadata
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=4)
+    available_at = Column(DateTime, nullable=False, index=True)  # Not claimed before this (retry backoff)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)  # A running job whose lease lapsed is claimed again
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    finished_at = Column(DateTime)
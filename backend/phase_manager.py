@@ -9,6 +9,8 @@ class PhaseManager:
         self.interview_start_time = None
         self.phase_start_time = None
         self.interview_questions_data = {}
+        # Called as listener(old_phase, new_phase) after every transition
+        self.phase_listeners = []
         
         # Phase durations for interview management
         if self.interview_duration <= 10:
@@ -64,8 +66,11 @@ class PhaseManager:
 
     def transition_to_phase(self, new_phase: str):
         """Transition to a new phase"""
+        old_phase = self.interview_phase
         self.interview_phase = new_phase
         self.phase_start_time = datetime.now()
+        for listener in self.phase_listeners:
+            listener(old_phase, new_phase)
 
     def get_phase_transition_instruction(self, old_phase: str, new_phase: str, candidate_resume: str) -> str:
         """Get phase transition instruction referencing LLM-generated questions"""
@@ -0,0 +1,70 @@
+# phase_scheduler.py
+import time
+import asyncio
+import logging
+from transcript_builder import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseScheduler:
+    """Advances interview phases on their deadlines and swaps the live instructions.
+
+    On each phase deadline the PhaseManager transitions (its listeners fire)
+    and a session.update carrying only the new phase's instructions is sent,
+    so the model never re-reads the prompts for phases it is not in. The last
+    phase is left to run out; ending the interview stays with the bot.
+    """
+
+    def __init__(self, phase_manager, render_instructions, send_event, transitions: list = None,
+                 check_interval: float = 1.0):
+        self.phase_manager = phase_manager
+        self.render_instructions = render_instructions  # (old_phase, new_phase) -> str
+        self.send_event = send_event
+        self.transitions = transitions if transitions is not None else []
+        self.check_interval = check_interval
+
+    def seconds_left(self) -> float:
+        pm = self.phase_manager
+        if not pm.phase_start_time:
+            return self.check_interval
+        duration = pm.phase_durations.get(pm.interview_phase, 30) * 60
+        return duration - (time.time() - pm.phase_start_time.timestamp())
+
+    async def run(self, is_running):
+        while is_running():
+            # Wake at the deadline, but never sleep long enough to miss a stop or an outside transition
+            await asyncio.sleep(min(max(self.seconds_left(), 0), self.check_interval))
+            if not is_running() or not self.phase_manager.should_transition_phase():
+                continue
+            new_phase = self.phase_manager.get_next_phase()
+            if new_phase == "completed":
+                return
+            await self.advance(new_phase)
+
+    async def advance(self, new_phase: str):
+        pm = self.phase_manager
+        old_phase = pm.interview_phase
+        elapsed = (time.time() - pm.phase_start_time.timestamp()) if pm.phase_start_time else 0.0
+        started = time.perf_counter()
+        pm.transition_to_phase(new_phase)
+        instructions = self.render_instructions(old_phase, new_phase)
+        render_ms = (time.perf_counter() - started) * 1000
+        await self.send_event({"type": "session.update", "session": {"instructions": instructions}})
+        send_ms = (time.perf_counter() - started) * 1000 - render_ms
+
+        record = {
+            'from': old_phase,
+            'to': new_phase,
+            'phase_seconds': round(elapsed, 1),
+            'planned_seconds': pm.phase_durations.get(old_phase, 0) * 60,
+            'render_ms': round(render_ms, 2),
+            'send_ms': round(send_ms, 2),
+            'instruction_tokens': count_tokens(instructions)
+        }
+        self.transitions.append(record)
+        logger.info(
+            f"Phase {old_phase} -> {new_phase} after {record['phase_seconds']}s "
+            f"(planned {record['planned_seconds']}s); instructions {record['instruction_tokens']} tokens, "
+            f"render {record['render_ms']}ms, send {record['send_ms']}ms"
+        )
@@ -0,0 +1,114 @@
+"""Token report for the interview prompts: cacheable static prefix vs per-session tail.
+
+    python -m backend.prompt_report           # token counts per part
+    python -m backend.prompt_report --check   # exit 1 if a static prefix changed, moved or is too short to cache
+
+Provider-side prompt caching only reuses an identical prefix, so the static
+parts must stay byte-identical and come first in every rendered prompt. When a
+static part is changed on purpose, update PINNED_PREFIX_SHA256 in the same commit
+(backend/tests/test_prompt_prefix.py fails until then). A prefix shorter than
+CACHE_MIN_PREFIX_TOKENS is never cached at all, so the report warns about it.
+"""
+import sys
+import hashlib
+import argparse
+import prompts_repo
+from transcript_builder import count_tokens
+from instruction_builder import InstructionBuilder
+
+PINNED_PREFIX_SHA256 = {
+    "INTERVIEW_STATIC_INSTRUCTIONS": "dbca07c4a3fa3450b0a1a1620710dde791f11a07f1648797d56932c7115b3f76",
+    "PHASE_STATIC_INSTRUCTIONS": "d53d9ee369e3bb94baaf73ce65a8e7c0ad5d88733d480624be16018c1941a32c",
+}
+# OpenAI caches prompt prefixes only from this length on
+CACHE_MIN_PREFIX_TOKENS = 1024
+
+SAMPLE_JD = "Job Title: Backend Engineer\nBuild Python services on AWS with PostgreSQL and Redis."
+SAMPLE_RESUME = "JANE DOE\nBackend developer.\nPROJECTS: Healthcare Analytics Dashboard - Flask, Postgres, AWS Lambda."
+SAMPLE_QUESTIONS = {
+    "technical_questions": [{"category": "Python", "question": "How does the GIL affect a CPU-bound service?", "difficulty": "medium"}],
+    "project_questions": [{"project": "Healthcare Analytics Dashboard", "question": "How did you model the data?"}],
+    "behavioral_questions": [{"category": "Teamwork", "question": "Tell me about a disagreement on your team."}],
+}
+
+
+def prefix_sha256(name: str) -> str:
+    return hashlib.sha256(getattr(prompts_repo, name).encode("utf-8")).hexdigest()
+
+
+def _sample_prompts() -> dict:
+    builder = InstructionBuilder()
+    common = dict(prescreening_questions=["What is your notice period?"], time_greeting="morning")
+    prompts = {"INTERVIEW_STATIC_INSTRUCTIONS": [
+        ("full", builder.build(SAMPLE_JD, SAMPLE_RESUME, SAMPLE_QUESTIONS, interview_duration=30, **common))
+    ]}
+    prompts["PHASE_STATIC_INSTRUCTIONS"] = [
+        (phase, builder.build_phase(phase, SAMPLE_JD, SAMPLE_RESUME, SAMPLE_QUESTIONS, **common))
+        for phase in ("introduction", "technical", "wrap_up")
+    ]
+    return prompts
+
+
+def short_prefixes() -> dict:
+    """Static prefixes below CACHE_MIN_PREFIX_TOKENS, with their token counts"""
+    counts = {name: count_tokens(getattr(prompts_repo, name)) for name in PINNED_PREFIX_SHA256}
+    return {name: tokens for name, tokens in counts.items() if tokens < CACHE_MIN_PREFIX_TOKENS}
+
+
+def report() -> list:
+    rows = []
+    for name, rendered in _sample_prompts().items():
+        prefix = getattr(prompts_repo, name)
+        for label, prompt in rendered:
+            rows.append({
+                "prefix": name,
+                "prompt": label,
+                "prefix_tokens": count_tokens(prefix),
+                "tail_tokens": count_tokens(prompt[len(prefix):]) if prompt.startswith(prefix) else None,
+                "total_tokens": count_tokens(prompt),
+            })
+    return rows
+
+
+def check() -> list:
+    """Problems with the static prefixes; empty when all is well"""
+    problems = []
+    for name, pinned in PINNED_PREFIX_SHA256.items():
+        actual = prefix_sha256(name)
+        if actual != pinned:
+            problems.append(f"{name} changed (sha256 {actual}, pinned {pinned}); update PINNED_PREFIX_SHA256 if intended")
+    for name, rendered in _sample_prompts().items():
+        for label, prompt in rendered:
+            if not prompt.startswith(getattr(prompts_repo, name)):
+                problems.append(f"{label} prompt does not start with {name}")
+    for name, tokens in short_prefixes().items():
+        problems.append(f"{name} is {tokens} tokens, below the {CACHE_MIN_PREFIX_TOKENS}-token caching minimum")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report prompt prefix/tail token counts")
+    parser.add_argument("--check", action="store_true", help="fail if a static prefix changed, is not at the front or is too short")
+    args = parser.parse_args()
+
+    if args.check:
+        problems = check()
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        if problems:
+            sys.exit(1)
+        print("Static prompt prefixes unchanged")
+        return
+
+    print(f"{'prompt':<14} {'prefix':<30} {'prefix':>7} {'tail':>7} {'total':>7}")
+    for row in report():
+        tail = row["tail_tokens"] if row["tail_tokens"] is not None else "n/a"
+        print(f"{row['prompt']:<14} {row['prefix']:<30} {row['prefix_tokens']:>7} {tail:>7} {row['total_tokens']:>7}")
+    for name, tokens in short_prefixes().items():
+        print(f"WARNING: {name} is {tokens} tokens; prefixes under {CACHE_MIN_PREFIX_TOKENS} are never cached")
+    print("Token counts use tiktoken when installed, otherwise a chars/4 estimate. "
+          f"OpenAI caches only prefixes of {CACHE_MIN_PREFIX_TOKENS}+ tokens.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# question_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "Data/cache/questions.sqlite3"
+
+
+def questions_cache_key(jd_content: str, resume_content: str) -> str:
+    """Cache key for the question set generated from a JD/resume pair"""
+    combined_content = f"{jd_content.strip()}|||{resume_content.strip()}"
+    return f"questions:{hashlib.md5(combined_content.encode()).hexdigest()}"
+
+
+class SQLiteCacheStore:
+    """Durable cache tier in a single SQLite file, shared by every worker on the host.
+
+    Also holds short-lived leases so only one process computes a missing key.
+    Any object with the same get/set/try_acquire_lease/release_lease methods can
+    be passed to QuestionCache instead (e.g. a table in the main database).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()  # sqlite3 connections must stay on their thread
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_cache_leases ("
+                "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, ttl_seconds: float):
+        """Returns (value, created_at) or None when missing/expired"""
+        conn = self._conn()
+        row = conn.execute("SELECT value, created_at FROM question_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if ttl_seconds and now - row[1] > ttl_seconds:
+            conn.execute("DELETE FROM question_cache WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE question_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value, created_at: float) -> int:
+        """Store a value; returns how many least-recently-used rows were evicted"""
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO question_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), created_at, created_at)
+        )
+        overflow = conn.execute("SELECT COUNT(*) FROM question_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM question_cache WHERE key IN "
+                "(SELECT key FROM question_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            return overflow
+        return 0
+
+    def try_acquire_lease(self, key: str, owner: str, lease_seconds: float) -> bool:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("DELETE FROM question_cache_leases WHERE key = ? AND expires_at < ?", (key, now))
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO question_cache_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, owner, now + lease_seconds)
+        )
+        return cur.rowcount == 1
+
+    def release_lease(self, key: str, owner: str):
+        self._conn().execute("DELETE FROM question_cache_leases WHERE key = ? AND owner = ?", (key, owner))
+
+
+class QuestionCache:
+    """In-process LRU in front of a shared durable store, with TTL and single-flight.
+
+    get_or_compute() runs the expensive computation at most once per key at a
+    time: concurrent callers in this process wait on the first one, and other
+    processes wait on the store lease and then read the stored result.
+    """
+
+    def __init__(self, store=None, max_memory_entries: int = 128, ttl_seconds: float = 7 * 24 * 3600,
+                 lease_seconds: float = 120):
+        self.store = store
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> threading.Event set when the leader finishes
+        self.metrics = {
+            'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'computes': 0,
+            'coalesced_waits': 0, 'memory_evictions': 0, 'store_evictions': 0, 'store_errors': 0
+        }
+
+    def _lookup(self, key: str):
+        """(value, tier) without touching hit/miss metrics"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self.ttl_seconds or now - entry[1] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    return entry[0], 'memory'
+                del self._memory[key]
+        if self.store is None:
+            return None, None
+        try:
+            stored = self.store.get(key, self.ttl_seconds)
+        except Exception as e:
+            self.metrics['store_errors'] += 1
+            logger.warning(f"Question cache store read failed: {e}")
+            return None, None
+        if stored is None:
+            return None, None
+        self._remember(key, stored[0], stored[1])
+        return stored[0], 'store'
+
+    def _remember(self, key: str, value, created_at: float):
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.metrics['memory_evictions'] += 1
+
+    def get(self, key: str):
+        value, tier = self._lookup(key)
+        if tier is None:
+            self.metrics['misses'] += 1
+        else:
+            self.metrics[f'{tier}_hits'] += 1
+        return value
+
+    def set(self, key: str, value):
+        created_at = time.time()
+        self._remember(key, value, created_at)
+        if self.store is not None:
+            try:
+                self.metrics['store_evictions'] += self.store.set(key, value, created_at)
+            except Exception as e:
+                self.metrics['store_errors'] += 1
+                logger.warning(f"Question cache store write failed: {e}")
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            done = self._inflight.get(key)
+            leader = done is None
+            if leader:
+                done = self._inflight[key] = threading.Event()
+        if not leader:
+            self.metrics['coalesced_waits'] += 1
+            done.wait(timeout=self.lease_seconds)
+            value, _ = self._lookup(key)
+            if value is not None:
+                return value
+            return compute()  # Leader failed or timed out; don't wait twice
+
+        try:
+            return self._compute_with_lease(key, compute)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            done.set()
+
+    def _compute_with_lease(self, key: str, compute):
+        has_lease = self._acquire_lease(key)
+        if not has_lease:
+            # Another process is computing this key; wait for its result
+            self.metrics['coalesced_waits'] += 1
+            deadline = time.monotonic() + self.lease_seconds
+            while time.monotonic() < deadline:
+                time.sleep(0.25)
+                value, _ = self._lookup(key)
+                if value is not None:
+                    return value
+                has_lease = self._acquire_lease(key)
+                if has_lease:
+                    break
+        try:
+            if has_lease and self.store is not None:
+                # Another process may have stored it and released its lease since our miss
+                value, _ = self._lookup(key)
+                if value is not None:
+                    return value
+            self.metrics['computes'] += 1
+            logger.info(f"Question cache miss, computing {key}")
+            value = compute()
+            if value:
+                self.set(key, value)
+            return value
+        finally:
+            if has_lease and self.store is not None:
+                try:
+                    self.store.release_lease(key, self._owner)
+                except Exception as e:
+                    logger.warning(f"Question cache lease release failed: {e}")
+
+    def _acquire_lease(self, key: str) -> bool:
+        if self.store is None:
+            return True
+        try:
+            return self.store.try_acquire_lease(key, self._owner, self.lease_seconds)
+        except Exception as e:
+            self.metrics['store_errors'] += 1
+            logger.warning(f"Question cache lease failed: {e}")
+            return True  # Store trouble shouldn't block question generation
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_question_cache() -> QuestionCache:
+    """Process-wide cache instance (store path from QUESTION_CACHE_PATH)"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            path = os.getenv("QUESTION_CACHE_PATH", DEFAULT_CACHE_PATH)
+            _shared_cache = QuestionCache(SQLiteCacheStore(path))
+        return _shared_cache
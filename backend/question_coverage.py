@@ -0,0 +1,83 @@
+# question_coverage.py
+import re
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+# Long questions count as asked once this share of their significant words was said
+COVERAGE_THRESHOLD = 0.6
+
+
+class _Question:
+    __slots__ = ("text", "category", "phrase", "needed", "seen", "matched", "covered")
+
+    def __init__(self, text: str, category: str):
+        self.text = text
+        self.category = category
+        lower = text.lower()
+        # Short questions must appear as a phrase; long ones by significant words
+        self.phrase = lower if len(lower) <= 20 else None
+        words = {w for w in _WORD_RE.findall(lower) if len(w) > 4}
+        self.needed = len(words) * COVERAGE_THRESHOLD
+        self.seen = 0      # Bitset over the question's significant words
+        self.matched = 0
+        self.covered = self.phrase is None and not words
+
+
+class QuestionCoverage:
+    """Tracks which recruiter questions the interviewer has asked so far.
+
+    Each bot utterance is tokenized once when it is recorded; an inverted
+    index maps every significant word to the (question, bit) pairs it
+    completes, so coverage updates touch only the words just said and
+    `remaining()` is a single pass over the questions.
+    """
+
+    def __init__(self, **questions_by_category):
+        self._questions = []
+        self._index = {}    # word -> [(question, bit)]
+        self._phrases = []  # Short questions still waiting for their phrase
+        for category, questions in questions_by_category.items():
+            for text in questions:
+                self._add(text, category)
+
+    def _add(self, text: str, category: str):
+        question = _Question(text, category)
+        self._questions.append(question)
+        if question.phrase is not None:
+            self._phrases.append(question)
+            return
+        words = sorted({w for w in _WORD_RE.findall(text.lower()) if len(w) > 4})
+        for bit, word in enumerate(words):
+            self._index.setdefault(word, []).append((question, 1 << bit))
+
+    def observe(self, bot_text: str):
+        """Record one interviewer utterance"""
+        if not bot_text:
+            return
+        lower = bot_text.lower()
+        for word in set(_WORD_RE.findall(lower)):
+            for question, bit in self._index.get(word, ()):
+                if not question.seen & bit:
+                    question.seen |= bit
+                    question.matched += 1
+                    if question.matched >= question.needed:
+                        question.covered = True
+        if self._phrases:
+            for question in self._phrases:
+                if question.phrase in lower:
+                    question.covered = True
+            self._phrases = [q for q in self._phrases if not q.covered]
+
+    def remaining(self, category: str = None) -> list:
+        return [q.text for q in self._questions if not q.covered and (category is None or q.category == category)]
+
+    def all_covered(self, category: str = None) -> bool:
+        return not self.remaining(category)
+
+    def summary(self) -> dict:
+        """Covered/total counts per category"""
+        summary = {}
+        for q in self._questions:
+            counts = summary.setdefault(q.category, {'covered': 0, 'total': 0})
+            counts['total'] += 1
+            counts['covered'] += q.covered
+        return summary
@@ -0,0 +1,149 @@
+# realtime_pool.py
+import os
+import json
+import time
+import asyncio
+import logging
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# Point at backend/fake_realtime_server.py for local runs
+REALTIME_URL = os.getenv("OPENAI_REALTIME_URL", "wss://api.openai.com/v1/realtime?model=gpt-realtime")
+REALTIME_POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "1"))
+# Idle connections older than this are closed instead of handed out
+REALTIME_POOL_MAX_IDLE_SECONDS = float(os.getenv("REALTIME_POOL_MAX_IDLE_SECONDS", "300"))
+
+
+class _Idle:
+    __slots__ = ("websocket", "ready_at")
+
+    def __init__(self, websocket, ready_at: float):
+        self.websocket = websocket
+        self.ready_at = ready_at
+
+
+class RealtimePool:
+    """Keeps a few Realtime websockets open and past session.created, ready to hand out.
+
+    TLS, the websocket handshake and the server's session setup happen in the
+    background (e.g. while interview context loads), so the first turn only
+    pays for a session.update on an open socket. Idle connections are pinged
+    before use and closed once older than `max_idle_seconds`.
+    """
+
+    def __init__(self, api_key: str, url: str = None, size: int = REALTIME_POOL_SIZE,
+                 max_idle_seconds: float = REALTIME_POOL_MAX_IDLE_SECONDS, ready_timeout: float = 10.0,
+                 ping_timeout: float = 2.0):
+        self.api_key = api_key
+        self.url = url or REALTIME_URL
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.ready_timeout = ready_timeout
+        self.ping_timeout = ping_timeout
+        self._idle = []
+        self._opening = 0
+        self._lock = asyncio.Lock()
+        self._maintainer = None
+        self.stats = {'opened': 0, 'reused': 0, 'expired': 0, 'unhealthy': 0, 'failed': 0, 'connect_to_ready_ms': []}
+
+    async def _open(self):
+        """Connect and wait for session.created; returns the websocket"""
+        started = time.perf_counter()
+        headers = {"Authorization": f"Bearer {self.api_key}", "OpenAI-Beta": "realtime=v1"}
+        websocket = await websockets.connect(self.url, additional_headers=headers)
+        try:
+            while True:
+                event = json.loads(await asyncio.wait_for(websocket.recv(), self.ready_timeout))
+                if event.get("type") == "session.created":
+                    break
+                if event.get("type") == "error":
+                    raise RuntimeError(f"Realtime session failed: {event.get('error')}")
+        except BaseException:
+            await websocket.close()
+            raise
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.stats['opened'] += 1
+        self.stats['connect_to_ready_ms'].append(elapsed_ms)
+        logger.info(f"Realtime connection ready in {elapsed_ms}ms")
+        return websocket
+
+    async def _healthy(self, websocket) -> bool:
+        try:
+            pong = await websocket.ping()
+            await asyncio.wait_for(pong, self.ping_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _expire(self):
+        now = time.monotonic()
+        keep = []
+        for idle in self._idle:
+            if now - idle.ready_at > self.max_idle_seconds:
+                self.stats['expired'] += 1
+                await idle.websocket.close()
+            else:
+                keep.append(idle)
+        self._idle = keep
+
+    async def fill(self):
+        """Open connections until `size` are idle or opening"""
+        async with self._lock:
+            await self._expire()
+            missing = self.size - len(self._idle) - self._opening
+            self._opening += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                websocket = await self._open()
+                self._idle.append(_Idle(websocket, time.monotonic()))
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.warning(f"Realtime prewarm failed: {e}")
+            finally:
+                self._opening -= 1
+
+    def start(self, check_interval: float = 30.0):
+        """Fill the pool now and keep it filled (and fresh) in the background"""
+        if self._maintainer is None:
+            self._maintainer = asyncio.get_running_loop().create_task(self._maintain(check_interval))
+        return self._maintainer
+
+    async def _maintain(self, check_interval: float):
+        while True:
+            await self.fill()
+            await asyncio.sleep(check_interval)
+
+    async def acquire(self):
+        """A ready websocket: a healthy idle one if available, otherwise a fresh connection.
+
+        The caller owns it afterwards and should send its session.update right away.
+        """
+        while True:
+            async with self._lock:
+                await self._expire()
+                idle = self._idle.pop() if self._idle else None
+            if idle is None:
+                break
+            if await self._healthy(idle.websocket):
+                self.stats['reused'] += 1
+                return idle.websocket
+            self.stats['unhealthy'] += 1
+            await idle.websocket.close()
+        if self._opening:
+            # A prewarm is in flight; finishing it is quicker than starting over
+            deadline = time.monotonic() + self.ready_timeout
+            while self._opening and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            if self._idle:
+                return await self.acquire()
+        return await self._open()
+
+    async def close(self):
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+            self._maintainer = None
+        async with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            await entry.websocket.close()
@@ -0,0 +1,113 @@
+# realtime_reconnect.py
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+def replay_items(conversation: list, last_n: int = 6) -> list:
+    """conversation.item.create events restoring the last N exchanges as text"""
+    events = []
+    for exchange in conversation[-last_n:] if last_n > 0 else []:
+        events.append({"type": "conversation.item.create", "item": {
+            "type": "message", "role": "user", "content": [{"type": "input_text", "text": exchange['user']}]
+        }})
+        events.append({"type": "conversation.item.create", "item": {
+            "type": "message", "role": "assistant", "content": [{"type": "text", "text": exchange['bot']}]
+        }})
+    return events
+
+
+class RealtimeReconnector:
+    """Brings a dropped Realtime session back without ending the interview.
+
+    On a drop it reconnects through the RealtimePool with exponential backoff,
+    re-sends session.update, replays the recent exchanges as conversation
+    items and then sends the mic audio captured while the socket was down
+    (only the newest `backlog_ms` of it). Concurrent callers share one recovery.
+    """
+
+    def __init__(self, pool, session_config, conversation, replay_exchanges: int = 6, max_attempts: int = 5,
+                 base_delay: float = 0.2, max_delay: float = 2.0, backlog_ms: int = 3000, sample_rate: int = 24000,
+                 target_recovery_seconds: float = 3.0):
+        self.pool = pool
+        self.session_config = session_config  # () -> session.update event for the current state
+        self.conversation = conversation      # () -> list of exchanges
+        self.replay_exchanges = replay_exchanges
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backlog_bytes = int(sample_rate * 2 * backlog_ms / 1000)
+        self.target_recovery_seconds = target_recovery_seconds
+        self._backlog = deque()  # (append event, pcm bytes)
+        self._backlog_size = 0
+        self._recovery = None
+        self.stats = {
+            'drops': 0, 'reconnects': 0, 'failed_recoveries': 0, 'attempts': 0,
+            'recovery_seconds': [], 'over_target': 0, 'replayed_items': 0,
+            'backlog_events_sent': 0, 'backlog_events_dropped': 0
+        }
+
+    @property
+    def recovering(self) -> bool:
+        return self._recovery is not None and not self._recovery.done()
+
+    def buffer_audio(self, message: str, pcm_bytes: int):
+        """Hold an append event that could not be sent; the oldest audio goes first when full"""
+        self._backlog.append((message, pcm_bytes))
+        self._backlog_size += pcm_bytes
+        while self._backlog_size > self.backlog_bytes and len(self._backlog) > 1:
+            _, dropped = self._backlog.popleft()
+            self._backlog_size -= dropped
+            self.stats['backlog_events_dropped'] += 1
+
+    async def recover(self):
+        """New, restored websocket, or None once every attempt failed"""
+        if not self.recovering:
+            self.stats['drops'] += 1
+            self._recovery = asyncio.get_running_loop().create_task(self._reconnect())
+        return await asyncio.shield(self._recovery)
+
+    async def _reconnect(self):
+        started = time.perf_counter()
+        for attempt in range(self.max_attempts):
+            if attempt:
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            self.stats['attempts'] += 1
+            websocket = None
+            try:
+                websocket = await self.pool.acquire()
+                await websocket.send(json.dumps(self.session_config()))
+                items = replay_items(self.conversation(), self.replay_exchanges)
+                for event in items:
+                    await websocket.send(json.dumps(event))
+                while self._backlog:
+                    message, pcm_bytes = self._backlog[0]
+                    await websocket.send(message)
+                    self._backlog.popleft()
+                    self._backlog_size -= pcm_bytes
+                    self.stats['backlog_events_sent'] += 1
+            except Exception as e:
+                logger.warning(f"Realtime reconnect attempt {attempt + 1} failed: {e}")
+                if websocket is not None:
+                    await websocket.close()
+                continue
+
+            elapsed = round(time.perf_counter() - started, 3)
+            self.stats['reconnects'] += 1
+            self.stats['replayed_items'] += len(items)
+            self.stats['recovery_seconds'].append(elapsed)
+            if elapsed > self.target_recovery_seconds:
+                self.stats['over_target'] += 1
+                logger.warning(f"Realtime recovery took {elapsed}s (target {self.target_recovery_seconds}s)")
+            logger.info(f"Realtime session restored in {elapsed}s after {attempt + 1} attempt(s), replayed {len(items)} items")
+            return websocket
+
+        self.stats['failed_recoveries'] += 1
+        logger.error(f"Realtime reconnect gave up after {self.max_attempts} attempts")
+        return None
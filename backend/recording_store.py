@@ -0,0 +1,175 @@
+# recording_store.py
+import mmap
+import os
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+WAV_HEADER_BYTES = 44
+# Written pages are flushed and released from RAM every this many bytes
+_RELEASE_INTERVAL_BYTES = 1 << 20
+
+
+def _wav_header(data_bytes: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_bytes, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b'data', data_bytes
+    )
+
+
+class _Segment:
+    """One preallocated WAV file; memory-mapped while it is being written"""
+
+    def __init__(self, path: str, capacity: int, start_offset: int, sample_rate: int):
+        self.path = path
+        self.capacity = capacity
+        self.start_offset = start_offset  # Position of the first PCM byte in the whole recording
+        self.sample_rate = sample_rate
+        self.size = 0
+        self._released = 0
+        self._file = open(path, 'w+b')
+        self._file.truncate(WAV_HEADER_BYTES + capacity)
+        self._map = mmap.mmap(self._file.fileno(), WAV_HEADER_BYTES + capacity)
+        self._map[:WAV_HEADER_BYTES] = _wav_header(0, sample_rate)
+
+    @property
+    def is_open(self) -> bool:
+        return self._map is not None
+
+    def write(self, data) -> int:
+        n = min(len(data), self.capacity - self.size)
+        pos = WAV_HEADER_BYTES + self.size
+        self._map[pos:pos + n] = data[:n]
+        self.size += n
+        if self.size - self._released >= _RELEASE_INTERVAL_BYTES:
+            self._release_written_pages()
+        return n
+
+    def _release_written_pages(self):
+        """Write back finished pages and drop them from the resident set"""
+        end = (WAV_HEADER_BYTES + self.size) // mmap.PAGESIZE * mmap.PAGESIZE
+        start = (WAV_HEADER_BYTES + self._released) // mmap.PAGESIZE * mmap.PAGESIZE
+        if end <= start:
+            return
+        self._map.flush(start, end - start)
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            self._map.madvise(mmap.MADV_DONTNEED, start, end - start)
+        self._released = end - WAV_HEADER_BYTES
+
+    def read(self, offset: int, length: int) -> bytes:
+        pos = WAV_HEADER_BYTES + offset
+        if self._map is not None:
+            return self._map[pos:pos + length]
+        with open(self.path, 'rb') as f:
+            f.seek(pos)
+            return f.read(length)
+
+    def close(self):
+        """Finalize the WAV header and trim the file to what was actually written"""
+        if self._map is None:
+            return
+        self._map[:WAV_HEADER_BYTES] = _wav_header(self.size, self.sample_rate)
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._file.truncate(WAV_HEADER_BYTES + self.size)
+        self._file.close()
+
+
+class RecordingStore:
+    """Streams PCM16 mono audio into memory-mapped WAV segment files on disk.
+
+    RAM use is bounded by one mapped segment whose written pages are released
+    as it fills; finished segments live on disk only. With max_bytes set, the
+    oldest segments are deleted once the retained audio exceeds the cap.
+    Nothing touches the filesystem until the first append.
+    """
+
+    def __init__(self, directory: str, name: str, sample_rate: int = 24000,
+                 segment_seconds: int = 300, max_bytes: int = None):
+        self.directory = directory
+        self.name = name
+        self.sample_rate = sample_rate
+        self.bytes_per_second = sample_rate * 2
+        self.segment_bytes = segment_seconds * self.bytes_per_second
+        self.max_bytes = max_bytes
+        self.segments = []
+        self.total_bytes = 0    # Everything ever appended
+        self.dropped_bytes = 0  # Removed by the size cap
+        self._segment_index = 0
+        self._closed = False
+
+    def __len__(self):
+        return self.total_bytes
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.total_bytes / self.bytes_per_second
+
+    def append(self, data: bytes):
+        if self._closed or not data:
+            return
+        view = memoryview(data)
+        while view:
+            segment = self.segments[-1] if self.segments else None
+            if segment is None or not segment.is_open or segment.size >= segment.capacity:
+                segment = self._rotate()
+            written = segment.write(view)
+            view = view[written:]
+            self.total_bytes += written
+
+    def _rotate(self) -> _Segment:
+        if self.segments:
+            self.segments[-1].close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.name}_{self._segment_index:03d}.wav")
+        self._segment_index += 1
+        segment = _Segment(path, self.segment_bytes, self.total_bytes, self.sample_rate)
+        self.segments.append(segment)
+        self._enforce_cap()
+        return segment
+
+    def _enforce_cap(self):
+        if not self.max_bytes:
+            return
+        # The open segment always stays; older ones go until we fit
+        while len(self.segments) > 1 and self._retained_capacity() > self.max_bytes:
+            oldest = self.segments.pop(0)
+            self.dropped_bytes += oldest.size
+            try:
+                os.remove(oldest.path)
+            except OSError:
+                logger.warning(f"Failed to remove rotated recording segment {oldest.path}")
+
+    def _retained_capacity(self) -> int:
+        return sum(seg.size for seg in self.segments[:-1]) + self.segments[-1].capacity
+
+    def read_range(self, start_seconds: float, end_seconds: float = None) -> bytes:
+        """PCM16 bytes between two offsets (seconds from the start of the recording).
+
+        Audio already removed by the size cap is skipped.
+        """
+        start = max(0, int(start_seconds * self.sample_rate)) * 2
+        end = self.total_bytes if end_seconds is None else min(self.total_bytes, int(end_seconds * self.sample_rate) * 2)
+        parts = []
+        for segment in self.segments:
+            seg_start = segment.start_offset
+            seg_end = seg_start + segment.size
+            if seg_end <= start or seg_start >= end:
+                continue
+            lo = max(start, seg_start) - seg_start
+            hi = min(end, seg_end) - seg_start
+            parts.append(segment.read(lo, hi - lo))
+        return b"".join(parts)
+
+    def close(self) -> list:
+        """Finalize all segments; returns the paths of the WAV files on disk"""
+        if not self._closed:
+            self._closed = True
+            if self.segments:
+                self.segments[-1].close()
+        return [segment.path for segment in self.segments]
@@ -0,0 +1,108 @@
+# rolling_evaluation.py
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from evaluation import call_segment_evaluation, call_merge_evaluation
+
+logger = logging.getLogger(__name__)
+
+# Per-turn cap so one long answer cannot blow up a segment prompt
+MAX_TURN_CHARS = 1200
+
+
+class RollingEvaluator:
+    """Evaluates the interview in segments while it is still running.
+
+    A segment closes when the phase changes or after `segment_exchanges`
+    exchanges, and is scored on a single background thread. At the end only
+    the last open segment and a short merge over the segment notes remain,
+    so final latency and tokens per call stay flat as interviews get longer.
+    """
+
+    def __init__(self, api_key: str, job_description: str = "", resume: str = "", segment_exchanges: int = 6):
+        self.api_key = api_key
+        self.job_description = job_description
+        self.resume = resume
+        self.segment_exchanges = max(1, segment_exchanges)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rolling-evaluation")
+        self._lock = threading.Lock()
+        self._open = []  # Entries of the segment being collected
+        self._phase = None
+        self._segments = []  # (phase, first_exchange, last_exchange, future)
+        self.stats = {'segments': 0, 'segments_failed': 0, 'segment_seconds': [], 'merge_seconds': None}
+
+    def add_exchange(self, entry: dict, phase: str = None):
+        with self._lock:
+            if self._open and phase != self._phase:
+                self._close_segment()
+            self._phase = phase
+            self._open.append(entry)
+            if len(self._open) >= self.segment_exchanges:
+                self._close_segment()
+
+    def on_phase_change(self, old_phase: str, new_phase: str):
+        """PhaseManager listener: the finished phase becomes its own segment"""
+        with self._lock:
+            if self._open:
+                self._close_segment()
+            self._phase = new_phase
+
+    def _close_segment(self):
+        entries, self._open = self._open, []
+        first, last = entries[0]['exchange_id'], entries[-1]['exchange_id']
+        text = "\n\n".join(
+            f"INTERVIEWER: {e['bot'][:MAX_TURN_CHARS]}\nCANDIDATE: {e['user'][:MAX_TURN_CHARS]}" for e in entries
+        )
+        future = self._executor.submit(self._evaluate_segment, text, self._phase, first, last)
+        self._segments.append((self._phase, first, last, future))
+
+    def _evaluate_segment(self, text: str, phase: str, first: int, last: int):
+        started = time.perf_counter()
+        result = call_segment_evaluation(self.api_key, text, phase, first, last, self.job_description)
+        elapsed = round(time.perf_counter() - started, 3)
+        self.stats['segment_seconds'].append(elapsed)
+        if result:
+            self.stats['segments'] += 1
+        else:
+            self.stats['segments_failed'] += 1
+        logger.info(f"Segment {first}-{last} ({phase}) evaluated in {elapsed}s")
+        return result
+
+    def finalize(self, interview_start_time=None):
+        """Close the open segment, wait for all segments and merge them.
+
+        Blocking; returns None when any segment failed (or none exist) so the
+        caller can fall back to a whole-transcript evaluation.
+        """
+        with self._lock:
+            if self._open:
+                self._close_segment()
+            segments = list(self._segments)
+
+        notes = []
+        for phase, first, last, future in segments:
+            result = future.result()
+            if not result:
+                # A merge over missing segments would score part of the interview
+                logger.warning(f"Segment {first}-{last} has no evaluation; skipping rolling merge")
+                notes = []
+                break
+            notes.append({"phase": phase, "exchanges": f"{first}-{last}", **result})
+        self._executor.shutdown(wait=False)
+        if not notes:
+            return None
+
+        started = time.perf_counter()
+        report = call_merge_evaluation(
+            self.api_key,
+            json.dumps(notes, indent=2, ensure_ascii=False),
+            self.job_description,
+            self.resume,
+            interview_start_time
+        )
+        self.stats['merge_seconds'] = round(time.perf_counter() - started, 3)
+        if report:
+            report['evaluation_metadata']['segments'] = len(notes)
+        return report
@@ -1,7 +1,16 @@
 # session_manager.py
 import json
+import time
 from datetime import datetime
 from evaluation import save_json
+from latency_histogram import LatencyHistogram
+
+# Per-turn latencies, all measured from the server's end-of-speech (speech_stopped)
+# except playback_queue_delay (first audio delta -> first write to the speaker)
+TURN_LATENCY_METRICS = (
+    'transcription_delay', 'response_start_delay', 'time_to_first_audio_delta',
+    'time_to_first_audio', 'playback_queue_delay'
+)
 
 class SessionManager:
     def __init__(self, voice: str, interview_mode: bool):
@@ -15,8 +24,50 @@ class SessionManager:
         self.performance_metrics = {
             'response_times': [], 'audio_chunks_sent': 0, 'audio_chunks_received': 0,
             'total_audio_input_bytes': 0, 'total_audio_output_bytes': 0,
-            'connection_errors': 0, 'transcription_errors': 0
+            'connection_errors': 0, 'transcription_errors': 0,
+            'capture': {'frames_captured': 0, 'frames_dropped': 0, 'input_overflows': 0},
+            'playback': {'underruns': 0, 'ring_full_waits': 0, 'bytes_played': 0},
+            'audio_events_sent': 0, 'audio_event_bytes_sent': 0,
+            'audio_events_per_second': 0.0, 'audio_bytes_per_second': 0.0,
+            'barge_ins': 0, 'time_to_silence': [],
+            'vad': {'frames_in': 0, 'frames_suppressed': 0, 'keepalives_sent': 0}
         }
+        self._uplink_start_time = None
+        self.question_coverage = None  # QuestionCoverage, set by the bot in interview mode
+        self.turn_latency = {name: LatencyHistogram() for name in TURN_LATENCY_METRICS}
+        self.recent_turns = []  # Last few per-turn breakdowns, for the metrics report
+
+    def record_audio_event(self, wire_bytes: int):
+        """Count one input_audio_buffer.append event and refresh the uplink rates"""
+        now = time.monotonic()
+        if self._uplink_start_time is None:
+            self._uplink_start_time = now
+        metrics = self.performance_metrics
+        metrics['audio_events_sent'] += 1
+        metrics['audio_event_bytes_sent'] += wire_bytes
+        elapsed = now - self._uplink_start_time
+        if elapsed > 0:
+            metrics['audio_events_per_second'] = round(metrics['audio_events_sent'] / elapsed, 2)
+            metrics['audio_bytes_per_second'] = round(metrics['audio_event_bytes_sent'] / elapsed, 1)
+
+    def record_turn_latency(self, turn: dict):
+        """Derive one turn's latencies from its perf_counter timestamps and add them to the histograms"""
+        start = turn.get('speech_stopped')
+        if start is None:
+            return
+        derived = {
+            'transcription_delay': turn.get('transcription_completed'),
+            'response_start_delay': turn.get('response_created'),
+            'time_to_first_audio_delta': turn.get('first_audio_delta'),
+            'time_to_first_audio': turn.get('first_audio_write'),
+        }
+        derived = {name: ts - start for name, ts in derived.items() if ts is not None}
+        if turn.get('first_audio_delta') is not None and turn.get('first_audio_write') is not None:
+            derived['playback_queue_delay'] = turn['first_audio_write'] - turn['first_audio_delta']
+        for name, seconds in derived.items():
+            self.turn_latency[name].record(seconds)
+        self.recent_turns.append({name: round(seconds * 1000, 1) for name, seconds in derived.items()})
+        del self.recent_turns[:-50]
 
     def add_conversation_entry(self, user_text: str, bot_text: str, interview_phase: str = None):
         """Add a conversation exchange"""
@@ -37,6 +88,8 @@ class SessionManager:
             entry.update({'interview_phase': interview_phase, 'phase_progress': ''})
             
         self.conversation.append(entry)
+        if self.question_coverage is not None:
+            self.question_coverage.observe(bot_text)
         return entry
 
     def print_summary(self, interview_start_time=None):
@@ -62,6 +115,9 @@ class SessionManager:
             max_latency = max(self.performance_metrics['response_times'])
             print(f"⚡ Avg Response Latency: {avg_latency:.2f}s")
             print(f"⚡ Min/Max Latency: {min_latency:.2f}s / {max_latency:.2f}s")
+        first_audio = self.turn_latency['time_to_first_audio']
+        if first_audio.count:
+            print(f"⚡ End of speech -> first audio p50/p95: {first_audio.quantile(0.5):.2f}s / {first_audio.quantile(0.95):.2f}s")
         
         if self.interview_mode and interview_start_time:
             interview_duration = datetime.now() - interview_start_time
@@ -103,6 +159,8 @@ class SessionManager:
     def save_performance_metrics(self):
         """Save performance and cost metrics to JSON file"""
         avg_response_time = (sum(self.performance_metrics['response_times'])/len(self.performance_metrics['response_times'])) if self.performance_metrics['response_times'] else 0
+        silence_times = self.performance_metrics['time_to_silence']
+        avg_time_to_silence = (sum(silence_times)/len(silence_times)) if silence_times else 0
         session_duration = (datetime.now()-self.session_start_time).total_seconds()
         
         report = {
@@ -118,11 +176,30 @@ class SessionManager:
                     "average_response_time_seconds": round(avg_response_time, 2),
                     "total_responses": len(self.performance_metrics['response_times'])
                 },
+                "turn_latency": {name: hist.summary() for name, hist in self.turn_latency.items()},
+                "recent_turns_ms": self.recent_turns,
+                "barge_in": {
+                    "count": self.performance_metrics['barge_ins'],
+                    "average_time_to_silence_ms": round(avg_time_to_silence * 1000, 1),
+                    "max_time_to_silence_ms": round(max(silence_times) * 1000, 1) if silence_times else 0
+                },
                 "audio_metrics": {
                     "input_chunks_sent": self.performance_metrics['audio_chunks_sent'],
                     "output_chunks_received": self.performance_metrics['audio_chunks_received'],
                     "total_input_bytes": self.performance_metrics['total_audio_input_bytes'],
-                    "total_output_bytes": self.performance_metrics['total_audio_output_bytes']
+                    "total_output_bytes": self.performance_metrics['total_audio_output_bytes'],
+                    "capture_frames_dropped": self.performance_metrics['capture']['frames_dropped'],
+                    "capture_input_overflows": self.performance_metrics['capture']['input_overflows'],
+                    "playback_underruns": self.performance_metrics['playback']['underruns'],
+                    "playback_ring_full_waits": self.performance_metrics['playback']['ring_full_waits']
+                },
+                "uplink": {
+                    "send_window_ms": self.performance_metrics.get('audio_send_window_ms'),
+                    "events_sent": self.performance_metrics['audio_events_sent'],
+                    "events_per_second": self.performance_metrics['audio_events_per_second'],
+                    "bytes_per_second": self.performance_metrics['audio_bytes_per_second'],
+                    "vad_frames_suppressed": self.performance_metrics['vad']['frames_suppressed'],
+                    "vad_keepalives_sent": self.performance_metrics['vad']['keepalives_sent']
                 }
             },
             "raw_metrics": self.performance_metrics
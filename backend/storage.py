@@ -0,0 +1,227 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+import contextlib
+from datetime import datetime
+from typing import AsyncIterator
+from fastapi import HTTPException, UploadFile
+try:
+    from backend.http_client import get_http_client
+    from backend.metrics import timed
+except Exception:  # Fallback when running as a script
+    from http_client import get_http_client
+    from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(256 * 1024)))
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "Data/uploads")
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+
+
+async def iter_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES,
+                      chunk_size: int = UPLOAD_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Chunks of an UploadFile, failing with 413 as soon as max_bytes is passed"""
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+    total = 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(max_bytes)
+        yield chunk
+
+
+async def iter_file(path: str, chunk_size: int = UPLOAD_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class SupabaseStorage:
+    """Supabase Storage bucket; uploads are streamed, never buffered whole"""
+
+    def __init__(self, url: str, service_key: str, bucket: str):
+        self.url = url.rstrip("/")
+        self.service_key = service_key
+        self.bucket = bucket
+
+    async def put(self, object_path: str, chunks: AsyncIterator[bytes], content_type: str | None = None,
+                  content_length: int | None = None) -> str:
+        upload_endpoint = f"{self.url}/storage/v1/object/{self.bucket}/{object_path}"
+        headers = {
+            "Authorization": f"Bearer {self.service_key}",
+            "apikey": self.service_key,
+            "Content-Type": content_type or "application/octet-stream",
+            "x-upsert": "true",
+        }
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        try:
+            # A streamed body can't be replayed, so no retries here
+            with timed("upload_supabase"):
+                resp = await get_http_client().post(upload_endpoint, content=chunks, headers=headers, retries=0)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Supabase upload error: {e}")
+        if resp.status_code not in (200, 201):
+            raise HTTPException(status_code=500, detail=f"Supabase upload failed: {resp.status_code} {resp.text}")
+        return f"{self.url}/storage/v1/object/public/{self.bucket}/{object_path}"
+
+
+class LocalStorage:
+    """Filesystem stand-in for Supabase; returns local paths the document reader understands"""
+
+    def __init__(self, root: str = LOCAL_STORAGE_DIR):
+        self.root = root
+
+    async def put(self, object_path: str, chunks: AsyncIterator[bytes], content_type: str | None = None,
+                  content_length: int | None = None) -> str:
+        path = os.path.join(self.root, object_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.part"
+        try:
+            with timed("upload_local"), open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        return path
+
+
+_storage = None
+
+
+def get_storage():
+    """Supabase when SUPABASE_URL/SUPABASE_SERVICE_KEY are set, otherwise local files"""
+    global _storage
+    if _storage is None:
+        sb_url = os.getenv("SUPABASE_URL", "")
+        sb_service_key = os.getenv("SUPABASE_SERVICE_KEY", "")
+        if sb_url and sb_service_key:
+            _storage = SupabaseStorage(sb_url, sb_service_key, os.getenv("SUPABASE_BUCKET", "files"))
+        else:
+            logger.warning(f"Supabase configuration missing; storing uploads under {LOCAL_STORAGE_DIR}")
+            _storage = LocalStorage()
+    return _storage
+
+
+# --------------- Resumable chunked uploads ---------------
+class ChunkedUploads:
+    """Resumable uploads assembled on local disk, one append-only .part file each.
+
+    Clients create an upload with its total size, then send chunks with the
+    offset they start at; a chunk at the wrong offset is rejected with 409 and
+    the client resumes from the offset the server reports. Appends to one
+    upload are serialized (a retried PATCH may overlap the original), and a
+    request that fails partway leaves the file at the offset it started from.
+    """
+
+    def __init__(self, root: str = os.path.join(LOCAL_STORAGE_DIR, "partial"), max_bytes: int = MAX_UPLOAD_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._locks: dict[str, list] = {}  # .part path -> [asyncio.Lock, requests using it]
+
+    def _paths(self, upload_id: str) -> tuple[str, str]:
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except ValueError:
+            raise HTTPException(status_code=404, detail="upload_id not found")
+        base = os.path.join(self.root, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    def create(self, filename: str, total_size: int, content_type: str | None = None) -> dict:
+        if total_size <= 0:
+            raise HTTPException(status_code=400, detail="total_size must be positive")
+        if total_size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        os.makedirs(self.root, exist_ok=True)
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        meta = {
+            "upload_id": upload_id,
+            "filename": os.path.basename(filename or "upload"),
+            "content_type": content_type,
+            "total_size": total_size,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        open(part_path, "wb").close()
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> dict:
+        part_path, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            offset = os.path.getsize(part_path)
+        except OSError:
+            raise HTTPException(status_code=404, detail="upload_id not found")
+        meta["offset"] = offset
+        meta["complete"] = offset == meta["total_size"]
+        meta["chunk_size"] = UPLOAD_CHUNK_BYTES
+        return meta
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        part_path, _ = self._paths(upload_id)
+        entry = self._locks.get(part_path)
+        if entry is None:
+            entry = self._locks[part_path] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._append_locked(upload_id, part_path, offset, chunks)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[part_path]
+
+    async def _append_locked(self, upload_id: str, part_path: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        # Checked under the lock: a concurrent request may have moved the offset
+        meta = self.status(upload_id)
+        if offset != meta["offset"]:
+            raise HTTPException(status_code=409, detail=f"Upload offset mismatch; resume from {meta['offset']}")
+        written = offset
+        with open(part_path, "r+b") as f:
+            f.seek(offset)
+            try:
+                async for chunk in chunks:
+                    if written + len(chunk) > meta["total_size"]:
+                        raise HTTPException(status_code=413, detail="Chunk runs past the declared total_size")
+                    await asyncio.to_thread(f.write, chunk)
+                    written += len(chunk)
+            except BaseException:
+                f.truncate(offset)  # Drop the partial chunk; the client resumes from here
+                raise
+        return self.status(upload_id)
+
+    def completed_path(self, upload_id: str) -> tuple[str, dict]:
+        meta = self.status(upload_id)
+        if not meta["complete"]:
+            raise HTTPException(status_code=409, detail=f"Upload incomplete: {meta['offset']} of {meta['total_size']} bytes")
+        return self._paths(upload_id)[0], meta
+
+    def discard(self, upload_id: str):
+        for path in self._paths(upload_id):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+chunked_uploads = ChunkedUploads()
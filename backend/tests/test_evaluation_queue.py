@@ -0,0 +1,198 @@
+"""EvaluationQueue delivery rules and the worker, on SQLite with the local mock LLM"""
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import evaluation_queue
+import evaluation_worker
+import mock_llm_server
+from evaluation_queue import EvaluationQueue, retry_delay
+from evaluation_worker import EvaluationWorker, run_evaluation_job
+
+EvaluationJob = evaluation_queue.EvaluationJob
+
+
+def _make_queue(url: str = "sqlite://", **kwargs) -> EvaluationQueue:
+    """In-memory shares one connection, so tests with other threads use a file database"""
+    if url == "sqlite://":
+        engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+    EvaluationJob.__table__.create(bind=engine)
+    return EvaluationQueue(sessionmaker(autocommit=False, autoflush=False, bind=engine), **kwargs)
+
+
+def _payload(n: int = 0) -> dict:
+    return {"conversation_text": f"INTERVIEW CONVERSATION:\n\nCandidate: answer {n}", "job_description": "", "resume": ""}
+
+
+def _update_job(queue: EvaluationQueue, job_id: str, **values):
+    with queue._session_factory() as db:
+        job = db.get(EvaluationJob, job_id)
+        for key, value in values.items():
+            setattr(job, key, value)
+        db.commit()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def mock_llm(monkeypatch):
+    """Points the OpenAI client at mock_llm_server; yields a function that (re)starts it with fail_first"""
+    servers = []
+
+    def start(fail_first: int = 0):
+        port = _free_port()
+        servers.append(mock_llm_server.serve(port=port, fail_first=fail_first))
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    monkeypatch.setattr(evaluation_worker, "save_json", lambda data, prefix: None)
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_claim_stops_at_max_concurrency():
+    queue = _make_queue(max_concurrency=2)
+    job_ids = [queue.enqueue(_payload(n)) for n in range(5)]
+
+    first = queue.claim("a", limit=5)
+    assert [job_id for job_id, _ in first] == job_ids[:2]
+    assert queue.claim("b", limit=5) == []
+
+    queue.complete(first[0][0], "a", {"ok": True})
+    assert [job_id for job_id, _ in queue.claim("b", limit=5)] == job_ids[2:3]
+
+
+def test_concurrent_claims_never_exceed_cap(tmp_path):
+    queue = _make_queue(f"sqlite:///{tmp_path / 'queue.db'}", max_concurrency=3)
+    for n in range(12):
+        queue.enqueue(_payload(n))
+    claimed = []
+    barrier = threading.Barrier(6)
+
+    def claim(owner):
+        barrier.wait()
+        claimed.extend(queue.claim(owner, limit=3))
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{n}",)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == 3
+    assert len({job_id for job_id, _ in claimed}) == 3
+
+
+def test_retry_delay_backs_off_with_jitter():
+    assert 4.0 <= retry_delay(1) <= 6.0
+    assert 16.0 <= retry_delay(3) <= 24.0
+    assert retry_delay(50) <= evaluation_queue.RETRY_MAX_SECONDS * 1.2
+
+
+def test_failed_attempt_is_retried_after_backoff_then_fails():
+    queue = _make_queue(max_attempts=2)
+    job_id = queue.enqueue(_payload())
+
+    [(claimed_id, _)] = queue.claim("a")
+    assert queue.fail(claimed_id, "a", "boom") == "queued"
+    assert queue.claim("a") == []  # Not due until the backoff passes
+
+    job = queue.get(job_id)
+    assert job["status"] == "queued" and job["error"] == "boom" and job["attempts"] == 1
+    _update_job(queue, job_id, available_at=datetime.utcnow() - timedelta(seconds=1))
+
+    assert [j for j, _ in queue.claim("a")] == [job_id]
+    assert queue.fail(job_id, "a", "boom again") == "failed"
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.get(job_id)["attempts"] == 2
+
+
+def test_lapsed_lease_is_redelivered():
+    queue = _make_queue(max_attempts=3)
+    job_id = queue.enqueue(_payload())
+    assert [j for j, _ in queue.claim("a")] == [job_id]
+    assert queue.claim("b") == []  # Leased to a
+
+    _update_job(queue, job_id, lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+    assert [j for j, _ in queue.claim("b")] == [job_id]
+    assert queue.get(job_id)["attempts"] == 2
+
+    # The original owner no longer holds it, so its failure is ignored
+    assert queue.fail(job_id, "a", "late failure") == "running"
+    assert queue.complete(job_id, "b", {"ok": True})
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_lease_lapsing_on_final_attempt_fails_the_job():
+    queue = _make_queue(max_attempts=1)
+    job_id = queue.enqueue(_payload())
+    queue.claim("a")
+    _update_job(queue, job_id, lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+
+    assert queue.claim("b") == []
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Lease expired on the final attempt"
+
+
+def test_run_evaluation_job_raises_when_evaluation_is_empty(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(evaluation_worker, "call_comprehensive_evaluation", lambda *args: None)
+    with pytest.raises(RuntimeError, match="failed or empty"):
+        run_evaluation_job(_payload())
+
+
+def test_run_evaluation_job_against_mock_llm(mock_llm):
+    mock_llm()
+    report = run_evaluation_job({**_payload(), "interview_metadata": {"session_id": "s1"}})
+    assert report["interview_metadata"] == {"session_id": "s1"}
+    assert report["overall_assessment"]["score"] == mock_llm_server.MOCK_EVALUATION["overall_assessment"]["score"]
+
+
+def _wait_for_status(queue: EvaluationQueue, job_id: str, status: str, timeout: float = 15.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} is {queue.get(job_id)['status']}, expected {status}")
+
+
+def test_worker_completes_job_with_mock_llm(tmp_path, mock_llm):
+    mock_llm()
+    queue = _make_queue(f"sqlite:///{tmp_path / 'queue.db'}")
+    job_id = queue.enqueue(_payload(), session_id="s1")
+    worker = EvaluationWorker(queue, concurrency=1, poll_interval=0.05)
+    worker.start_in_thread()
+    try:
+        job = _wait_for_status(queue, job_id, "done")
+    finally:
+        worker.stop_event.set()
+    assert job["evaluation"]["overall_assessment"] == mock_llm_server.MOCK_EVALUATION["overall_assessment"]
+    assert queue.get_by_session("s1")["job_id"] == job_id
+
+
+def test_worker_requeues_when_llm_fails(tmp_path, mock_llm, monkeypatch):
+    # The OpenAI client retries twice itself; three 500s make the evaluation come back empty
+    mock_llm(fail_first=3)
+    monkeypatch.setattr(evaluation_queue, "retry_delay", lambda attempts: 0.0)
+    queue = _make_queue(f"sqlite:///{tmp_path / 'queue.db'}", max_attempts=2)
+    job_id = queue.enqueue(_payload())
+    worker = EvaluationWorker(queue, concurrency=1, poll_interval=0.05)
+    worker.start_in_thread()
+    try:
+        job = _wait_for_status(queue, job_id, "done", timeout=30.0)
+    finally:
+        worker.stop_event.set()
+    assert job["attempts"] == 2
@@ -0,0 +1,32 @@
+"""The static prompt prefixes must stay byte-identical and first, or provider prompt caching stops hitting"""
+import pytest
+import prompts_repo
+from instruction_builder import InstructionBuilder
+from prompt_report import PINNED_PREFIX_SHA256, CACHE_MIN_PREFIX_TOKENS, prefix_sha256, SAMPLE_JD, SAMPLE_RESUME, SAMPLE_QUESTIONS
+from transcript_builder import count_tokens
+
+COMMON = dict(prescreening_questions=["What is your notice period?"], time_greeting="morning")
+
+
+@pytest.mark.parametrize("name", sorted(PINNED_PREFIX_SHA256))
+def test_static_prefix_is_pinned(name):
+    assert prefix_sha256(name) == PINNED_PREFIX_SHA256[name], (
+        f"{name} changed; if intended, update PINNED_PREFIX_SHA256 in prompt_report.py"
+    )
+
+
+@pytest.mark.parametrize("name", sorted(PINNED_PREFIX_SHA256))
+def test_static_prefix_is_long_enough_to_cache(name):
+    assert count_tokens(getattr(prompts_repo, name)) >= CACHE_MIN_PREFIX_TOKENS
+
+
+def test_interview_prompt_starts_with_static_prefix():
+    prompt = InstructionBuilder().build(SAMPLE_JD, SAMPLE_RESUME, SAMPLE_QUESTIONS, interview_duration=30, **COMMON)
+    assert prompt.startswith(prompts_repo.INTERVIEW_STATIC_INSTRUCTIONS)
+    assert SAMPLE_JD in prompt[len(prompts_repo.INTERVIEW_STATIC_INSTRUCTIONS):]
+
+
+@pytest.mark.parametrize("phase", ["introduction", "technical", "wrap_up"])
+def test_phase_prompt_starts_with_static_prefix(phase):
+    prompt = InstructionBuilder().build_phase(phase, SAMPLE_JD, SAMPLE_RESUME, SAMPLE_QUESTIONS, **COMMON)
+    assert prompt.startswith(prompts_repo.PHASE_STATIC_INSTRUCTIONS)
@@ -0,0 +1,53 @@
+"""QuestionCache single-flight across processes sharing one SQLiteCacheStore"""
+import pytest
+from question_cache import QuestionCache, SQLiteCacheStore
+
+KEY = "questions:test"
+QUESTIONS = {"technical_questions": [{"question": "How does the GIL affect a CPU-bound service?"}]}
+
+
+class _RacingStore(SQLiteCacheStore):
+    """Runs `before_lease` ahead of the given lease attempt, like another process finishing just then"""
+
+    def __init__(self, path, before_lease, on_attempt: int):
+        super().__init__(path)
+        self.before_lease = before_lease
+        self.on_attempt = on_attempt
+        self.attempts = 0
+
+    def try_acquire_lease(self, key, owner, lease_seconds):
+        self.attempts += 1
+        if self.attempts == self.on_attempt:
+            self.before_lease()
+        return super().try_acquire_lease(key, owner, lease_seconds)
+
+
+def test_computes_once_and_serves_from_memory_and_store(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    calls = []
+    first = QuestionCache(SQLiteCacheStore(path))
+    assert first.get_or_compute(KEY, lambda: calls.append(1) or QUESTIONS) == QUESTIONS
+    assert first.get_or_compute(KEY, lambda: calls.append(1) or QUESTIONS) == QUESTIONS
+    assert QuestionCache(SQLiteCacheStore(path)).get(KEY) == QUESTIONS
+    assert len(calls) == 1
+    assert first.metrics['memory_hits'] == 1
+
+
+@pytest.mark.parametrize("on_attempt", [1, 2], ids=["first-lease", "lease-after-waiting"])
+def test_value_stored_by_another_process_before_the_lease_is_not_recomputed(tmp_path, on_attempt):
+    path = str(tmp_path / "questions.sqlite3")
+    other = QuestionCache(SQLiteCacheStore(path))
+    if on_attempt == 2:
+        # The other process holds the lease when this one first asks for it
+        assert other.store.try_acquire_lease(KEY, other._owner, 60)
+
+    def other_finishes():
+        other.set(KEY, QUESTIONS)
+        other.store.release_lease(KEY, other._owner)
+
+    cache = QuestionCache(_RacingStore(path, other_finishes, on_attempt))
+    computed = []
+    assert cache.get_or_compute(KEY, lambda: computed.append(1) or {"stale": True}) == QUESTIONS
+    assert computed == []
+    assert cache.metrics['computes'] == 0
+
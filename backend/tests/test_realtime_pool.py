@@ -0,0 +1,150 @@
+"""RealtimePool against fake_realtime_server"""
+import json
+import socket
+import asyncio
+import pytest
+import fake_realtime_server
+from realtime_pool import RealtimePool
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def fake_server():
+    """Yields a function starting a fake Realtime server with the given options"""
+    servers = []
+
+    def start(**options):
+        servers.append(fake_realtime_server.serve(port=_free_port(), **options))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+async def _session_update_round_trip(websocket) -> str:
+    await websocket.send(json.dumps({"type": "session.update", "session": {"instructions": "test"}}))
+    return json.loads(await asyncio.wait_for(websocket.recv(), 5))["type"]
+
+
+def test_fill_prewarms_and_records_connect_to_ready(fake_server):
+    server = fake_server(ready_delay=0.1)
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=2)
+        await pool.fill()
+        await pool.fill()  # Already full: opens nothing more
+        assert len(pool._idle) == 2
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert server.state.connections == 2
+    assert pool.stats['opened'] == 2
+    assert len(pool.stats['connect_to_ready_ms']) == 2
+    assert all(ms >= 100 for ms in pool.stats['connect_to_ready_ms'])
+
+
+def test_acquire_hands_out_a_prewarmed_connection(fake_server):
+    server = fake_server()
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1)
+        await pool.fill()
+        websocket = await pool.acquire()
+        reply = await _session_update_round_trip(websocket)
+        await websocket.close()
+        return pool, reply
+
+    pool, reply = asyncio.run(scenario())
+    assert reply == "session.updated"
+    assert pool.stats['reused'] == 1
+    assert server.state.connections == 1
+
+
+def test_acquire_opens_a_connection_when_the_pool_is_empty(fake_server):
+    server = fake_server()
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1)
+        websocket = await pool.acquire()
+        reply = await _session_update_round_trip(websocket)
+        await websocket.close()
+        return pool, reply
+
+    pool, reply = asyncio.run(scenario())
+    assert reply == "session.updated"
+    assert pool.stats['opened'] == 1
+    assert pool.stats['reused'] == 0
+
+
+def test_acquire_waits_for_a_prewarm_in_flight(fake_server):
+    server = fake_server(ready_delay=0.3)
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1)
+        prewarm = asyncio.get_running_loop().create_task(pool.fill())
+        await asyncio.sleep(0.05)
+        websocket = await pool.acquire()
+        await prewarm
+        await websocket.close()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert pool.stats['reused'] == 1
+    assert server.state.connections == 1
+
+
+def test_unhealthy_idle_connection_is_replaced(fake_server):
+    server = fake_server()
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1, ping_timeout=0.5)
+        await pool.fill()
+        pool._idle[0].websocket.transport.abort()  # Connection died while idle
+        websocket = await pool.acquire()
+        reply = await _session_update_round_trip(websocket)
+        await websocket.close()
+        return pool, reply
+
+    pool, reply = asyncio.run(scenario())
+    assert reply == "session.updated"
+    assert pool.stats['unhealthy'] == 1
+    assert pool.stats['reused'] == 0
+    assert server.state.connections == 2
+
+
+def test_stale_idle_connection_is_expired(fake_server):
+    server = fake_server()
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1, max_idle_seconds=0.05)
+        await pool.fill()
+        stale = pool._idle[0].websocket
+        await asyncio.sleep(0.1)
+        websocket = await pool.acquire()
+        assert websocket is not stale
+        await websocket.close()
+        return pool, stale
+
+    pool, stale = asyncio.run(scenario())
+    assert pool.stats['expired'] == 1
+    assert pool.stats['reused'] == 0
+    assert stale.close_code is not None
+    assert server.state.connections == 2
+
+
+def test_failed_prewarm_is_counted():
+    async def scenario():
+        pool = RealtimePool("sk-test", url=f"ws://127.0.0.1:{_free_port()}/v1/realtime", size=1)
+        await pool.fill()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert pool.stats['failed'] == 1
+    assert pool._idle == [] and pool._opening == 0
@@ -0,0 +1,162 @@
+"""RealtimeReconnector and InterviewBot recovery against a fake server that drops connections"""
+import json
+import socket
+import asyncio
+import pytest
+import websockets
+import fake_realtime_server
+from audio_uplink import encode_append_event
+from bot import InterviewBot
+from file_audio import FileAudioManager, synthetic_speech
+from realtime_pool import RealtimePool
+from realtime_reconnect import RealtimeReconnector, replay_items
+
+SESSION_UPDATE = {"type": "session.update", "session": {"instructions": "test"}}
+CONVERSATION = [{'user': f"answer {n}", 'bot': f"question {n}"} for n in range(8)]
+FRAME = bytes(4800)  # 100 ms of PCM16 at 24 kHz
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def fake_server():
+    """Yields a function starting a fake Realtime server with the given options"""
+    servers = []
+
+    def start(**options):
+        servers.append(fake_realtime_server.serve(port=_free_port(), **options))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+async def _wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_replay_items_restores_the_last_exchanges_in_order():
+    events = replay_items(CONVERSATION, last_n=2)
+    assert [e["item"]["role"] for e in events] == ["user", "assistant", "user", "assistant"]
+    assert [e["item"]["content"][0]["text"] for e in events] == ["answer 6", "question 6", "answer 7", "question 7"]
+    assert replay_items(CONVERSATION, last_n=0) == []
+
+
+def test_backlog_keeps_only_the_newest_audio():
+    reconnector = RealtimeReconnector(None, None, None, backlog_ms=250)
+    for n in range(5):
+        reconnector.buffer_audio(f"append {n}", len(FRAME))
+    assert [message for message, _ in reconnector._backlog] == ["append 3", "append 4"]
+    assert reconnector.stats['backlog_events_dropped'] == 3
+
+
+def test_dropped_session_is_restored_with_replay_and_backlog(fake_server):
+    # Dropped on the 4th client event: session.update plus three appends
+    server = fake_server(drop_after=4, max_drops=1)
+
+    async def scenario():
+        pool = RealtimePool("sk-test", url=server.url, size=1)
+        reconnector = RealtimeReconnector(
+            pool, lambda: SESSION_UPDATE, lambda: CONVERSATION, replay_exchanges=3, base_delay=0.01
+        )
+        websocket = await pool.acquire()
+        await websocket.send(json.dumps(SESSION_UPDATE))
+        for _ in range(50):
+            message = encode_append_event(FRAME)
+            try:
+                await websocket.send(message)
+            except websockets.ConnectionClosed:
+                reconnector.buffer_audio(message, len(FRAME))
+                break
+            await asyncio.sleep(0.02)
+        else:
+            pytest.fail("the fake server never dropped the connection")
+        # Captured while the socket was down
+        reconnector.buffer_audio(encode_append_event(FRAME), len(FRAME))
+        reconnector.buffer_audio(encode_append_event(FRAME), len(FRAME))
+
+        restored = await reconnector.recover()
+        assert restored is not None and restored is not websocket
+        await _wait_for(lambda: len(server.state.received) == 2 and len(server.state.received[1]) == 10)
+        await restored.close()
+        await pool.close()
+        return reconnector
+
+    reconnector = asyncio.run(scenario())
+    assert server.state.received[1] == (
+        ["session.update"] + ["conversation.item.create"] * 6 + ["input_audio_buffer.append"] * 3
+    )
+    assert server.state.received[0][:4] == ["session.update"] + ["input_audio_buffer.append"] * 3
+    assert reconnector.stats['drops'] == 1
+    assert reconnector.stats['reconnects'] == 1
+    assert reconnector.stats['replayed_items'] == 6
+    assert reconnector.stats['backlog_events_sent'] == 3
+    assert len(reconnector.stats['recovery_seconds']) == 1
+    assert reconnector.stats['recovery_seconds'][0] < reconnector.target_recovery_seconds
+    assert not reconnector._backlog
+
+
+def test_recovery_gives_up_when_the_server_is_gone():
+    async def scenario():
+        pool = RealtimePool("sk-test", url=f"ws://127.0.0.1:{_free_port()}/v1/realtime", size=1)
+        reconnector = RealtimeReconnector(pool, lambda: SESSION_UPDATE, lambda: [], max_attempts=2, base_delay=0.01)
+        return await reconnector.recover(), reconnector
+
+    restored, reconnector = asyncio.run(scenario())
+    assert restored is None
+    assert reconnector.stats['attempts'] == 2
+    assert reconnector.stats['failed_recoveries'] == 1
+
+
+def test_bot_keeps_talking_across_a_drop(fake_server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Recordings
+    server = fake_server(respond=True, drop_after=25, max_drops=1, turn_audio_ms=500, response_delay=0.1,
+                         response_audio_ms=300, delta_interval=0.02)
+
+    async def scenario():
+        bot = InterviewBot("sk-test", audio_manager=FileAudioManager(synthetic_speech(24000)), realtime_url=server.url)
+        run = asyncio.get_running_loop().create_task(bot.run())
+        await _wait_for(lambda: bot.reconnector.stats['reconnects'] == 1 and len(server.state.received[1]) > 20,
+                        timeout=15)
+        bot.running = False
+        await asyncio.wait_for(run, 10)
+        return bot
+
+    bot = asyncio.run(scenario())
+    stats = bot.reconnector.stats
+    replayed = stats['replayed_items']
+    after_drop = server.state.received[1]
+    assert after_drop[0] == "session.update"
+    assert after_drop[1:1 + replayed] == ["conversation.item.create"] * replayed
+    assert "input_audio_buffer.append" in after_drop[1 + replayed:]
+    assert stats['drops'] == 1
+    assert len(stats['recovery_seconds']) == 1
+    assert bot.session_manager.performance_metrics['reconnect'] is stats
+
+
+def test_bot_does_not_reconnect_during_teardown(fake_server, tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    server = fake_server()
+
+    async def scenario():
+        bot = InterviewBot("sk-test", audio_manager=FileAudioManager(synthetic_speech(24000)), realtime_url=server.url)
+        bot.websocket = await bot.realtime_pool.acquire()
+        await bot.websocket.close()
+        bot.running = False  # As in cleanup()
+        sent = await bot.send_raw_event(json.dumps(SESSION_UPDATE))
+        return bot, sent
+
+    bot, sent = asyncio.run(scenario())
+    assert sent is False
+    assert bot._recovery_task is None
+    assert bot.reconnector.stats['drops'] == 0
+    assert server.state.connections == 1
+    assert "reconnecting" not in caplog.text
@@ -0,0 +1,291 @@
+# tracing.py
+import os
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+import contextlib
+import contextvars
+
+logger = logging.getLogger(__name__)
+
+# "jsonl" appends finished spans to TRACE_FILE, "otlp" posts them to an
+# OpenTelemetry collector (OTLP/HTTP JSON); anything else keeps spans in-process only
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "Data/traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "rbvoice-backend")
+TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "2"))
+TRACE_MAX_QUEUE = int(os.getenv("TRACE_MAX_QUEUE", "10000"))
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return round(((self.end_ns or time.time_ns()) - self.start_ns) / 1e6, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id, 'name': self.name,
+            'start_ns': self.start_ns, 'end_ns': self.end_ns, 'duration_ms': self.duration_ms,
+            'status': 'error' if self.error else 'ok', 'error': self.error, 'attributes': self.attributes
+        }
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def set_attribute(key: str, value):
+    """Attach an attribute to the active span, if any (cheap no-op outside a trace)"""
+    active = _current_span.get()
+    if active is not None:
+        active.attributes[key] = value
+
+
+@contextlib.contextmanager
+def span(name: str, trace_id: str | None = None, parent_id: str | None = None, **attributes):
+    """Time a block as a child of the active span (or a new trace); works in threads and tasks.
+
+    asyncio tasks and run_in_threadpool copy the context, so spans opened
+    there nest under the request span. Exceptions mark the span as failed
+    and propagate unchanged.
+    """
+    parent = _current_span.get()
+    if parent is not None and trace_id is None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    active = Span(name, trace_id or uuid.uuid4().hex, parent_id, attributes)
+    if parent is None and _request_id.get():
+        active.attributes.setdefault('request_id', _request_id.get())
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        active.end_ns = time.time_ns()
+        _current_span.reset(token)
+        get_exporter().export(active)
+
+
+def set_llm_usage(resp):
+    """Token usage of a chat completion onto the active span"""
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        set_attribute('prompt_tokens', getattr(usage, "prompt_tokens", None))
+        set_attribute('completion_tokens', getattr(usage, "completion_tokens", None))
+
+
+# --------------- Export ---------------
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list) -> dict:
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) for a batch of spans"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "rbvoice"}, "spans": [{
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        } for s in spans]}]
+    }]}
+
+
+class SpanExporter:
+    """Hands finished spans to a background thread that writes them in batches.
+
+    export() never blocks the caller: it is a queue put, and spans are
+    dropped (and counted) once `max_queue` are waiting. `mode` is "jsonl",
+    "otlp" or "" (spans are discarded; correlation ids still work).
+    """
+
+    def __init__(self, mode: str = TRACE_EXPORT, path: str = TRACE_FILE, endpoint: str = OTLP_ENDPOINT,
+                 flush_seconds: float = TRACE_FLUSH_SECONDS, max_queue: int = TRACE_MAX_QUEUE):
+        self.mode = mode if mode in ("jsonl", "otlp") else ""
+        self.path = path
+        self.endpoint = endpoint
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'exported': 0, 'dropped': 0, 'failed_batches': 0}
+
+    def export(self, finished: Span):
+        if not self.mode:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list):
+        try:
+            if self.mode == "jsonl":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in batch))
+            else:
+                try:
+                    from backend.http_client import get_sync_http_client
+                except Exception:  # CLI bot: backend/ is on sys.path, not a package
+                    from http_client import get_sync_http_client
+                resp = get_sync_http_client().post(f"{self.endpoint}/v1/traces", json=otlp_payload(batch), idempotent=True)
+                if resp.status_code >= 400:
+                    raise RuntimeError(f"collector returned {resp.status_code}")
+            self.stats['exported'] += len(batch)
+        except Exception as e:
+            self.stats['failed_batches'] += 1
+            logger.warning(f"Span export failed ({len(batch)} spans): {e}")
+
+    def flush(self):
+        """Write whatever is queued now (shutdown)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+
+_exporter = None
+
+
+def get_exporter() -> SpanExporter:
+    global _exporter
+    if _exporter is None:
+        _exporter = SpanExporter()
+    return _exporter
+
+
+# --------------- Request correlation ---------------
+
+def _parse_traceparent(value: str) -> tuple[str | None, str | None]:
+    """(trace_id, parent span id) from a W3C traceparent header"""
+    parts = (value or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+class TracingMiddleware:
+    """ASGI middleware: one root span per HTTP request plus a correlation id.
+
+    The id comes from an incoming X-Request-ID header (or is generated), is
+    echoed back on the response and is visible to logging through
+    CorrelationFilter. An incoming traceparent continues the caller's trace.
+    """
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(self.header, b"").decode("latin-1")[:128] or uuid.uuid4().hex
+        trace_id, parent_id = _parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(self.header, request_id.encode("latin-1"))]
+                root.set('http.status_code', message["status"])
+            await send(message)
+
+        try:
+            with span(f"{scope['method']} {scope.get('path', '')}", trace_id=trace_id, parent_id=parent_id,
+                      **{'http.method': scope["method"], 'http.target': scope.get("path", "")}) as root:
+                await self.app(scope, receive, send_wrapper)
+                route = scope.get("route")
+                if getattr(route, "path", None):
+                    root.name = f"{scope['method']} {route.path}"
+        finally:
+            _request_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Adds request_id and trace_id ("-" outside a request) to every log record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        active = _current_span.get()
+        record.request_id = _request_id.get() or "-"
+        record.trace_id = active.trace_id if active is not None else "-"
+        return True
+
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] [%(request_id)s] %(name)s: %(message)s"
+
+
+def install_log_correlation(fmt: str = LOG_FORMAT):
+    """Put the correlation filter and format on the root handlers (configuring logging if nobody has)"""
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=logging.INFO)
+    for handler in root.handlers:
+        if not any(isinstance(f, CorrelationFilter) for f in handler.filters):
+            handler.addFilter(CorrelationFilter())
+        handler.setFormatter(logging.Formatter(fmt))
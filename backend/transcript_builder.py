@@ -0,0 +1,130 @@
+# transcript_builder.py
+import os
+import re
+from collections import Counter
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+# Transcript tokens sent to the evaluation model; the prompt and context come on top
+EVALUATION_TRANSCRIPT_MAX_TOKENS = int(os.getenv("EVALUATION_TRANSCRIPT_MAX_TOKENS", "24000"))
+
+# Only unambiguous fillers; "like" or "actually" often carry meaning
+_FILLER_RE = re.compile(r"\b(u+m+|u+h+|e+r+m*|a+h+|h+m+|you know|i mean)\b[,.]?\s*", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens for gpt-4o via tiktoken, or a chars/4 estimate when it is unavailable"""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            _encoding = False  # No network for the BPE file; stay on the estimate
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def strip_fillers(text: str) -> tuple[str, Counter]:
+    """Text without filler words, plus how often each one occurred"""
+    counts = Counter(m.group(1).lower() for m in _FILLER_RE.finditer(text))
+    return _FILLER_RE.sub("", text).strip(), counts
+
+
+def _extract(text: str, max_chars: int = 300) -> str:
+    """First and last sentence of a long answer"""
+    sentences = [s for s in _SENTENCE_RE.split(text.strip()) if s]
+    if len(sentences) > 2:
+        text = f"{sentences[0]} [...] {sentences[-1]}"
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + " [...]"
+
+
+def _questions(text: str) -> str:
+    """Just the question sentences of an interviewer turn, or its first sentence"""
+    sentences = [s for s in _SENTENCE_RE.split(text.strip()) if s]
+    asked = [s for s in sentences if s.endswith("?")]
+    return " ".join(asked) if asked else _extract(text, 200)
+
+
+class TranscriptBuilder:
+    """Assembles the evaluation transcript within a token budget.
+
+    Exchanges are rendered into a list and counted once each. Over budget,
+    older exchanges are compressed oldest-first until the transcript fits:
+    fillers are stripped from answers (their counts are kept in a note so
+    communication scoring still sees them), then answers are cut to their
+    first and last sentences and interviewer turns to their questions, and
+    finally the oldest exchanges are dropped. The last `keep_recent`
+    exchanges are always verbatim.
+    """
+
+    def __init__(self, max_tokens: int = EVALUATION_TRANSCRIPT_MAX_TOKENS, keep_recent: int = 6):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.report = {}
+
+    @staticmethod
+    def _render(bot_text: str, user_text: str, note: str = "") -> str:
+        return f"INTERVIEWER: {bot_text}\nCANDIDATE: {user_text}{note}\n\n"
+
+    def build(self, conversation: list, header: str = "INTERVIEW CONVERSATION:\n\n") -> str:
+        parts = [self._render(ex['bot'], ex['user']) for ex in conversation]
+        tokens = [count_tokens(p) for p in parts]
+        header_tokens = count_tokens(header)
+        raw_total = total = header_tokens + sum(tokens)
+        older = range(max(0, len(parts) - self.keep_recent))
+        fillers = Counter()
+        compressed = set()
+        dropped = 0
+
+        def replace(i, text):
+            nonlocal total
+            new_tokens = count_tokens(text) if text else 0
+            total += new_tokens - tokens[i]
+            parts[i], tokens[i] = text, new_tokens
+
+        if total > self.max_tokens:
+            for i in older:
+                user_text, counts = strip_fillers(conversation[i]['user'])
+                if counts:
+                    fillers.update(counts)
+                    note = " [fillers: " + ", ".join(f"{w} x{n}" for w, n in counts.most_common()) + "]"
+                    replace(i, self._render(conversation[i]['bot'], user_text, note))
+                    compressed.add(i)
+                if total <= self.max_tokens:
+                    break
+        if total > self.max_tokens:
+            for i in older:
+                user_text, counts = strip_fillers(conversation[i]['user'])
+                note = " [fillers: " + ", ".join(f"{w} x{n}" for w, n in counts.most_common()) + "]" if counts else ""
+                replace(i, self._render(_questions(conversation[i]['bot']), _extract(user_text), note))
+                compressed.add(i)
+                if total <= self.max_tokens:
+                    break
+        if total > self.max_tokens:
+            for i in older:
+                replace(i, "")
+                dropped += 1
+                if total <= self.max_tokens:
+                    break
+            if dropped:
+                marker = f"[{dropped} earlier exchanges omitted for length]\n\n"
+                header += marker
+                total += count_tokens(marker)
+
+        self.report = {
+            'tokenizer': 'tiktoken' if _encoding else 'chars/4',
+            'budget_tokens': self.max_tokens,
+            'raw_tokens': raw_total,
+            'final_tokens': total,
+            'exchanges': len(parts),
+            'compressed_exchanges': len(compressed - set(range(dropped))),
+            'dropped_exchanges': dropped,
+            'fillers_removed': dict(fillers)
+        }
+        return header + "".join(parts)
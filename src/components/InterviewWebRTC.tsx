@@ -118,6 +118,7 @@ const InterviewWebRTC: React.FC<Props> = ({ userEmail: _userEmail, onComplete, i
       const jdTxt = sessionStorage.getItem('rb_jd_txt') || '';
       const qDictRaw = sessionStorage.getItem('rb_questions_dict');
       const qDict = qDictRaw ? JSON.parse(qDictRaw) : undefined;
+      const resumeIdRaw = sessionStorage.getItem('rb_resume_id');
 
       // Prepare POST request body
       const requestBody = {
@@ -125,6 +126,7 @@ const InterviewWebRTC: React.FC<Props> = ({ userEmail: _userEmail, onComplete, i
         jd_txt: jdTxt,
         resume_txt: resumeTxt,
         questions_dict: qDict,
+        resume_id: resumeIdRaw ? Number(resumeIdRaw) : undefined,
         interview_duration: 30
       };
 
@@ -216,6 +216,7 @@ export default function RecruiterDashboard() {
                   if (data?.parsed?.resume_txt) sessionStorage.setItem('rb_resume_txt', data.parsed.resume_txt);
                   if (data?.parsed?.jd_txt) sessionStorage.setItem('rb_jd_txt', data.parsed.jd_txt);
                   if (data?.parsed?.questions) sessionStorage.setItem('rb_questions_dict', JSON.stringify(data.parsed.questions));
+                  sessionStorage.setItem('rb_resume_id', String(resumeId));
                 } catch {}
                 openModal('Fetched recruiter data JSON. Check console.', () => {
                   try {